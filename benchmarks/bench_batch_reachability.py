@@ -0,0 +1,84 @@
+"""
+Batch reachability: the SciPy and pure-Python backends must agree, and how fast each is
+
+Random graphs with many cycles, where most nodes are reached over several
+edges in the same BFS level, plus the small cyclic graph that once kept the
+SciPy frontier from emptying. Every query of the engine is compared between
+the backends; any difference is printed and the exit status is 1.
+Usage: python -m benchmarks.bench_batch_reachability [GRAPHS] [NODE_COUNT]
+"""
+
+import random
+import sys
+import time
+
+from src.batch_reachability import SPARSE_AVAILABLE, batch_reachability
+from src.compact_graph import CompactGraph
+from src.model import NXDependency, NXEntity, NXGraph
+
+TYPES = ["app", "lib", "e2e"]
+
+
+def _diamond_cycle() -> NXGraph:
+    # S -> A, B; A, B -> C, D; C, D -> A, B: A..D are reached twice per level
+    edges = [("S", "A"), ("S", "B"), ("A", "C"), ("A", "D"), ("B", "C"), ("B", "D"),
+             ("C", "A"), ("C", "B"), ("D", "A"), ("D", "B")]
+    return NXGraph([NXEntity(name, "lib") for name in "SABCD"],
+                   [NXDependency(source, target) for source, target in edges])
+
+
+def _random_cyclic(rng: random.Random, node_count: int) -> NXGraph:
+    names = [f"n{i}" for i in range(node_count)]
+    nodes = [NXEntity(name, rng.choice(TYPES)) for name in names]
+    edges = set()
+    for i in range(node_count):
+        for _ in range(rng.randint(0, 4)):
+            edges.add((i, rng.randrange(node_count)))
+    return NXGraph(nodes, [NXDependency(names[s], names[t]) for s, t in sorted(edges) if s != t])
+
+
+def _queries(engine, names, rng: random.Random):
+    sources = rng.sample(names, min(len(names), 12)) + ["missing"]
+    pair = sources[:2]
+    return {
+        "dependencies": {k: sorted(v) for k, v in engine.dependencies(sources).items()},
+        "dependencies/lib": {k: sorted(v) for k, v in engine.dependencies(sources, "lib").items()},
+        "common_dependencies": sorted(engine.common_dependencies(pair)),
+        "usage_counts": engine.usage_counts(sources),
+        "usage_counts/app": engine.usage_counts(sources, "app"),
+        "dependency_matrix": engine.dependency_matrix(sources, names[:20] + ["missing"]),
+    }
+
+
+def main():
+    if not SPARSE_AVAILABLE:
+        print("numpy/scipy not installed: only the python backend is available")
+        return
+    graph_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    node_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(0)
+    graphs = [_diamond_cycle()] + [_random_cyclic(rng, rng.randint(5, node_count)) for _ in range(graph_count)]
+
+    failures = 0
+    seconds = {"python": 0.0, "scipy": 0.0}
+    for g, graph in enumerate(graphs):
+        compact = CompactGraph.from_nx_graph(graph)
+        names = [node.name for node in graph.nodes]
+        results = {}
+        for backend in seconds:
+            start = time.perf_counter()
+            results[backend] = _queries(batch_reachability(compact, backend), names, random.Random(g))
+            seconds[backend] += time.perf_counter() - start
+        for query, expected in results["python"].items():
+            if results["scipy"][query] != expected:
+                failures += 1
+                print(f"graph {g} ({len(names)} nodes): {query} differs between backends")
+
+    print(f"{len(graphs)} cyclic graphs: python {seconds['python']:.2f}s, scipy {seconds['scipy']:.2f}s, "
+          f"{failures} mismatch(es)")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
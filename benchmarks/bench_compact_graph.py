@@ -0,0 +1,70 @@
+"""
+Memory and traversal comparison between NXGraph and CompactGraph backends
+
+Usage: python -m benchmarks.bench_compact_graph [NODE_COUNT]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from benchmarks.synthetic_graph import generate_graph
+from src.compact_graph import CompactGraph
+from src.model import NXDependency, NXEntity, NXGraph
+from src.nx_graph_helper import NXGraphHelper
+
+
+def _nx_graph_from_dict(data) -> NXGraph:
+    graph_data = data["graph"]
+    nodes = [NXEntity.from_dict(n) for n in graph_data["nodes"].values()]
+    deps = [NXDependency.from_dict(d) for deps in graph_data["dependencies"].values() for d in deps]
+    return NXGraph(nodes=nodes, dependencies=deps)
+
+
+def _measure(build):
+    # Time and memory are taken in separate runs, tracemalloc slows allocation down
+    gc.collect()
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size, elapsed
+
+
+def _time_queries(helper, entities):
+    start = time.perf_counter()
+    for entity in entities:
+        helper.dfs_dependencies(entity)
+        helper.get_all_dependents(entity)
+    return time.perf_counter() - start
+
+
+def main():
+    node_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    data = generate_graph(node_count)
+    # Project names are shared by both backends, keep them outside the measurement
+    names = list(data["graph"]["nodes"])
+
+    helper, nx_bytes, nx_build = _measure(lambda: NXGraphHelper(_nx_graph_from_dict(data)))
+    compact_helper, compact_bytes, compact_build = _measure(
+        lambda: NXGraphHelper(CompactGraph.from_nx_graph(_nx_graph_from_dict(data))))
+    graph = compact_helper.graph
+    del data
+
+    sample = names[::max(1, node_count // 50)]
+    nx_query = _time_queries(helper, sample)
+    compact_query = _time_queries(compact_helper, sample)
+
+    print(f"nodes={graph.node_count} edges={graph.edge_count}")
+    print(f"{'backend':<10}{'memory MB':>12}{'build s':>10}{'queries s':>12}")
+    print(f"{'NXGraph':<10}{nx_bytes / 1e6:>12.1f}{nx_build:>10.2f}{nx_query:>12.3f}")
+    print(f"{'Compact':<10}{compact_bytes / 1e6:>12.1f}{compact_build:>10.2f}{compact_query:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
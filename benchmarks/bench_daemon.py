@@ -0,0 +1,86 @@
+"""
+Query latency against a warm daemon vs a fresh CLI process per query
+
+Starts `nx_cli.py --serve` on a temporary Unix socket and sends queries over
+one persistent connection; round-trip latency percentiles are reported per op.
+Usage: python -m benchmarks.bench_daemon [GRAPH_FILE] [QUERIES_PER_OP]
+(without GRAPH_FILE a 20k node synthetic graph is written to a temp dir)
+"""
+
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_graph import write_graph
+from src.query_server import DaemonClient
+
+ROOT = Path(__file__).parent.parent
+
+
+def _percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def _wait_for_socket(socket_path: Path, proc: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while not socket_path.exists():
+        if proc.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("Daemon did not start")
+        time.sleep(0.05)
+
+
+def main():
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1:
+            graph_file = Path(sys.argv[1]).resolve()
+        else:
+            graph_file = Path(tmp) / "nx-output.json"
+            write_graph(graph_file, 20000)
+        socket_path = Path(tmp) / "daemon.sock"
+
+        proc = subprocess.Popen([sys.executable, "nx_cli.py", "--graph-file", str(graph_file), "--serve",
+                                 "--reachability-index", "--socket", str(socket_path)], cwd=ROOT)
+        try:
+            _wait_for_socket(socket_path, proc)
+            with DaemonClient(str(socket_path)) as client:
+                entities = client.query({"op": "list-entities"})["result"]
+                names = [name for group in entities.values() for name in group]
+                rng = random.Random(0)
+                queries = {
+                    "check-dependency": lambda: {"op": "check-dependency", "source": rng.choice(names),
+                                                 "target": rng.choice(names)},
+                    "dependencies": lambda: {"op": "dependencies", "entity": rng.choice(names)},
+                    "dependents": lambda: {"op": "dependents", "entity": rng.choice(names)},
+                }
+
+                print(f"{len(names)} entities, {count} queries per op")
+                print(f"{'op':<18}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'queries/s':>12}")
+                for op, make_query in queries.items():
+                    latencies = []
+                    for _ in range(count):
+                        query = make_query()
+                        start = time.perf_counter()
+                        client.query(query)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                    latencies.sort()
+                    print(f"{op:<18}{_percentile(latencies, 50):>10.3f}{_percentile(latencies, 90):>10.3f}"
+                          f"{_percentile(latencies, 99):>10.3f}{count / (sum(latencies) / 1000):>12.0f}")
+
+            # Same query through a fresh process (warm snapshot cache) for comparison
+            args = [sys.executable, "nx_cli.py", "--graph-file", str(graph_file),
+                    "--check-dependency", names[0], names[-1]]
+            subprocess.run(args, cwd=ROOT, check=True, capture_output=True)
+            start = time.perf_counter()
+            subprocess.run(args, cwd=ROOT, check=True, capture_output=True)
+            print(f"{'fresh CLI process':<18}{(time.perf_counter() - start) * 1000:>10.1f}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Deep dependency chains: iterative traversal engine vs the old recursive helpers
+
+The recursive reference implementations are the pre-engine NXGraphHelper code,
+run with a raised recursion limit so they can finish at all.
+Usage: python -m benchmarks.bench_deep_chain [DEPTH ...]
+"""
+
+import sys
+import time
+from src.model import NXDependency, NXEntity, NXGraph
+from src.nx_graph_helper import NXGraphHelper
+
+
+def chain_graph(depth: int) -> NXGraph:
+    """proj-0 -> proj-1 -> ... -> proj-(depth-1), each link also pointing at a leaf lib"""
+    nodes = [NXEntity(f"proj-{i}", "lib") for i in range(depth)] + [NXEntity("leaf", "lib")]
+    deps = []
+    for i in range(depth - 1):
+        deps.append(NXDependency(f"proj-{i}", "leaf"))
+        deps.append(NXDependency(f"proj-{i}", f"proj-{i + 1}"))
+    return NXGraph(nodes=nodes, dependencies=deps)
+
+
+def recursive_dfs(forward_map, entity, visited, result):
+    visited.add(entity)
+    for target in forward_map.get(entity, []):
+        if target not in visited:
+            result.append(target)
+            recursive_dfs(forward_map, target, visited, result)
+    return result
+
+
+def recursive_check(forward_map, current, target, visited):
+    if current == target:
+        return True
+    visited.add(current)
+    for dep_target in forward_map.get(current, []):
+        if dep_target not in visited:
+            if recursive_check(forward_map, dep_target, target, visited):
+                return True
+    return False
+
+
+def recursive_paths(forward_map, source, target, current_path, all_paths):
+    current_path = current_path + [source]
+    if source == target:
+        all_paths.append(current_path)
+        return all_paths
+    for dep_target in forward_map.get(source, []):
+        if dep_target not in current_path:
+            recursive_paths(forward_map, dep_target, target, current_path, all_paths)
+    return all_paths
+
+
+def _time(fn):
+    start = time.perf_counter()
+    try:
+        fn()
+    except RecursionError:
+        return None
+    return time.perf_counter() - start
+
+
+def main():
+    depths = [int(d) for d in sys.argv[1:]] or [500, 2000, 5000]
+    sys.setrecursionlimit(max(depths) * 4 + 1000)
+
+    print(f"{'depth':>7}  {'query':<12}{'recursive s':>13}{'engine s':>10}{'speedup':>9}")
+    for depth in depths:
+        helper = NXGraphHelper(chain_graph(depth), cache_entries=0)
+        fmap = helper.forward_map
+        first, last = "proj-0", f"proj-{depth - 1}"
+        cases = [
+            ("closure", lambda: recursive_dfs(fmap, first, set(), []), lambda: helper.dfs_dependencies(first)),
+            ("reachable", lambda: recursive_check(fmap, first, last, set()),
+             lambda: helper.check_if_dependent(first, last)),
+            ("all paths", lambda: recursive_paths(fmap, first, last, [], []),
+             lambda: helper._find_all_paths(first, last)),
+        ]
+        for label, old, new in cases:
+            old_s = _time(old)
+            new_s = _time(new)
+            old_txt = f"{old_s:.4f}" if old_s is not None else "RecursionError"
+            speedup = f"{old_s / new_s:.1f}x" if old_s is not None else "-"
+            print(f"{depth:>7}  {label:<12}{old_txt:>13}{new_s:>10.4f}{speedup:>9}")
+
+
+if __name__ == "__main__":
+    main()
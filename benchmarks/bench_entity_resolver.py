@@ -0,0 +1,70 @@
+"""
+Entity name resolution: lookup latency and how often a misspelled name is resolved, left alone or answered with candidates
+
+Project names are built from shared words (like real monorepos, where many
+names differ by one word), then queried as written, with separators changed
+and with one typo. Latency is reported as mean, p99 and worst case per kind.
+Usage: python -m benchmarks.bench_entity_resolver [NAME_COUNT] [QUERIES]
+"""
+
+import random
+import statistics
+import sys
+import time
+from typing import Callable, List, Tuple
+
+from src.entity_resolver import EntityResolver
+
+WORDS = ["core", "shared", "ui", "data", "access", "feature", "search", "enterprise", "auth", "billing",
+         "admin", "portal", "util", "api", "client", "server", "mobile", "web", "store", "cart",
+         "profile", "user", "report", "chart", "table", "form", "theme", "icons", "layout", "router"]
+
+
+def _names(rng: random.Random, count: int) -> List[str]:
+    names = set()
+    while len(names) < count:
+        names.add("-".join(rng.sample(WORDS, 3)) + f"-{rng.randrange(1000)}")
+    return sorted(names)
+
+
+def _typo(rng: random.Random, name: str) -> str:
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[i + 1:]
+
+
+def _time(resolver: EntityResolver, queries: List[str]) -> List[float]:
+    seconds = []
+    for query in queries:
+        start = time.perf_counter()
+        resolver.lookup(query)
+        seconds.append(time.perf_counter() - start)
+    return sorted(seconds)
+
+
+def main():
+    name_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(0)
+    names = _names(rng, name_count)
+    start = time.perf_counter()
+    resolver = EntityResolver(names)
+    print(f"{name_count} names, index built in {time.perf_counter() - start:.2f}s")
+
+    kinds: List[Tuple[str, Callable[[str], str]]] = [
+        ("exact", lambda name: name),
+        ("normalized", lambda name: name.replace("-", " ").upper()),
+        ("one typo", lambda name: _typo(rng, name)),
+    ]
+    print(f"{'queries':<12} {'mean ms':>8} {'p99 ms':>8} {'max ms':>8} {'resolved':>9} {'candidates':>11} {'unknown':>8}")
+    for kind, make in kinds:
+        queries = [make(rng.choice(names)) for _ in range(query_count)]
+        seconds = _time(resolver, queries)
+        outcomes = [resolver.lookup(query) for query in queries]
+        resolved = sum(match is not None for match, _ in outcomes)
+        ambiguous = sum(bool(candidates) for _, candidates in outcomes)
+        print(f"{kind:<12} {statistics.mean(seconds) * 1000:>8.3f} {seconds[int(len(seconds) * 0.99)] * 1000:>8.3f} "
+              f"{seconds[-1] * 1000:>8.3f} {resolved:>9} {ambiguous:>11} {len(queries) - resolved - ambiguous:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Peak RSS and load time of the regular vs streaming JSON loader
+
+Each loader runs in a fresh interpreter so peak RSS is not shared.
+Usage: python -m benchmarks.bench_loader [GRAPH_FILE]
+(without GRAPH_FILE a ~100 MB synthetic graph is written to a temp dir)
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+_GENERATE = """
+import sys
+from benchmarks.synthetic_graph import write_graph
+write_graph(sys.argv[1], 10000, payload_files=120)
+"""
+_CHILD = """
+import json, resource, sys, time
+from src.utility import load_nx_graph_from_json
+start = time.perf_counter()
+graph = load_nx_graph_from_json(sys.argv[1], streaming=sys.argv[2] == "1")
+elapsed = time.perf_counter() - start
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "peak_rss_mb": peak_kb / 1024,
+                  "nodes": len(graph.nodes), "dependencies": len(graph.dependencies)}))
+"""
+
+
+def _run(graph_file: Path, streaming: bool):
+    root = Path(__file__).parent.parent
+    out = subprocess.run([sys.executable, "-c", _CHILD, str(graph_file), "1" if streaming else "0"],
+                         cwd=root, check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1:
+            graph_file = Path(sys.argv[1]).resolve()
+        else:
+            # Generate in a child too: Linux carries the parent's peak RSS across fork+exec
+            graph_file = Path(tmp) / "nx-output.json"
+            subprocess.run([sys.executable, "-c", _GENERATE, str(graph_file)],
+                           cwd=Path(__file__).parent.parent, check=True)
+
+        print(f"{graph_file.stat().st_size / 1e6:.1f} MB graph file")
+        print(f"{'loader':<10}{'load s':>10}{'peak RSS MB':>14}{'nodes':>10}{'deps':>10}")
+        for label, streaming in (("json.load", False), ("streaming", True)):
+            r = _run(graph_file, streaming)
+            print(f"{label:<10}{r['seconds']:>10.2f}{r['peak_rss_mb']:>14.1f}{r['nodes']:>10}{r['dependencies']:>10}")
+
+
+if __name__ == "__main__":
+    main()
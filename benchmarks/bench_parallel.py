@@ -0,0 +1,52 @@
+"""
+BulkAnalyzer speedup by worker count
+
+Times every entity's closure and the app x app common-dependency matrix
+with 1, 2, 4, ... workers up to the CPU count.
+Usage: python -m benchmarks.bench_parallel [NODE_COUNT] [MAX_WORKERS]
+"""
+
+import os
+import sys
+import time
+
+from benchmarks.synthetic_graph import generate_graph
+from benchmarks.bench_compact_graph import _nx_graph_from_dict
+from src.nx_graph_helper import NXGraphHelper
+from src.parallel_analysis import BulkAnalyzer
+
+
+def _time(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    node_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    helper = NXGraphHelper(_nx_graph_from_dict(generate_graph(node_count)))
+    entities = list(helper.entity_type_map)
+    apps = [name for name in entities if helper.entity_type_map[name] == "app"]
+
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+
+    print(f"{node_count} nodes, {len(apps)} apps, {os.cpu_count()} CPUs")
+    print(f"{'workers':<10}{'closures s':>12}{'speedup':>10}{'matrix s':>12}{'speedup':>10}")
+    base = None
+    for workers in counts:
+        # Pool start-up (and the snapshot write) is part of the measured time
+        with BulkAnalyzer(helper, workers=workers) as analyzer:
+            closures = _time(lambda: sum(1 for _ in analyzer.closures(entities)))
+        with BulkAnalyzer(helper, workers=workers) as analyzer:
+            matrix = _time(lambda: sum(1 for _ in analyzer.common_dependency_matrix(apps)))
+        base = base or (closures, matrix)
+        print(f"{workers:<10}{closures:>12.2f}{base[0] / closures:>10.2f}{matrix:>12.2f}{base[1] / matrix:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Cold start of the entry points: import time per module and time to the first prompt
+
+Every measurement runs in a fresh interpreter. Import times come from
+`python -X importtime` (cumulative time of the module's own line, so
+interpreter startup is excluded); time to prompt is the wall time from
+launching main.py until "Question: " is printed, and time to first answer
+adds one scripted question (NX_FAKE_LLM_SCRIPT, no API key needed), so
+work deferred past the prompt is still counted. Pass --root to measure
+another checkout, e.g. a worktree of an older commit, and --compare with
+the --output of that run to see the difference.
+
+Usage:
+  python -m benchmarks.bench_startup
+  python -m benchmarks.bench_startup --top 15
+  git worktree add /tmp/before HEAD~1
+  python -m benchmarks.bench_startup --root /tmp/before --output before.json
+  python -m benchmarks.bench_startup --compare before.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).parent.parent
+MODULES = ["main", "configs.llm_configs", "nx_cli", "src.nx_graph_helper"]
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+_GENERATE = """
+import sys
+from benchmarks.synthetic_graph import write_graph
+write_graph(sys.argv[1], int(sys.argv[2]))
+"""
+
+
+def import_times(root: Path, module: str) -> List[Tuple[int, str, int]]:
+    """(depth, module, cumulative µs) for every import made by `import module`"""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=root, check=True, capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            rows.append((len(match.group(3)) // 2, match.group(4), int(match.group(2))))
+    return rows
+
+
+def module_import_seconds(root: Path, module: str) -> float:
+    return next(us for depth, name, us in import_times(root, module) if depth == 0 and name == module) / 1e6
+
+
+def _read_until(stream, marker: bytes):
+    seen = b""
+    while not seen.endswith(marker):
+        byte = stream.read(1)
+        if not byte:
+            raise RuntimeError(f"main.py exited before printing {marker!r}: {seen[-200:]!r}")
+        seen += byte
+
+
+def time_to_prompt(root: Path, graph_file: Path, script_file: Path) -> Tuple[float, float]:
+    """(seconds until the first prompt, seconds until the answer to one question)"""
+    env = dict(os.environ, NX_FAKE_LLM_SCRIPT=str(script_file))
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "main.py", str(graph_file)], cwd=root, env=env,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        _read_until(process.stdout, b"Question: ")
+        prompt = time.perf_counter() - start
+        process.stdin.write(b"hello\n")
+        process.stdin.flush()
+        _read_until(process.stdout, b"Question: ")
+        answer = time.perf_counter() - start
+        process.stdin.write(b"exit\n")
+        process.stdin.flush()
+        process.wait(timeout=60)
+    finally:
+        if process.poll() is None:
+            process.kill()
+    return prompt, answer
+
+
+def run(root: Path, size: int, repeat: int) -> Dict[str, float]:
+    results = {}
+    for module in MODULES:
+        results[f"import/{module}"] = min(module_import_seconds(root, module) for _ in range(repeat))
+    with tempfile.TemporaryDirectory() as tmp:
+        graph_file = Path(tmp) / "nx-output.json"
+        script_file = Path(tmp) / "script.json"
+        subprocess.run([sys.executable, "-c", _GENERATE, str(graph_file), str(size)], cwd=ROOT, check=True)
+        script_file.write_text(json.dumps(["Hi there!"]))
+        runs = [time_to_prompt(root, graph_file, script_file) for _ in range(repeat)]
+    results["main/time_to_prompt"] = min(prompt for prompt, _ in runs)
+    results["main/time_to_first_answer"] = min(answer for _, answer in runs)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time and time to first prompt of the entry points")
+    parser.add_argument("--root", type=Path, default=ROOT, help="Checkout to measure (default: this one)")
+    parser.add_argument("--size", type=int, default=10000, help="Nodes in the synthetic graph (default: 10000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, the fastest counts (default: 5)")
+    parser.add_argument("--top", type=int, default=0, metavar="N", help="Also list the N slowest imports of main")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    root = args.root.resolve()
+    results = run(root, args.size, args.repeat)
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else {}
+    print(f"{'benchmark':<34} {'ms':>9}" + (f" {'baseline':>9} {'speedup':>8}" if baseline else ""))
+    for name, seconds in results.items():
+        line = f"{name:<34} {seconds * 1000:>9.1f}"
+        if name in baseline:
+            line += f" {baseline[name] * 1000:>9.1f} {baseline[name] / max(seconds, 1e-9):>7.1f}x"
+        print(line)
+
+    if args.top:
+        rows = sorted(import_times(root, "main"), key=lambda row: row[2], reverse=True)
+        print("\nSlowest imports of main (cumulative):")
+        for depth, name, us in rows[:args.top]:
+            print(f"  {us / 1000:>9.1f} ms  {'  ' * depth}{name}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Benchmark suite: load, index build and every public NXGraphHelper query on synthetic graphs
+
+For each graph size a deterministic nx-output.json is generated, then every
+benchmark is timed and, in a separate run (tracemalloc slows allocation down),
+its peak traced memory is recorded. Results are written as JSON so runs can be
+compared across commits; --compare exits with status 1 when a benchmark got
+slower (or bigger) than the threshold allows.
+
+Usage:
+  python -m benchmarks.run_suite --sizes 1000 10000 --output bench.json
+  python -m benchmarks.run_suite --sizes 1000 10000 --compare bench.json --threshold 1.25
+  python -m benchmarks.run_suite --sizes 100000 --depth 30 --cycle-rate 0.01 --only load
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic_graph import write_graph
+from src.graph_cache import load_compact_graph
+from src.nx_graph_helper import NXGraphHelper
+from src.output_sink import OutputSink
+from src.utility import load_nx_graph_from_json
+
+ROOT = Path(__file__).parent.parent
+
+# Differences below this are timer noise, whatever the ratio
+MIN_SECONDS = 0.002
+MIN_BYTES = 64 * 1024
+
+
+class Context:
+    """Shared inputs for the benchmarks of one graph size"""
+
+    def __init__(self, graph_file: Path, sample: int, seed: int):
+        self.graph_file = graph_file
+        self.graph = load_nx_graph_from_json(str(graph_file))
+        self.node_count = len(self.graph.nodes)
+        names = [node.name for node in self.graph.nodes]
+        rng = random.Random(seed)
+        self.entities = rng.sample(names, min(sample, len(names)))
+        self.pairs = list(zip(self.entities, reversed(self.entities)))
+        self.apps = [node.name for node in self.graph.nodes if node.type == "app"]
+
+    def helper(self, **kwargs) -> NXGraphHelper:
+        # No LRU cache and no reports: every call measures the query itself
+        kwargs.setdefault("cache_entries", 0)
+        return NXGraphHelper(self.graph, output_sink=OutputSink(), **kwargs)
+
+
+class Benchmark:
+    """setup(ctx) -> state (not measured); run(ctx, state) is the measured part"""
+
+    def __init__(self, name: str, run: Callable, setup: Optional[Callable] = None,
+                 max_nodes: Optional[int] = None):
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda ctx: ctx.helper())
+        self.max_nodes = max_nodes
+
+
+def _each(method: str, args: Callable = lambda ctx, e: (e,)):
+    """Call helper.<method> once per sampled entity"""
+    def run(ctx, helper):
+        fn = getattr(helper, method)
+        for entity in ctx.entities:
+            fn(*args(ctx, entity))
+    return run
+
+
+def _each_pair(method: str):
+    def run(ctx, helper):
+        fn = getattr(helper, method)
+        for a, b in ctx.pairs:
+            fn(a, b)
+    return run
+
+
+def _cli(*args: str):
+    def run(ctx, _):
+        subprocess.run([sys.executable, "nx_cli.py", "--graph-file", str(ctx.graph_file), *args],
+                       cwd=ROOT, check=True, capture_output=True)
+    return run
+
+
+def _warm_snapshot(ctx):
+    load_compact_graph(str(ctx.graph_file))
+
+
+BENCHMARKS: List[Benchmark] = [
+    # Loading and index build
+    Benchmark("load/json", lambda ctx, _: load_nx_graph_from_json(str(ctx.graph_file)), setup=lambda ctx: None),
+    Benchmark("load/streaming", lambda ctx, _: load_nx_graph_from_json(str(ctx.graph_file), streaming=True),
+              setup=lambda ctx: None),
+    Benchmark("load/snapshot", lambda ctx, _: load_compact_graph(str(ctx.graph_file)), setup=_warm_snapshot),
+    Benchmark("build/helper", lambda ctx, _: ctx.helper(), setup=lambda ctx: None),
+    Benchmark("build/reachability_index", lambda ctx, helper: helper.build_reachability_index(), max_nodes=50000),
+    Benchmark("build/batch_reachability", lambda ctx, helper: helper.batch_reachability()),
+    # Queries, once per sampled entity (or pair)
+    Benchmark("query/get_all_entities", lambda ctx, helper: helper.get_all_entities()),
+    Benchmark("query/dfs_dependencies", _each("dfs_dependencies")),
+    Benchmark("query/all_dependencies", _each("all_dependencies")),
+    Benchmark("query/dependency_by_type", _each("dependency_by_type", lambda ctx, e: (e, "lib"))),
+    Benchmark("query/level_wise_dependencies", _each("level_wise_dependencies")),
+    Benchmark("query/level_wise_dependencies_with_types", _each("level_wise_dependencies_with_types")),
+    Benchmark("query/get_all_dependents", _each("get_all_dependents")),
+    Benchmark("query/group_dependents_by_type", _each("group_dependents_by_type")),
+    Benchmark("query/check_if_dependent", _each_pair("check_if_dependent")),
+    Benchmark("query/find_common_dependencies", _each_pair("find_common_dependencies")),
+    Benchmark("query/count_paths", _each_pair("count_paths")),
+    Benchmark("query/iter_paths", lambda ctx, helper: [list(islice(helper.iter_paths(a, b), 100))
+                                                       for a, b in ctx.pairs]),
+    Benchmark("query/affected", lambda ctx, helper: helper.affected(ctx.entities)),
+    Benchmark("query/usage_counts", lambda ctx, helper: helper.batch_reachability().usage_counts(ctx.apps, "lib"),
+              max_nodes=200000),
+    Benchmark("query/graph_report", lambda ctx, helper: helper.graph_report(), max_nodes=50000),
+    Benchmark("query/update_graph", lambda ctx, helper: helper.update_graph(ctx.graph)),
+    # Whole CLI process, including interpreter start and imports
+    Benchmark("cli/cold_json", _cli("--no-cache", "--output-sink", "off", "--check-dependency", "proj-0", "proj-1"),
+              setup=lambda ctx: None),
+    Benchmark("cli/warm_snapshot", _cli("--output-sink", "off", "--check-dependency", "proj-0", "proj-1"), setup=_warm_snapshot),
+]
+
+
+def _measure(ctx: Context, bench: Benchmark, repeat: int) -> Dict:
+    times = []
+    for _ in range(repeat):
+        state = bench.setup(ctx)
+        gc.collect()
+        start = time.perf_counter()
+        bench.run(ctx, state)
+        times.append(time.perf_counter() - start)
+
+    result = {"seconds": min(times)}
+    if not bench.name.startswith("cli/"):
+        state = bench.setup(ctx)
+        gc.collect()
+        tracemalloc.start()
+        bench.run(ctx, state)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_bytes"] = peak
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args) -> Dict:
+    shape = {"depth": args.depth, "cycle_rate": args.cycle_rate,
+             "type_mix": json.loads(args.type_mix) if args.type_mix else None}
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            graph_file = write_graph(Path(tmp) / f"nx-output-{size}.json", size, avg_deps=args.avg_deps,
+                                     seed=args.seed, **shape)
+            ctx = Context(graph_file, args.sample, args.seed)
+            for bench in BENCHMARKS:
+                if args.only and not any(bench.name.startswith(prefix) for prefix in args.only):
+                    continue
+                if bench.max_nodes is not None and size > bench.max_nodes:
+                    continue
+                result = _measure(ctx, bench, args.repeat)
+                results[f"{size}/{bench.name}"] = result
+                peak = f"{result['peak_bytes'] / 1e6:>10.1f}" if "peak_bytes" in result else f"{'-':>10}"
+                print(f"{size:>8} {bench.name:<45}{result['seconds'] * 1000:>12.2f}{peak}", flush=True)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "params": {"sizes": args.sizes, "avg_deps": args.avg_deps, "seed": args.seed,
+                       "sample": args.sample, "repeat": args.repeat, **shape},
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Benchmarks whose time or peak memory grew by more than threshold (a ratio) over the baseline"""
+    regressions = []
+    for key, result in current["results"].items():
+        old = baseline["results"].get(key)
+        if old is None:
+            continue
+        for metric, floor in (("seconds", MIN_SECONDS), ("peak_bytes", MIN_BYTES)):
+            if metric not in result or metric not in old:
+                continue
+            if result[metric] > old[metric] * threshold and result[metric] - old[metric] > floor:
+                regressions.append(f"{key} {metric}: {old[metric]:.4g} -> {result[metric]:.4g} "
+                                   f"(x{result[metric] / max(old[metric], 1e-12):.2f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NXGraphHelper benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Node counts (1k-1M)")
+    parser.add_argument("--avg-deps", type=float, default=4.0, help="Edge density: average edges per node")
+    parser.add_argument("--depth", type=int, help="Number of layers (caps the longest dependency chain)")
+    parser.add_argument("--cycle-rate", type=float, default=0.0, help="Fraction of nodes with a back edge")
+    parser.add_argument("--type-mix", help='Type weights as JSON, e.g. \'{"app": 1, "lib": 8, "e2e": 1}\'')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample", type=int, default=20, help="Entities per per-entity query benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (the fastest counts)")
+    parser.add_argument("--only", nargs="+", metavar="PREFIX", help="Only benchmarks starting with PREFIX")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", metavar="BASELINE", help="Results JSON to check for regressions against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Allowed slowdown ratio (default: 1.25)")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'benchmark':<45}{'ms':>12}{'peak MB':>10}")
+    current = run_suite(args)
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over x{args.threshold} vs {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions over x{args.threshold} vs {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Deterministic synthetic Nx graphs shaped like nx-output.json
+"""
+
+import json
+import random
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+def _node_data(name: str, payload_files: int) -> Dict:
+    """Project data shaped like Nx's: targets, options and a file list"""
+    return {
+        "root": f"packages/{name}",
+        "sourceRoot": f"packages/{name}/src",
+        "targets": {
+            "build": {"executor": "@nx/angular:ng-packagr-lite", "options": {"project": f"packages/{name}/ng-package.json"}},
+            "test": {"executor": "@nx/jest:jest", "options": {"jestConfig": f"packages/{name}/jest.config.ts"}},
+        },
+        "files": [{"file": f"packages/{name}/src/lib/file-{k}.ts", "hash": f"{k:016x}"} for k in range(payload_files)],
+    }
+
+
+def _types(node_count: int, seed: int, type_mix: Optional[Dict[str, float]]) -> List[str]:
+    if type_mix is None:
+        # 5% apps, 5% e2e, the rest libs, interleaved
+        return ["app" if i % 20 == 0 else "e2e" if i % 20 == 1 else "lib" for i in range(node_count)]
+    # Separate stream so the edges do not depend on the type mix
+    rng = random.Random(seed + 1)
+    return rng.choices(list(type_mix), weights=list(type_mix.values()), k=node_count)
+
+
+def iter_graph(node_count: int, avg_deps: float = 4.0, seed: int = 0, payload_files: int = 0,
+               depth: Optional[int] = None, cycle_rate: float = 0.0,
+               type_mix: Optional[Dict[str, float]] = None) -> Iterator[Tuple[str, Dict, List[Dict]]]:
+    """
+    Yield (name, node, dependencies) per project, one at a time, so huge graphs never sit in memory.
+    Edges point from each node to later ones (a DAG) with roughly avg_deps per node. depth splits
+    the nodes into that many layers with edges only into later layers, capping the longest chain
+    at depth - 1. cycle_rate is the fraction of nodes given one extra edge back to an earlier node.
+    type_mix maps type -> weight (default: 5% app, 5% e2e, 90% lib).
+    """
+    rng = random.Random(seed)
+    names = [f"proj-{i}" for i in range(node_count)]
+    types = _types(node_count, seed, type_mix)
+
+    for i, name in enumerate(names):
+        data = _node_data(name, payload_files) if payload_files else {"root": f"packages/{name}"}
+        node = {"name": name, "type": types[i], "data": data}
+        # First node of the next layer: edges never stay inside a layer
+        first = i + 1 if depth is None else max(i + 1, -(-(i * depth // node_count + 1) * node_count // depth))
+        deps = []
+        if first < node_count:
+            for _ in range(rng.randint(0, int(avg_deps * 2))):
+                j = rng.randrange(first, node_count)
+                deps.append({"source": name, "target": names[j], "type": "static"})
+        if cycle_rate and i > 0 and rng.random() < cycle_rate:
+            deps.append({"source": name, "target": names[rng.randrange(i)], "type": "dynamic"})
+        yield name, node, deps
+
+
+def generate_graph(node_count: int, avg_deps: float = 4.0, seed: int = 0, payload_files: int = 0,
+                   **shape) -> Dict:
+    """
+    Layered DAG of apps, libs and e2e projects with roughly avg_deps edges per node.
+    payload_files > 0 adds a realistic per-node data payload with that many file entries.
+    shape: depth, cycle_rate and type_mix, see iter_graph.
+    """
+    nodes = {}
+    dependencies = {}
+    for name, node, deps in iter_graph(node_count, avg_deps, seed, payload_files, **shape):
+        nodes[name] = node
+        dependencies[name] = deps
+    return {"graph": {"nodes": nodes, "dependencies": dependencies}}
+
+
+def write_graph(path: str, node_count: int, avg_deps: float = 4.0, seed: int = 0, payload_files: int = 0,
+                **shape) -> Path:
+    """Write the graph as nx-output.json, streaming nodes and then dependencies"""
+    path = Path(path)
+    with path.open("w") as f:
+        for section in ("nodes", "dependencies"):
+            f.write('{"graph": {"nodes": {' if section == "nodes" else '}, "dependencies": {')
+            for k, (name, node, deps) in enumerate(iter_graph(node_count, avg_deps, seed, payload_files, **shape)):
+                if k:
+                    f.write(", ")
+                f.write(f"{json.dumps(name)}: {json.dumps(node if section == 'nodes' else deps)}")
+        f.write("}}}")
+    return path
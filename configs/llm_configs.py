@@ -1,28 +1,56 @@
-from langchain_ollama import ChatOllama
-from langchain_anthropic import ChatAnthropic
+import importlib
 import os
 from dotenv import load_dotenv
 
+# Module each provider's chat model comes from; only the configured one is ever imported
+PROVIDER_MODULES = {
+    "anthropic": "langchain_anthropic",
+    "ollama": "langchain_ollama",
+    "script": "src.fake_chat_model",
+}
+
 class LLMConfig:
     load_dotenv()
-    def __init__(self):
-        self.llm = self._intialize_anthropic_llm()
-    
+    def __init__(self, llm=None, provider=None, script=None):
+        # An injected model (e.g. ScriptedChatModel) replaces the configured one; a script
+        # path (see ScriptedChatModel.from_script) selects the offline scripted model
+        self.llm = llm
+        self.script = script
+        self.provider = "script" if script else (provider or os.getenv("NX_LLM_PROVIDER", "anthropic"))
+        if self.provider not in PROVIDER_MODULES:
+            raise ValueError(f"Unknown LLM provider '{self.provider}', expected one of {list(PROVIDER_MODULES)}")
+
+    def preload(self):
+        """Import the provider package ahead of get_llm, e.g. from a background thread"""
+        if self.llm is None:
+            importlib.import_module(PROVIDER_MODULES[self.provider])
+
     def _initialize_llm(self):
+        from langchain_ollama import ChatOllama
         llm = ChatOllama(
             model="llama3.2",
             temperature=0.1,  # Not 0, might cause issuesa
             num_predict=1024,
         )
         return llm
-    
+
     def get_llm(self):
+        # The client is built on first use, so startup does not pay for the provider import
+        if self.llm is None:
+            if self.provider == "script":
+                from src.fake_chat_model import ScriptedChatModel
+                self.llm = ScriptedChatModel.from_script(self.script)
+            elif self.provider == "ollama":
+                self.llm = self._initialize_llm()
+            else:
+                self.llm = self._intialize_anthropic_llm()
         return self.llm
-    
+
     def get_llm_with_tools(self, tools):
-        return self.llm.bind_tools(tools)
-    
+        return self.get_llm().bind_tools(tools)
+
     def _intialize_anthropic_llm(self):
+        from langchain_anthropic import ChatAnthropic
         llm = ChatAnthropic(
             model="claude-3-5-sonnet-20240620",
             temperature=0.1,
@@ -1,48 +1,78 @@
 # configs/direct_tools.py
+from itertools import islice
+from typing import Callable, Optional
 from langchain_core.tools import tool
 from src.nx_graph_helper import NXGraphHelper
+from src.result_encoder import DEFAULT_BUDGET_CHARS, EncodeStats, encode_result
 
-def create_nx_tools(nx_helper: NXGraphHelper):
-    """Create tools directly from nx_helper"""
+# Paths enumerated per page of find_all_paths_between_source_and_target,
+# and at most written to its CSV side output
+PATH_WINDOW = 500
+CSV_MAX_PATHS = 10_000
+
+# Tools that write a side output their result refers to: not served from a
+# result cache, which would skip the write
+SIDE_OUTPUT_TOOLS = ("find_all_paths_between_source_and_target",)
+
+
+def create_nx_tools(nx_helper: NXGraphHelper, budget_chars: int = DEFAULT_BUDGET_CHARS,
+                    report: Optional[Callable[[str, EncodeStats], None]] = None):
+    """
+    Create tools directly from nx_helper.
+    List results are encoded by encode_result: per-type counts, then samples
+    up to budget_chars, then a cursor the LLM can pass back for the next page.
+    report(tool_name, stats) is called with the size of every encoded result.
+    """
+
+    def encoded(tool_name, result, cursor, **kwargs):
+        text, stats = encode_result(result, budget_chars, cursor=max(0, cursor), **kwargs)
+        if report is not None:
+            report(tool_name, stats)
+        return text
     
     @tool
-    def get_all_dependencies(entity: str) -> str:
+    def get_all_dependencies(entity: str, cursor: int = 0) -> str:
         """Get all dependencies of an entity
         Args:
             entity: The entity string to get the dependencies of.
+            cursor: Continuation cursor from a previous call's next_cursor (default 0).
         Returns:
-            A string representation of the dependencies which is grouped by type in dict.
+            JSON with the total, counts per type, dependencies sampled across types and next_cursor.
         """
-        return str(nx_helper.all_dependencies(entity))
+        return encoded("get_all_dependencies", nx_helper.all_dependencies(entity), cursor)
     
     @tool
-    def get_dependencies_by_type(entity: str, target_type: str) -> str:
+    def get_dependencies_by_type(entity: str, target_type: str, cursor: int = 0) -> str:
         """Get dependencies of a specific type for an entity
         Args:
             entity: The entity string to get the dependencies of.
             target_type: The type string of the dependencies to get.
+            cursor: Continuation cursor from a previous call's next_cursor (default 0).
         Returns:
-            A string representation of the dependencies which is grouped by type in list.
+            JSON with the total, the dependencies that fit and next_cursor.
         """
-        return str(nx_helper.dependency_by_type(entity, target_type))
+        return encoded("get_dependencies_by_type", nx_helper.dependency_by_type(entity, target_type), cursor)
     
     @tool
-    def list_all_entities() -> str:
+    def list_all_entities(cursor: int = 0) -> str:
         """List all entities in the graph grouped by type
+        Args:
+            cursor: Continuation cursor from a previous call's next_cursor (default 0).
         Returns:
-            A string representation of the entities which is Dict[str, List[str]].
+            JSON with the total, counts per type, entities sampled across types and next_cursor.
         """
-        return str(nx_helper.get_all_entities())
+        return encoded("list_all_entities", nx_helper.get_all_entities(), cursor)
     
     @tool
-    def get_dependents_by_type(target_entity: str) -> str:
+    def get_dependents_by_type(target_entity: str, cursor: int = 0) -> str:
         """Get all entities that depend on a target entity, grouped by type
         Args:
             target_entity: The entity string to get the dependents of.
+            cursor: Continuation cursor from a previous call's next_cursor (default 0).
         Returns:
-            A string representation of the dependents which is Dict[str, List[str]].
+            JSON with the total, counts per type, dependents sampled across types and next_cursor.
         """
-        return str(nx_helper.group_dependents_by_type(target_entity))
+        return encoded("get_dependents_by_type", nx_helper.group_dependents_by_type(target_entity), cursor)
     
     @tool
     def check_dependency_relationship(source: str, target: str) -> str:
@@ -57,65 +87,79 @@ def create_nx_tools(nx_helper: NXGraphHelper):
         return f"{source} {'depends on' if result else 'does NOT depend on'} {target}"
     
     @tool
-    def find_common_dependencies(entity1: str, entity2: str) -> str:
+    def find_common_dependencies(entity1: str, entity2: str, cursor: int = 0) -> str:
         """Find common dependencies between two entities
         Args:
             entity1: The first entity string.
             entity2: The second entity string.
+            cursor: Continuation cursor from a previous call's next_cursor (default 0).
         Returns:
-            A string representation of common dependencies grouped by type.
+            JSON with the total, counts per type, common dependencies sampled across types and next_cursor.
         """
-        return str(nx_helper.find_common_dependencies(entity1, entity2))
+        return encoded("find_common_dependencies", nx_helper.find_common_dependencies(entity1, entity2), cursor)
     
     @tool
-    def find_all_paths_between_source_and_target(source: str, target: str) -> str:
+    def find_all_paths_between_source_and_target(source: str, target: str, cursor: int = 0) -> str:
         """Find all paths from source to target entity and create a CSV file
         Args:
             source: The source entity string to start the path search from.
             target: The target entity string to find paths to.
+            cursor: Continuation cursor from a previous call's next_cursor (default 0).
         Returns:
-            A string representation of all paths found and CSV file creation status.
+            Notes on the CSV file, then JSON with the number of paths, the paths that fit and next_cursor.
         """
-        paths = nx_helper.find_all_paths_to_csv(source, target)
-        if not paths:
+        cursor = max(0, cursor)
+        # The total comes from the path-count DP, never from enumerating every path
+        count, exact = nx_helper.count_paths(source, target)
+        if exact and count == 0:
             return f"No paths found from '{source}' to '{target}'. No CSV file created."
-        
-        # Format the response with path information
-        path_strings = []
-        for i, path in enumerate(paths, 1):
-            path_strings.append(f"Path {i}: {' -> '.join(path)}")
-        
-        csv_filename = f"path_{source}_{target}.csv"
-        
-        response = [
-            f"Found {len(paths)} path(s) from '{source}' to '{target}':",
-            "",
-            *path_strings,
-            "",
-            f"CSV file created: {csv_filename}"
-        ]
-        
-        return "\n".join(response)
+
+        notes = []
+        if cursor == 0:
+            # Side output for the user, capped; the first page comes from the same enumeration
+            written, paths = nx_helper.stream_paths_to_csv(source, target, max_paths=CSV_MAX_PATHS, keep=PATH_WINDOW)
+            if not written:
+                return f"No paths found from '{source}' to '{target}'. No CSV file created."
+            if written == CSV_MAX_PATHS and (not exact or count > written):
+                notes.append(f"CSV file path_{source}_{target}.csv holds only the first {written} paths (capped)")
+            else:
+                notes.append(f"All paths are in path_{source}_{target}.csv")
+        elif exact and cursor >= count:
+            paths = []
+        else:
+            paths = list(islice(nx_helper.iter_paths(source, target), cursor, cursor + PATH_WINDOW))
+        total = count if exact else max(count, cursor + len(paths))
+        if not exact:
+            notes.append("Cycles lie between source and target: the total is a lower bound")
+
+        lines = [" -> ".join(path) for path in paths]
+        # What listing every path used to cost, extrapolated from the window
+        full_chars = sum(len(line) + 10 for line in lines) * total // max(len(lines), 1)
+        text = encoded("find_all_paths_between_source_and_target", lines, cursor,
+                       label="paths", offset=cursor, total=total, full_chars=full_chars)
+        return "\n".join(notes + [text])
     
     @tool
-    def get_level_wise_dependencies(entity: str) -> str:
+    def get_level_wise_dependencies(entity: str, cursor: int = 0) -> str:
         """Get dependencies organized by levels (BFS traversal)
         Args:
             entity: The entity string to get level-wise dependencies of.
+            cursor: Continuation cursor from a previous call's next_cursor (default 0).
         Returns:
-            A string representation of dependencies organized by levels.
+            JSON with the total, counts per level, dependencies sampled across levels and next_cursor.
         """
-        return str(nx_helper.level_wise_dependencies(entity))
+        return encoded("get_level_wise_dependencies", nx_helper.level_wise_dependencies(entity), cursor)
     
     @tool
-    def get_level_wise_dependencies_with_types(entity: str) -> str:
+    def get_level_wise_dependencies_with_types(entity: str, cursor: int = 0) -> str:
         """Get level-wise dependencies grouped by type at each level
         Args:
             entity: The entity string to get typed level-wise dependencies of.
+            cursor: Continuation cursor from a previous call's next_cursor (default 0).
         Returns:
-            A string representation of level-wise dependencies grouped by type.
+            JSON with the total, counts per level and type, dependencies sampled across them and next_cursor.
         """
-        return str(nx_helper.level_wise_dependencies_with_types(entity))
+        return encoded("get_level_wise_dependencies_with_types", nx_helper.level_wise_dependencies_with_types(entity), cursor)
     return [
         get_all_dependencies,
         get_dependencies_by_type,
@@ -1,95 +1,234 @@
 from configs.llm_configs import LLMConfig
-from configs.nx_tools import create_nx_tools
-from prompts.prompt_config import create_nx_prompt_template
-from src.nx_graph_helper import NXGraphHelper
-from src.tool_executor import ToolExecutor
-from src.utility import load_nx_graph_from_json
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+from src.result_encoder import DEFAULT_BUDGET_CHARS
+from functools import cached_property
 import json
 import os
 import sys
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-def should_use_tools(query, llm):
-    """Use LLM to decide if tools are needed"""
-    classification_prompt = """
-    You are a helpful assistant that determines if a user query requires using graph analysis tools.
-
-    **When to Use Tools:**
-    - Questions about specific entities (apps, libraries, e2e tests)
-    - Questions about dependencies between entities
-    - Questions about graph structure or analysis
-    - Questions that require examining the actual graph data
-    In above cases,
-    Respond with only "YES" if the query requires graph analysis tools (finding nodes, edges, paths, etc.).
-
-    **When NOT to Use Tools:**
-    - Greetings (hello, hi, etc.)
-    - Questions about your role or capabilities
-    - General questions about NX or dependency graphs (concept explanations)
-    In above cases,
-    Respond with only "NO" if it's a simple greeting, general conversation, or doesn't need graph analysis.
-    
-    Query: {query}
-    
-    Answer:"""
-    
-    response = llm.invoke(classification_prompt.format(query=query))
-    return response.content.strip().upper() == "YES"
+# Tool-call rounds per question, and seconds each tool call may take
+MAX_TOOL_ROUNDS = int(os.getenv("NX_MAX_TOOL_ROUNDS", "3"))
+TOOL_TIMEOUT = float(os.getenv("NX_TOOL_TIMEOUT", "30"))
+# Characters a list-valued tool result may take before it is paged (about 4 per token)
+TOOL_BUDGET_CHARS = int(os.getenv("NX_TOOL_BUDGET", str(DEFAULT_BUDGET_CHARS)))
+
+# Streamed replies and tool reports share stdout; reports are printed from the tool threads
+_stdout_lock = threading.Lock()
+_mid_line = False
+
+def print_text(text):
+    """Print streamed text as it arrives, without ending the line"""
+    global _mid_line
+    with _stdout_lock:
+        print(text, end="", flush=True)
+        _mid_line = not text.endswith("\n")
+
+def print_line(text=""):
+    """Print text on a line of its own, ending a streamed line first if one is open"""
+    global _mid_line
+    with _stdout_lock:
+        if _mid_line:
+            print()
+        if text:
+            print(text, flush=True)
+        _mid_line = False
+
+def print_stream(label):
+    """on_text callback printing streamed text after label, which is printed with the first token"""
+    started = False
+
+    def on_text(text):
+        nonlocal started
+        if not started:
+            print_text(f"{label}: ")
+            started = True
+        print_text(text)
+
+    def end():
+        if started:
+            print_line()
+
+    return on_text, end
+
+def stream_reply(model, model_input, timer, label, tool_executor=None):
+    """Stream one reply to stdout; tool calls start on tool_executor while the rest still streams"""
+    from src.streaming import stream_message
+
+    on_text, end = print_stream(label)
+    reply, tool_results = stream_message(model, model_input, timer, on_text, tool_executor)
+    end()
+    return reply, tool_results
+
+def run_tool_rounds(query, ai_response, tool_results, llm, llm_with_tools, tool_executor, timer,
+                    max_rounds=MAX_TOOL_ROUNDS):
+    """
+    Send the results of every tool call of ai_response (already started while it streamed,
+    see ToolCallDispatcher) back in one follow-up request and repeat while the model asks for
+    more tools, up to max_rounds rounds; the last follow-up goes to the plain LLM so it has to answer
+    """
+    from langchain_core.messages import HumanMessage, ToolMessage
+
+    messages = [HumanMessage(content=query), ai_response]
+    for round_ in range(1, max_rounds + 1):
+        if not ai_response.tool_calls:
+            break
+        print(f"Tool round {round_}: {', '.join(call['name'] for call in ai_response.tool_calls)}")
+        for call in ai_response.tool_calls:
+            messages.append(ToolMessage(content=json.dumps(tool_results[call["id"]]), tool_call_id=call["id"]))
+        last = round_ == max_rounds
+        ai_response, tool_results = stream_reply(llm if last else llm_with_tools, messages, timer,
+                                                 "Response", None if last else tool_executor)
+        messages.append(ai_response)
+    return ai_response
+
+class Session:
+    """
+    What the interactive loop needs, built on first use so the prompt shows up at once:
+    start() loads the graph in a background thread while the first question is typed (then
+    imports the LLM provider), and the LLM client, tools, tool cache and router are only
+    created when a question needs them
+    """
+
+    def __init__(self, graph_file):
+        self.graph_file = graph_file
+        self.tokens_saved = 0
+        self._report_lock = threading.Lock()
+        self.turns = []
+        # NX_FAKE_LLM_SCRIPT replays a scripted conversation instead of calling the API (offline testing);
+        # otherwise NX_LLM_PROVIDER picks the provider (anthropic or ollama)
+        self.llm_config = LLMConfig(script=os.getenv("NX_FAKE_LLM_SCRIPT"))
+        self._helper = None
+        self._load_error = None
+        self._loader = threading.Thread(target=self._load, name="nx-graph-loader", daemon=True)
+
+    def start(self):
+        self._loader.start()
+
+    def _load(self):
+        try:
+            from src.nx_graph_helper import NXGraphHelper
+            from src.utility import load_nx_graph_from_json
+            self._helper = NXGraphHelper(load_nx_graph_from_json(self.graph_file))
+        except BaseException as e:
+            # Raised again by nx_helper, on the main thread
+            self._load_error = e
+            return
+        self.llm_config.preload()
+
+    @property
+    def nx_helper(self):
+        """The graph helper, waiting for the background load if it is still running"""
+        self._loader.join()
+        if self._load_error is not None:
+            raise self._load_error
+        return self._helper
+
+    @property
+    def llm(self):
+        return self.llm_config.get_llm()
+
+    @cached_property
+    def tools(self):
+        from configs.nx_tools import create_nx_tools
+        return create_nx_tools(self.nx_helper, budget_chars=TOOL_BUDGET_CHARS, report=self.report_tool_output)
+
+    @cached_property
+    def llm_with_tools(self):
+        return self.llm_config.get_llm_with_tools(self.tools)
+
+    @cached_property
+    def tool_cache(self):
+        from configs.nx_tools import SIDE_OUTPUT_TOOLS
+        from src.tool_cache import ToolResultCache
+        # Repeated tool calls are answered from the cache; set NX_TOOL_CACHE to a file path to keep results across sessions
+        return ToolResultCache(self.nx_helper, persist_path=os.getenv("NX_TOOL_CACHE"),
+                               budget_chars=TOOL_BUDGET_CHARS, uncached_tools=SIDE_OUTPUT_TOOLS)
+
+    @cached_property
+    def tool_executor(self):
+        from src.tool_executor import ToolExecutor
+        return ToolExecutor(self.tools, cache=self.tool_cache, timeout=TOOL_TIMEOUT,
+                            resolve_entity=self.nx_helper.resolve_entity,
+                            suggest_entities=self.nx_helper.suggest_entities)
+
+    @cached_property
+    def prompt_template(self):
+        from prompts.prompt_config import create_nx_prompt_template
+        return create_nx_prompt_template()
+
+    @cached_property
+    def router(self):
+        from src.query_router import QueryRouter, should_use_tools
+        # Tools-or-not is decided locally; the LLM classifier only sees questions the rules are unsure about
+        return QueryRouter(self.nx_helper.entity_type_map, classify=lambda q: should_use_tools(q, self.llm))
+
+    def report_tool_output(self, tool_name, stats):
+        # Called from the tool threads while the reply may still be streaming
+        with self._report_lock:
+            self.tokens_saved += stats.tokens_saved
+        print_line(f"DEBUG - {tool_name} output: {stats}")
+
+    def close(self):
+        """Print the session statistics of whatever was used, then release the tool threads and cache"""
+        created = vars(self)
+        if "tool_cache" in created:
+            stats = self.tool_cache.stats()
+            print(f"Tool cache: {stats['hits'] + stats['disk_hits']}/{stats['lookups']} hits "
+                  f"({stats['hit_rate']:.0%}, {stats['disk_hits']} from disk)")
+        if "router" in created:
+            routing = self.router.stats()
+            saved = routing["seconds_saved"]
+            print(f"Router: {routing['local_decisions']} local, {routing['llm_decisions']} LLM decisions"
+                  + (f", ~{saved:.1f}s saved" if saved is not None else ""))
+        if "tools" in created:
+            print(f"Tool outputs: ~{self.tokens_saved} tokens saved by paging")
+        if self.turns:
+            from src.streaming import turn_summary
+            print(f"Latency: {turn_summary(self.turns)}")
+        if "tool_cache" in created:
+            self.tool_cache.close()
+        if "tool_executor" in created:
+            self.tool_executor.close()
 
 def debug_main():
     # Get graph file path from command line or use default
     graph_file = sys.argv[1] if len(sys.argv) > 1 else "nx-output.json"
     
-    # Load and setup
-    graph = load_nx_graph_from_json(graph_file)
-    nx_helper = NXGraphHelper(graph)
-    tools = create_nx_tools(nx_helper)
-    tool_executor = ToolExecutor(tools)
-    
-    llm_config = LLMConfig()
-    llm = llm_config.get_llm()
-    llm_with_tools = llm_config.get_llm_with_tools(tools)
-    prompt_template = create_nx_prompt_template()
-    
+    # The graph loads in the background; nothing else is set up before the first question
+    session = Session(graph_file)
+    session.start()
     
     while True:
         query = input("\nQuestion: ")
         if query.lower() == 'exit':
+            session.close()
             break
 
+        from src.streaming import TurnTimer
+
         # First, classify if tools are needed
-        if should_use_tools(query, llm):
+        timer = TurnTimer()
+        route = session.router.route(query)
+        print(f"DEBUG - Route: {route}")
+        if route.use_tools:
             print("DEBUG - Tools needed")
-            # Use LLM with tools
-            chain = prompt_template | llm_with_tools
-            ai_response = chain.invoke({"query": query})
-            print(f"AI MID tool Response: {ai_response.content}")
-            tool_name = ai_response.tool_calls[0]["name"]
-            print(f"Tool name: {tool_name}")
-            tool_args = ai_response.tool_calls[0]["args"]
-            tool_id = ai_response.tool_calls[0]["id"]
-
-            tool_result = tool_executor.execute_tool(tool_name, **tool_args)
-            # print(f"Tool result: {tool_result}")
-            tool_message = ToolMessage(content=json.dumps(tool_result), tool_call_id=tool_id)
-
-            final_response_messages = [
-                HumanMessage(content=query),
-                ai_response,
-                tool_message,
-            ]
-            final_response = llm.invoke(final_response_messages)
-            print(f"Final response: {final_response.content}")       
+            # Use LLM with tools; answers are streamed as they are generated
+            chain = session.prompt_template | session.llm_with_tools
+            ai_response, tool_results = stream_reply(chain, {"query": query}, timer, "AI MID tool Response",
+                                                     session.tool_executor)
+            run_tool_rounds(query, ai_response, tool_results, session.llm, session.llm_with_tools,
+                            session.tool_executor, timer)
         else:
             print("DEBUG - No tools needed")
             # Use regular LLM
-            chain = prompt_template | llm
-            ai_response = chain.invoke({"query": query})
-            print(f"Response: {ai_response.content}")
+            chain = session.prompt_template | session.llm
+            stream_reply(chain, {"query": query}, timer, "Response")
+        timer.finish()
+        session.turns.append(timer)
+        print(f"DEBUG - Turn: {timer}")
 if __name__ == "__main__":
     debug_main()
\ No newline at end of file
@@ -7,9 +7,16 @@ Direct access to dependency graph analysis without LLM requirements
 import argparse
 import json
 import sys
+import time
 from pathlib import Path
-from src.nx_graph_helper import NXGraphHelper
-from src.utility import load_nx_graph_from_json
+from src.graph_cache import load_compact_graph
+from src.graph_diff import diff_graphs
+from src.graph_report import CSV_HEADERS, SORT_KEYS, top_by_type
+from src.instrumentation import ProfiledSink, disable_profiling, enable_profiling, phase
+from src.nx_graph_helper import DEFAULT_MAX_PATHS, NXGraphHelper
+from src.output_sink import SINK_MODES, make_output_sink
+from src.query import OP_NAMES, handle_query_line
+from src.utility import load_nx_graph_from_json, resolve_graph_path, write_csv_output
 
 
 def print_formatted_dict(data, title=None):
@@ -33,6 +40,109 @@ def print_formatted_list(data, title=None):
         print("  No items found")
 
 
+def print_stats(nx_helper, file=None):
+    """Print graph size and closure cache counters"""
+    file = file or sys.stdout
+    cache = nx_helper.cache.stats()
+    print("\nStats:", file=file)
+    print(f"  Entities: {len(nx_helper.entity_type_map)}", file=file)
+    print(f"  Cache: {cache['hits']} hits, {cache['misses']} misses, {cache['evictions']} evictions, "
+          f"{cache['entries']} entries (~{cache['bytes'] / 1024:.1f} KB)", file=file)
+
+
+def print_report(nx_helper, sort_by="dependents", top=10):
+    """Print top-N entity metrics per type and export every entity to CSV"""
+    report = nx_helper.graph_report()
+    print(f"\nGraph report: {len(report)} entities, top {top} per type by {sort_by}")
+    for type_, rows in top_by_type(report, sort_by, top).items():
+        print(f"\n{type_}:")
+        print(f"  {'entity':<40}{'fan-in':>8}{'fan-out':>9}{'deps':>8}{'dependents':>12}{'depth':>7}")
+        for m in rows:
+            print(f"  {m.name:<40}{m.fan_in:>8}{m.fan_out:>9}{m.dependencies:>8}{m.dependents:>12}{m.depth:>7}")
+    write_csv_output("graph_report.csv", (m.to_row() for m in report), CSV_HEADERS)
+
+
+def run_bulk(nx_helper, analysis, types=None, workers=1):
+    """Run a whole-graph analysis on a process pool, streaming rows to CSV"""
+    # Imported here: the process pool machinery is only needed by --bulk
+    from src.parallel_analysis import BulkAnalyzer
+
+    entities = [name for name, type_ in nx_helper.entity_type_map.items()
+                if type_ is not None and (types is None or type_ in types)]
+    with BulkAnalyzer(nx_helper, workers=workers) as analyzer:
+        if analysis == "closures":
+            rows = ([entity, nx_helper.entity_type_map[entity], len(deps), ";".join(deps)]
+                    for entity, deps in analyzer.closures(entities))
+            write_csv_output("bulk_closures.csv", rows, ["Entity", "Type", "Dependency Count", "Dependencies"])
+        else:
+            rows = ([entity1, entity2, common, f"{overlap:.4f}"]
+                    for entity1, entity2, common, overlap in analyzer.common_dependency_matrix(entities))
+            write_csv_output("common_dependency_matrix.csv", rows,
+                             ["Entity 1", "Entity 2", "Common Dependencies", "Jaccard Overlap"])
+    print(f"\n{analysis}: {len(entities)} entities, {analyzer.workers} worker(s)")
+
+
+def print_usage_counts(nx_helper, source_type, target_type, top=10):
+    """How many source_type entities depend on each target_type entity"""
+    sources = [name for name, type_ in nx_helper.entity_type_map.items() if type_ == source_type]
+    engine = nx_helper.batch_reachability()
+    counts = engine.usage_counts(sources, target_type)
+    ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    print(f"\n{target_type} entities used by the {len(sources)} {source_type} entities "
+          f"({engine.backend} backend), top {top} of {len(ranked)}:")
+    for name, count in ranked[:top]:
+        print(f"  {name}: {count}")
+    write_csv_output(f"{target_type}_usage_by_{source_type}.csv", ranked, ["Entity", f"{source_type} count"])
+
+
+def print_diff(old_file, new_file, streaming=False):
+    """Print the nodes, types and edges that differ between two graph files"""
+    diff = diff_graphs(load_nx_graph_from_json(old_file, streaming=streaming),
+                       load_nx_graph_from_json(new_file, streaming=streaming))
+    print(f"\nGraph diff {old_file} -> {new_file}:")
+    if diff.is_empty():
+        print("  No changes")
+        return
+    sections = [
+        ("Added nodes", [f"{name} ({type_})" for name, type_ in diff.added_nodes.items()]),
+        ("Removed nodes", [f"{name} ({type_})" for name, type_ in diff.removed_nodes.items()]),
+        ("Type changes", [f"{name}: {old} -> {new}" for name, old, new in diff.type_changes]),
+        ("Added edges", [f"{source} -> {target}" for source, target in diff.added_edges]),
+        ("Removed edges", [f"{source} -> {target}" for source, target in diff.removed_edges]),
+    ]
+    for title, items in sections:
+        if items:
+            print(f"  {title} ({len(items)}): {', '.join(items)}")
+
+
+def run_batch(nx_helper, batch_file, timing=False, graph_file=None):
+    """Answer one JSON query per input line with one JSON result per output line"""
+    interactive = batch_file == "-"
+    stream = sys.stdin if interactive else open(batch_file, "r")
+    count = 0
+    errors = 0
+    start = time.perf_counter()
+    try:
+        for line in stream:
+            if not line.strip():
+                continue
+            response = handle_query_line(nx_helper, line, graph_file)
+            count += 1
+            errors += not response["ok"]
+            sys.stdout.write(json.dumps(response) + "\n")
+            if interactive:
+                sys.stdout.flush()
+    finally:
+        if not interactive:
+            stream.close()
+
+    if timing:
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed > 0 else float("inf")
+        print(f"Batch: {count} queries ({errors} errors) in {elapsed * 1000:.1f} ms, {rate:.0f} queries/s",
+              file=sys.stderr)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Analyze Nx dependency graphs without AI",
@@ -44,11 +154,24 @@ Examples:
   python nx_cli.py --dependencies-by-type my-app lib
   python nx_cli.py --dependents core-lib
   python nx_cli.py --check-dependency my-app core-lib
+  python nx_cli.py --affected core-lib ui-lib --types app e2e
+  python nx_cli.py --affected < changed-projects.txt
   python nx_cli.py --common-dependencies app1 app2
   python nx_cli.py --level-wise-dependencies my-app
   python nx_cli.py --level-wise-typed my-app
   python nx_cli.py --find-paths my-app core-lib
+  python nx_cli.py --find-paths my-app core-lib --max-paths 1000 --max-depth 8
+  python nx_cli.py --count-paths my-app core-lib
+  python nx_cli.py --report --sort-by depth --top 20
+  python nx_cli.py --bulk common-matrix --types app --workers 8
+  python nx_cli.py --usage-counts app lib --top 20
+  python nx_cli.py --diff old-nx-output.json nx-output.json
+  python nx_cli.py --batch queries.jsonl
+  python nx_cli.py --serve --reachability-index
+  python nx_cli.py --query '{"op": "check-dependency", "source": "my-app", "target": "core-lib"}'
   python nx_cli.py --graph-file /path/to/nx-output.json --list-entities
+  python nx_cli.py --streaming --dependencies my-app
+  python nx_cli.py --timing --rebuild-cache --dependencies my-app
         """
     )
     
@@ -57,6 +180,87 @@ Examples:
         default="nx-output.json",
         help="Path to nx-output.json file (default: nx-output.json)"
     )
+
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Load the graph file incrementally, skipping node data payloads (lower peak memory)"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the binary graph snapshot (<graph-file>.nxcache)"
+    )
+
+    parser.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="Re-parse the graph file and overwrite the binary graph snapshot"
+    )
+
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="Print graph load and query times"
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a per-phase (load, index build, query, output) and per-call breakdown to stderr"
+    )
+
+    parser.add_argument(
+        "--profile-dump",
+        metavar="FILE",
+        help="With --profile: also run cProfile and dump its stats to FILE (implies --profile)"
+    )
+
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print graph size and closure cache statistics after the query"
+    )
+
+    parser.add_argument(
+        "--reachability-index",
+        action="store_true",
+        help="Precompute the transitive closure (O(1) reachability, faster closures on repeated queries)"
+    )
+
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="Unix socket for --serve / --query (default: <graph-file>.sock)"
+    )
+
+    parser.add_argument(
+        "--tcp",
+        metavar="[HOST:]PORT",
+        help="Use localhost TCP instead of a Unix socket for --serve / --query"
+    )
+
+    parser.add_argument(
+        "--allow-remote",
+        action="store_true",
+        help="With --serve --tcp: allow a non-loopback HOST (the daemon has no authentication)"
+    )
+
+    parser.add_argument(
+        "--output-sink",
+        choices=SINK_MODES,
+        help="Where query text reports go: off, file (append to outputs/), buffered (background writer) "
+             "or jsonl (rotated outputs/nx-helper.jsonl). Default: file, or off with --batch/--serve/--query"
+    )
+
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024,
+        metavar="N",
+        help="Maximum number of cached closures / level maps (default: 1024, 0 disables)"
+    )
     
     # Main operations (mutually exclusive)
     group = parser.add_mutually_exclusive_group(required=True)
@@ -86,6 +290,13 @@ Examples:
         help="Get all entities that depend on this entity"
     )
     
+    group.add_argument(
+        "--affected",
+        nargs="*",
+        metavar="PROJECT",
+        help="Entities affected by changes to PROJECTs (they and all their dependents); reads one project per line from stdin when none are given"
+    )
+
     group.add_argument(
         "--check-dependency",
         nargs=2,
@@ -118,71 +329,282 @@ Examples:
         metavar=("SOURCE", "TARGET"),
         help="Find all paths from source to target (creates CSV file)"
     )
+
+    group.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run JSONL queries from FILE ('-' for stdin), one JSON result per line on stdout. "
+             f"Ops: {', '.join(OP_NAMES)}"
+    )
+
+    group.add_argument(
+        "--report",
+        action="store_true",
+        help="Rank every entity by fan-in/out, transitive dependencies/dependents and depth (writes graph_report.csv)"
+    )
+
+    group.add_argument(
+        "--bulk",
+        choices=["closures", "common-matrix"],
+        help="Whole-graph analysis on a process pool: every entity's closure, or common dependencies of every pair (filter with --types; writes CSV)"
+    )
+
+    group.add_argument(
+        "--usage-counts",
+        nargs=2,
+        metavar=("SOURCE_TYPE", "TARGET_TYPE"),
+        help="How many SOURCE_TYPE entities depend on each TARGET_TYPE entity, e.g. app lib (uses SciPy when installed)"
+    )
+
+    group.add_argument(
+        "--diff",
+        nargs=2,
+        metavar=("OLD_FILE", "NEW_FILE"),
+        help="Show added/removed nodes, type changes and added/removed edges between two graph files"
+    )
+
+    group.add_argument(
+        "--serve",
+        action="store_true",
+        help="Keep the graph loaded and answer JSON queries (batch format) on a local socket"
+    )
+
+    group.add_argument(
+        "--query",
+        metavar="JSON",
+        help="Send one batch-format JSON query to a running daemon (answered locally if none is running)"
+    )
+
+    group.add_argument(
+        "--count-paths",
+        nargs=2,
+        metavar=("SOURCE", "TARGET"),
+        help="Count paths from source to target without enumerating them"
+    )
+
+    parser.add_argument(
+        "--types",
+        nargs="+",
+        metavar="TYPE",
+        help="Only report entities of these types (with --affected and --bulk)"
+    )
+
+    parser.add_argument(
+        "--sort-by",
+        choices=list(SORT_KEYS),
+        default="dependents",
+        help="Metric to rank --report tables by (default: dependents)"
+    )
+
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="Entities per type in --report tables, or rows of --usage-counts (default: 10)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Worker processes for --bulk (default: 1, 0 = one per CPU)"
+    )
+
+    parser.add_argument(
+        "--max-paths",
+        type=int,
+        metavar="N",
+        default=DEFAULT_MAX_PATHS,
+        help=f"With --find-paths: stop after N paths (default: {DEFAULT_MAX_PATHS}; 0 = no limit)"
+    )
+
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        metavar="N",
+        help="With --find-paths: only paths with at most N edges"
+    )
     
     args = parser.parse_args()
+    # The daemon client/server (and asyncio) are only imported when used
+    if args.tcp or args.query or args.serve:
+        from src.query_server import is_loopback, parse_tcp_address, send_query, serve
+
+    if args.tcp:
+        host, port = parse_tcp_address(args.tcp)
+        socket_path = None
+        if args.serve and not args.allow_remote and not is_loopback(host):
+            print(f"Error: refusing to serve on non-loopback address {host}: anyone who can reach it "
+                  "could query the graph. Pass --allow-remote to do it anyway.")
+            sys.exit(1)
+    else:
+        host = port = None
+        socket_path = args.socket or str(resolve_graph_path(args.graph_file)) + ".sock"
+
+    if args.query:
+        # Thin client: no graph load when a daemon answers
+        try:
+            query = json.loads(args.query)
+        except json.JSONDecodeError as e:
+            print(f"Error: invalid --query JSON: {e}")
+            sys.exit(1)
+        start = time.perf_counter()
+        response = send_query(query, socket_path=socket_path, host=host, port=port)
+        if response is not None:
+            print(json.dumps(response))
+            if args.timing:
+                print(f"Timing: daemon round trip {(time.perf_counter() - start) * 1000:.2f} ms", file=sys.stderr)
+            return
     
+    profiler = enable_profiling(args.profile_dump) if args.profile or args.profile_dump else None
+    sink = None
     try:
-        # Load the graph
-        graph = load_nx_graph_from_json(args.graph_file)
-        nx_helper = NXGraphHelper(graph)
+        start = time.perf_counter()
+        if args.diff:
+            with phase("query"):
+                print_diff(*args.diff, streaming=args.streaming)
+            if args.timing:
+                print(f"\nTiming: diff {(time.perf_counter() - start) * 1000:.1f} ms")
+            return
+
+        # Load the graph, from the binary snapshot when it is still valid
+        with phase("load"):
+            if args.no_cache:
+                graph = load_nx_graph_from_json(args.graph_file, streaming=args.streaming)
+                load_mode = "no cache"
+            else:
+                graph, cache_hit = load_compact_graph(
+                    args.graph_file, rebuild=args.rebuild_cache, streaming=args.streaming
+                )
+                load_mode = "warm, cache hit" if cache_hit else "cold, cache written"
+        # Batch and daemon answers are returned as JSON; the text reports would only cost I/O
+        sink_mode = args.output_sink or ("off" if args.batch or args.serve or args.query else "file")
+        sink = make_output_sink(sink_mode)
+        if profiler is not None:
+            sink = ProfiledSink(sink, profiler)
+        with phase("index build"):
+            nx_helper = NXGraphHelper(graph, reachability_index=args.reachability_index,
+                                      cache_entries=args.cache_size, output_sink=sink)
+        load_time = time.perf_counter() - start
         
         # Execute the requested operation
-        if args.list_entities:
-            entities = nx_helper.get_all_entities()
-            print_formatted_dict(entities, "All Entities")
+        with phase("query"):
+            if args.serve:
+                if args.timing:
+                    print(f"Timing: load {load_time * 1000:.1f} ms ({load_mode})", file=sys.stderr)
+                serve(nx_helper, socket_path=socket_path, host=host, port=port,
+                      graph_file=args.graph_file, allow_remote=args.allow_remote)
+                return
+
+            if args.query:
+                # No daemon running, answer locally
+                print(json.dumps(handle_query_line(nx_helper, args.query, args.graph_file)))
+                return
+
+            if args.batch:
+                # stdout carries only JSONL results, reports go to stderr
+                if args.timing:
+                    print(f"Timing: load {load_time * 1000:.1f} ms ({load_mode})", file=sys.stderr)
+                run_batch(nx_helper, args.batch, timing=args.timing, graph_file=args.graph_file)
+                if args.stats:
+                    print_stats(nx_helper, file=sys.stderr)
+                return
+
+            if args.list_entities:
+                entities = nx_helper.get_all_entities()
+                print_formatted_dict(entities, "All Entities")
             
-        elif args.dependencies:
-            deps = nx_helper.all_dependencies(args.dependencies)
-            print_formatted_dict(deps, f"All Dependencies for '{args.dependencies}'")
+            elif args.dependencies:
+                deps = nx_helper.all_dependencies(args.dependencies)
+                print_formatted_dict(deps, f"All Dependencies for '{args.dependencies}'")
             
-        elif args.dependencies_by_type:
-            entity, dep_type = args.dependencies_by_type
-            deps = nx_helper.dependency_by_type(entity, dep_type)
-            print_formatted_list(deps, f"Dependencies of '{entity}' with type '{dep_type}'")
+            elif args.dependencies_by_type:
+                entity, dep_type = args.dependencies_by_type
+                deps = nx_helper.dependency_by_type(entity, dep_type)
+                print_formatted_list(deps, f"Dependencies of '{entity}' with type '{dep_type}'")
             
-        elif args.dependents:
-            dependents = nx_helper.group_dependents_by_type(args.dependents)
-            print_formatted_dict(dependents, f"Entities that depend on '{args.dependents}'")
+            elif args.dependents:
+                dependents = nx_helper.group_dependents_by_type(args.dependents)
+                print_formatted_dict(dependents, f"Entities that depend on '{args.dependents}'")
             
-        elif args.check_dependency:
-            source, target = args.check_dependency
-            result = nx_helper.check_if_dependent(source, target)
-            print(f"\n{source} {'depends on' if result else 'does NOT depend on'} {target}")
+            elif args.affected is not None:
+                changed = args.affected or [line.strip() for line in sys.stdin if line.strip()]
+                affected = nx_helper.affected(changed, args.types)
+                print_formatted_dict(affected, f"Entities affected by changes to {len(changed)} project(s)")
+
+            elif args.bulk:
+                run_bulk(nx_helper, args.bulk, args.types, args.workers or None)
+
+            elif args.usage_counts:
+                source_type, target_type = args.usage_counts
+                print_usage_counts(nx_helper, source_type, target_type, args.top)
+
+            elif args.report:
+                print_report(nx_helper, args.sort_by, args.top)
+
+            elif args.check_dependency:
+                source, target = args.check_dependency
+                result = nx_helper.check_if_dependent(source, target)
+                print(f"\n{source} {'depends on' if result else 'does NOT depend on'} {target}")
             
-        elif args.common_dependencies:
-            entity1, entity2 = args.common_dependencies
-            common = nx_helper.find_common_dependencies(entity1, entity2)
-            print_formatted_dict(common, f"Common dependencies between '{entity1}' and '{entity2}'")
+            elif args.common_dependencies:
+                entity1, entity2 = args.common_dependencies
+                common = nx_helper.find_common_dependencies(entity1, entity2)
+                print_formatted_dict(common, f"Common dependencies between '{entity1}' and '{entity2}'")
             
-        elif args.level_wise_dependencies:
-            level_deps = nx_helper.level_wise_dependencies(args.level_wise_dependencies)
-            print(f"\nLevel-wise Dependencies for '{args.level_wise_dependencies}':")
-            for level, deps in level_deps.items():
-                print(f"  Level {level} ({len(deps)}): {', '.join(deps)}")
+            elif args.level_wise_dependencies:
+                level_deps = nx_helper.level_wise_dependencies(args.level_wise_dependencies)
+                print(f"\nLevel-wise Dependencies for '{args.level_wise_dependencies}':")
+                for level, deps in level_deps.items():
+                    print(f"  Level {level} ({len(deps)}): {', '.join(deps)}")
                 
-        elif args.level_wise_typed:
-            typed_deps = nx_helper.level_wise_dependencies_with_types(args.level_wise_typed)
-            print(f"\nLevel-wise Dependencies with Types for '{args.level_wise_typed}':")
-            for level, type_dict in typed_deps.items():
-                print(f"  Level {level}:")
-                for dep_type, deps in type_dict.items():
-                    print(f"    {dep_type} ({len(deps)}): {', '.join(deps)}")
+            elif args.level_wise_typed:
+                typed_deps = nx_helper.level_wise_dependencies_with_types(args.level_wise_typed)
+                print(f"\nLevel-wise Dependencies with Types for '{args.level_wise_typed}':")
+                for level, type_dict in typed_deps.items():
+                    print(f"  Level {level}:")
+                    for dep_type, deps in type_dict.items():
+                        print(f"    {dep_type} ({len(deps)}): {', '.join(deps)}")
                     
-        elif args.find_paths:
-            source, target = args.find_paths
-            paths = nx_helper.find_all_paths_to_csv(source, target)
-            if paths:
-                print(f"\nFound {len(paths)} path(s) from '{source}' to '{target}':")
-                for i, path in enumerate(paths[:5], 1):  # Show first 5 paths
-                    print(f"  Path {i}: {' -> '.join(path)}")
-                if len(paths) > 5:
-                    print(f"  ... and {len(paths) - 5} more paths")
-                print(f"\nComplete results saved to CSV file: path_{source}_{target}.csv")
-            else:
-                print(f"\nNo paths found from '{source}' to '{target}'")
+            elif args.find_paths:
+                source, target = args.find_paths
+                # Paths are streamed to the CSV, only the first 5 are kept for display
+                max_paths = args.max_paths or None
+                count, paths = nx_helper.stream_paths_to_csv(
+                    source, target, max_paths=max_paths, max_depth=args.max_depth, keep=5
+                )
+                if count:
+                    print(f"\nFound {count} path(s) from '{source}' to '{target}':")
+                    for i, path in enumerate(paths, 1):
+                        print(f"  Path {i}: {' -> '.join(path)}")
+                    if count > len(paths):
+                        print(f"  ... and {count - len(paths)} more paths")
+                    if max_paths is not None and count == max_paths:
+                        print(f"  (stopped at --max-paths {max_paths}; --max-paths 0 lists them all)")
+                    print(f"\nResults saved to CSV file: path_{source}_{target}.csv")
+                else:
+                    print(f"\nNo paths found from '{source}' to '{target}'")
+
+            elif args.count_paths:
+                source, target = args.count_paths
+                count, exact = nx_helper.count_paths(source, target)
+                if exact:
+                    print(f"\n{count} path(s) from '{source}' to '{target}'")
+                else:
+                    print(f"\nAt least {count} path(s) from '{source}' to '{target}' "
+                          f"(cycles between them, counted over strongly connected components)")
+
+        if args.timing:
+            query_time = time.perf_counter() - start - load_time
+            print(f"\nTiming: load {load_time * 1000:.1f} ms ({load_mode}), query {query_time * 1000:.1f} ms")
+
+        if args.stats:
+            print_stats(nx_helper)
             
-    except FileNotFoundError:
-        print(f"Error: Graph file '{args.graph_file}' not found")
+    except FileNotFoundError as e:
+        print(f"Error: Graph file '{e.filename or args.graph_file}' not found")
         sys.exit(1)
     except json.JSONDecodeError:
         print(f"Error: Invalid JSON in graph file '{args.graph_file}'")
@@ -190,6 +612,12 @@ Examples:
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        if sink is not None:
+            sink.close()
+        if profiler is not None:
+            disable_profiling()
+            profiler.report()
 
 
 if __name__ == "__main__":
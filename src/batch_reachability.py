@@ -0,0 +1,193 @@
+from importlib.util import find_spec
+from typing import Dict, List, Optional, Sequence
+from src.compact_graph import CompactGraph
+from src.reachability import _decode
+
+# numpy and scipy take a few hundred ms to import: they are loaded by the
+# first SparseBatchReachability, not when this module is imported
+np = None
+sparse = None
+
+SPARSE_AVAILABLE = find_spec("numpy") is not None and find_spec("scipy") is not None
+
+
+def _import_sparse():
+    global np, sparse
+    if sparse is None:
+        import numpy
+        from scipy import sparse as scipy_sparse
+        np, sparse = numpy, scipy_sparse
+
+
+def source_closure_bits(graph: CompactGraph, start: int) -> int:
+    '''Transitive dependencies of node start as a bitset over node ids, start excluded'''
+    offsets, targets = graph.fwd_offsets, graph.fwd_targets
+    marks = bytearray((len(graph.names) + 7) // 8)
+    marks[start >> 3] |= 1 << (start & 7)
+    stack = [start]
+    while stack:
+        u = stack.pop()
+        for v in targets[offsets[u]:offsets[u + 1]]:
+            if not marks[v >> 3] & (1 << (v & 7)):
+                marks[v >> 3] |= 1 << (v & 7)
+                stack.append(v)
+    marks[start >> 3] &= ~(1 << (start & 7))
+    return int.from_bytes(marks, "little")
+
+
+class BatchReachability:
+    '''
+    Closure questions over many source entities per call: common
+    dependencies of hundreds of entities, type-filtered closures, source x
+    target dependency matrices and "how many sources use each entity"
+    counts. This pure-Python backend builds one closure bitset per source;
+    SparseBatchReachability answers the same calls with SciPy when
+    available. Unknown entities have empty closures. Results are in node id
+    (graph declaration) order.
+    '''
+    backend = "python"
+
+    def __init__(self, graph: CompactGraph):
+        self.graph = graph
+
+    def _ids(self, entities: Sequence[str]) -> List[Optional[int]]:
+        return [self.graph.id_of(entity) for entity in entities]
+
+    def _type_code(self, type_: Optional[str]) -> Optional[int]:
+        if type_ is None:
+            return None
+        try:
+            return self.graph.type_names.index(type_)
+        except ValueError:
+            return -2  # matches no node, not even undeclared ones
+
+    def _names(self, ids: Sequence[int], type_: Optional[str] = None) -> List[str]:
+        names, types = self.graph.names, self.graph.types
+        code = self._type_code(type_)
+        return [names[i] for i in ids if code is None or types[i] == code]
+
+    def _closures(self, ids: List[Optional[int]]) -> List[int]:
+        return [source_closure_bits(self.graph, i) if i is not None else 0 for i in ids]
+
+    def dependencies(self, entities: Sequence[str], type_: Optional[str] = None) -> Dict[str, List[str]]:
+        '''Transitive dependencies of every entity, optionally only those of type_'''
+        closures = self._closures(self._ids(entities))
+        return {entity: self._names(_decode(bits), type_) for entity, bits in zip(entities, closures)}
+
+    def common_dependencies(self, entities: Sequence[str], type_: Optional[str] = None) -> List[str]:
+        '''Dependencies shared by all of entities'''
+        if not entities:
+            return []
+        common = -1
+        for bits in self._closures(self._ids(entities)):
+            common &= bits
+        return self._names(_decode(common), type_)
+
+    def usage_counts(self, sources: Sequence[str], type_: Optional[str] = None) -> Dict[str, int]:
+        '''For every entity (of type_) used by any source: how many sources depend on it'''
+        counts = [0] * len(self.graph.names)
+        for bits in self._closures(self._ids(sources)):
+            for i in _decode(bits):
+                counts[i] += 1
+        names, types = self.graph.names, self.graph.types
+        code = self._type_code(type_)
+        return {names[i]: count for i, count in enumerate(counts)
+                if count and (code is None or types[i] == code)}
+
+    def dependency_matrix(self, sources: Sequence[str], targets: Sequence[str]) -> List[List[bool]]:
+        '''matrix[s][t]: does sources[s] (transitively) depend on targets[t]'''
+        target_ids = self._ids(targets)
+        return [[t is not None and bool((bits >> t) & 1) for t in target_ids]
+                for bits in self._closures(self._ids(sources))]
+
+
+class SparseBatchReachability(BatchReachability):
+    '''
+    SciPy backend: the adjacency is a CSR matrix over the CompactGraph
+    arrays and all sources advance together, one sparse matrix product per
+    BFS level (frontier rows x adjacency), so the per-node work runs in C.
+    '''
+    backend = "scipy"
+
+    def __init__(self, graph: CompactGraph):
+        _import_sparse()
+        super().__init__(graph)
+        n = len(graph.names)
+        indices = np.asarray(graph.fwd_targets, dtype=np.int32)
+        indptr = np.asarray(graph.fwd_offsets, dtype=np.int32)
+        self.adjacency = sparse.csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                                           shape=(n, n))
+        self.types = np.asarray(graph.types, dtype=np.uint16)
+
+    def _reach(self, ids: List[Optional[int]]):
+        '''Boolean k x n CSR matrix: row r is the closure of ids[r], the source itself excluded'''
+        n = len(self.graph.names)
+        rows = [r for r, i in enumerate(ids) if i is not None]
+        cols = [ids[r] for r in rows]
+        start = sparse.csr_matrix((np.ones(len(rows), dtype=bool), (rows, cols)), shape=(len(ids), n))
+        visited = start
+        frontier = start.astype(np.float32)
+        while frontier.nnz:
+            # Products count paths: make them 0/1 before masking out visited nodes,
+            # or a visited node reached over two edges (2 > 1) would be new again
+            reached = (frontier @ self.adjacency).astype(bool)
+            new = reached > visited
+            visited = visited.maximum(new)
+            frontier = new.astype(np.float32)
+        reach = (visited > start).tocsr()
+        reach.sort_indices()
+        return reach
+
+    def _type_mask(self, type_: Optional[str]):
+        code = self._type_code(type_)
+        return None if code is None else self.types == code
+
+    def _filtered(self, ids, type_: Optional[str]) -> List[str]:
+        mask = self._type_mask(type_)
+        if mask is not None:
+            ids = ids[mask[ids]]
+        names = self.graph.names
+        return [names[i] for i in ids.tolist()]
+
+    def dependencies(self, entities: Sequence[str], type_: Optional[str] = None) -> Dict[str, List[str]]:
+        reach = self._reach(self._ids(entities))
+        return {entity: self._filtered(reach.indices[reach.indptr[r]:reach.indptr[r + 1]], type_)
+                for r, entity in enumerate(entities)}
+
+    def common_dependencies(self, entities: Sequence[str], type_: Optional[str] = None) -> List[str]:
+        if not entities:
+            return []
+        counts = np.asarray(self._reach(self._ids(entities)).sum(axis=0)).ravel()
+        return self._filtered(np.flatnonzero(counts == len(entities)), type_)
+
+    def usage_counts(self, sources: Sequence[str], type_: Optional[str] = None) -> Dict[str, int]:
+        counts = np.asarray(self._reach(self._ids(sources)).sum(axis=0)).ravel()
+        used = np.flatnonzero(counts)
+        mask = self._type_mask(type_)
+        if mask is not None:
+            used = used[mask[used]]
+        names = self.graph.names
+        return {names[i]: count for i, count in zip(used.tolist(), counts[used].tolist())}
+
+    def dependency_matrix(self, sources: Sequence[str], targets: Sequence[str]) -> List[List[bool]]:
+        target_ids = self._ids(targets)
+        known = [t for t, i in enumerate(target_ids) if i is not None]
+        matrix = np.zeros((len(sources), len(targets)), dtype=bool)
+        if known:
+            reach = self._reach(self._ids(sources))
+            matrix[:, known] = reach[:, [target_ids[t] for t in known]].toarray()
+        return matrix.tolist()
+
+
+def batch_reachability(graph: CompactGraph, backend: str = "auto") -> BatchReachability:
+    '''
+    Batch reachability engine for graph. backend is "auto" (SciPy when
+    installed, pure Python otherwise), "scipy" or "python".
+    '''
+    if backend == "scipy" and not SPARSE_AVAILABLE:
+        raise ImportError("The scipy backend needs numpy and scipy installed")
+    if backend == "scipy" or (backend == "auto" and SPARSE_AVAILABLE):
+        return SparseBatchReachability(graph)
+    if backend not in ("auto", "python"):
+        raise ValueError(f"Unknown backend '{backend}'. Use auto, scipy or python")
+    return BatchReachability(graph)
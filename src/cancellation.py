@@ -0,0 +1,31 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+_scope = threading.local()
+
+
+class Cancelled(Exception):
+    '''Raised by check_cancelled once the running call's cancel event is set'''
+
+
+@contextmanager
+def cancel_scope(event: Optional[threading.Event]) -> Iterator[None]:
+    '''
+    Make event the cancel signal of everything run on this thread inside the
+    block: long loops (path enumeration) call check_cancelled and stop once
+    it is set, e.g. by ToolExecutor after a tool call timed out.
+    '''
+    previous = getattr(_scope, "event", None)
+    _scope.event = event
+    try:
+        yield
+    finally:
+        _scope.event = previous
+
+
+def check_cancelled():
+    '''Raise Cancelled when the current thread's cancel event is set; cheap enough for inner loops'''
+    event = getattr(_scope, "event", None)
+    if event is not None and event.is_set():
+        raise Cancelled()
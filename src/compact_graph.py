@@ -0,0 +1,181 @@
+import hashlib
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+from src.model import NXDependency, NXEntity, NXGraph
+
+# Type code used for names that only appear as dependency endpoints
+# (e.g. npm:* targets) and have no node entry of their own. Type codes are
+# stored as array('H'), so entity types get the codes below it
+UNDECLARED_TYPE = 0xFFFF
+
+
+def _build_csr(keys: array, values: array, size: int):
+    '''
+    Counting sort of (key, value) edge pairs into CSR offset/target arrays.
+    The sort is stable, so each key keeps its values in input order.
+    '''
+    offsets = array('i', [0]) * (size + 1)
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    targets = array('i', [0]) * len(values)
+    cursor = offsets[:-1]
+    for key, value in zip(keys, values):
+        targets[cursor[key]] = value
+        cursor[key] += 1
+    return offsets, targets
+
+
+class CompactGraph:
+    '''
+    Memory-lean graph backend.
+    Project names are interned to dense integer ids, edges are stored as CSR
+    style array('i') offset/target arrays in both directions and entity types
+    as a 16-bit code column. NXGraphHelper accepts it in place of an NXGraph.
+    '''
+
+    def __init__(self, names: List[str], node_count: int, type_names: List[str], types: array,
+                 fwd_offsets: array, fwd_targets: array, rev_offsets: array, rev_targets: array):
+        self.names = names
+        self.node_count = node_count  # names[:node_count] are declared graph nodes
+        self.type_names = type_names
+        self.types = types
+        self.fwd_offsets = fwd_offsets
+        self.fwd_targets = fwd_targets
+        self.rev_offsets = rev_offsets
+        self.rev_targets = rev_targets
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(names)}
+
+    @classmethod
+    def from_nx_graph(cls, graph: NXGraph) -> "CompactGraph":
+        names = []
+        index = {}
+        type_codes = {}
+        types = array('H')
+
+        for node in graph.nodes:
+            if node.name in index:
+                continue
+            index[node.name] = len(names)
+            names.append(node.name)
+            code = type_codes.setdefault(node.type, len(type_codes))
+            if code == UNDECLARED_TYPE:
+                raise ValueError(f"Graph has more than {UNDECLARED_TYPE} entity types, "
+                                 "more than the compact graph's type column can hold")
+            types.append(code)
+        node_count = len(names)
+
+        sources = array('i')
+        targets = array('i')
+        for dep in graph.dependencies:
+            for name, ids in ((dep.source, sources), (dep.target, targets)):
+                i = index.get(name)
+                if i is None:
+                    i = index[name] = len(names)
+                    names.append(name)
+                    types.append(UNDECLARED_TYPE)
+                ids.append(i)
+
+        fwd_offsets, fwd_targets = _build_csr(sources, targets, len(names))
+        rev_offsets, rev_targets = _build_csr(targets, sources, len(names))
+        return cls(names, node_count, list(type_codes), types,
+                   fwd_offsets, fwd_targets, rev_offsets, rev_targets)
+
+    @property
+    def nodes(self) -> Iterator[NXEntity]:
+        '''Materialize NXEntity objects on demand, in declaration order'''
+        for i in range(self.node_count):
+            yield NXEntity(self.names[i], self.type_names[self.types[i]])
+
+    @property
+    def dependencies(self) -> Iterator[NXDependency]:
+        '''Materialize NXDependency objects on demand, grouped by source'''
+        names = self.names
+        for i in range(len(names)):
+            for t in self.fwd_targets[self.fwd_offsets[i]:self.fwd_offsets[i + 1]]:
+                yield NXDependency(names[i], names[t])
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.fwd_targets)
+
+    def content_hash(self) -> str:
+        '''
+        Hex digest of names, types and edges: equal for graphs with the same
+        content in the same order, whether built in memory or mapped from a snapshot
+        '''
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.node_count.to_bytes(8, "little"))
+        for blob in ("\0".join(self.names), "\0".join(self.type_names)):
+            digest.update(blob.encode("utf-8"))
+            digest.update(b"\1")
+        for section in (self.types, self.fwd_offsets, self.fwd_targets):
+            digest.update(section)
+        return digest.hexdigest()
+
+    def id_of(self, name: str) -> Optional[int]:
+        return self.index.get(name)
+
+    def type_of(self, i: int) -> Optional[str]:
+        code = self.types[i]
+        return None if code == UNDECLARED_TYPE else self.type_names[code]
+
+    def successors(self, i: int) -> array:
+        return self.fwd_targets[self.fwd_offsets[i]:self.fwd_offsets[i + 1]]
+
+    def predecessors(self, i: int) -> array:
+        return self.rev_targets[self.rev_offsets[i]:self.rev_offsets[i + 1]]
+
+    def type_map(self) -> "_TypeView":
+        return _TypeView(self)
+
+    def forward_map(self) -> "_AdjacencyView":
+        return _AdjacencyView(self, self.fwd_offsets, self.fwd_targets)
+
+    def reverse_map(self) -> "_AdjacencyView":
+        return _AdjacencyView(self, self.rev_offsets, self.rev_targets)
+
+
+class _TypeView(Mapping):
+    '''Read-only name -> type mapping over the type column'''
+
+    def __init__(self, graph: CompactGraph):
+        self._graph = graph
+
+    def __getitem__(self, name: str) -> str:
+        type_ = self._graph.type_of(self._graph.index[name])
+        if type_ is None:
+            raise KeyError(name)
+        return type_
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph.names[:self._graph.node_count])
+
+    def __len__(self) -> int:
+        return self._graph.node_count
+
+
+class _AdjacencyView(Mapping):
+    '''Read-only name -> [names] mapping over one CSR direction'''
+
+    def __init__(self, graph: CompactGraph, offsets: array, targets: array):
+        self._graph = graph
+        self._offsets = offsets
+        self._targets = targets
+
+    def __getitem__(self, name: str) -> List[str]:
+        i = self._graph.index[name]
+        names = self._graph.names
+        return [names[t] for t in self._targets[self._offsets[i]:self._offsets[i + 1]]]
+
+    def __iter__(self) -> Iterator[str]:
+        offsets = self._offsets
+        names = self._graph.names
+        return (names[i] for i in range(len(names)) if offsets[i] != offsets[i + 1])
+
+    def __len__(self) -> int:
+        offsets = self._offsets
+        return sum(1 for i in range(len(self._graph.names)) if offsets[i] != offsets[i + 1])
@@ -0,0 +1,103 @@
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name: str) -> str:
+    '''Case, separators and scope punctuation dropped: "Enterprise Search", "enterprise_search" -> "enterprisesearch"'''
+    return _SEPARATORS.sub("", name.lower())
+
+
+def _grams(key: str) -> set:
+    padded = f"^{key}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class EntityResolver:
+    '''
+    Maps loosely written project names ("SBV", "enterprise search",
+    "enterprize-serch") to the graph's canonical names. Exact names win,
+    then the normalized-name hash map, then approximate matching over a
+    character trigram index: candidates are gathered from the query's
+    rarest trigrams first, stopping at posting lists longer than
+    max_postings or max_touched ids in total, so lookups stay bounded with
+    100k+ projects, and the best few are scored by Dice similarity. A match
+    must reach min_score and beat the runner-up by margin, otherwise resolve
+    returns None rather than guess, and lookup lists the names it could mean.
+    Approximate lookups take about 0.7 ms on average over 100k names (p99
+    about 1-2 ms, single outliers several ms; benchmarks/bench_entity_resolver.py).
+    '''
+
+    def __init__(self, names: Sequence[str], min_score: float = 0.5, margin: float = 0.1,
+                 max_postings: int = 5000, max_touched: int = 4000, max_suggestions: int = 5):
+        self.names = list(names)
+        self.min_score = min_score
+        self.margin = margin
+        self.max_suggestions = max_suggestions
+        self.max_postings = max_postings
+        self.max_touched = max_touched
+        self._exact = set(self.names)
+        self._keys: List[str] = []
+        self._gram_counts: List[int] = []
+        self._by_key: Dict[str, List[int]] = defaultdict(list)
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for i, name in enumerate(self.names):
+            key = normalize_name(name)
+            self._keys.append(key)
+            self._by_key[key].append(i)
+            grams = _grams(key)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(i)
+
+    def resolve(self, name: str) -> Optional[str]:
+        '''Canonical entity name for name, or None when nothing (or more than one thing) matches'''
+        return self.lookup(name)[0]
+
+    def lookup(self, name: str) -> Tuple[Optional[str], List[str]]:
+        '''
+        (canonical name, []) when name matches one entity; (None, the names it
+        could mean) when several match about equally well, so the caller can
+        ask instead of guessing; (None, []) when nothing is close
+        '''
+        if name in self._exact:
+            return name, []
+        key = normalize_name(name)
+        ids = self._by_key.get(key)
+        if ids is not None:
+            return (self.names[ids[0]], []) if len(ids) == 1 else (None, [self.names[i] for i in ids])
+        matches = self.candidates(name, limit=self.max_suggestions)
+        if not matches or matches[0][1] < self.min_score:
+            return None, []
+        best = matches[0][1]
+        if len(matches) > 1 and best - matches[1][1] < self.margin:
+            return None, [match for match, score in matches if best - score < self.margin]
+        return matches[0][0], []
+
+    def candidates(self, name: str, limit: int = 5) -> List[Tuple[str, float]]:
+        '''Closest entity names by trigram Dice similarity, best first'''
+        key = normalize_name(name)
+        if not key:
+            return []
+        grams = _grams(key)
+        postings = sorted((self._postings[g] for g in grams if g in self._postings), key=len)
+        counts = Counter()
+        touched = 0
+        complete = True
+        for ids in postings:
+            if counts and (len(ids) > self.max_postings or touched + len(ids) > self.max_touched):
+                complete = False
+                break
+            counts.update(ids)
+            touched += len(ids)
+        # Rank by shared grams, then score the front runners; when every posting
+        # list was read the counts already are the exact intersection sizes
+        scored = []
+        for i, shared in counts.most_common(max(limit * 4, 16)):
+            if not complete:
+                shared = len(grams & _grams(self._keys[i]))
+            scored.append((self.names[i], 2 * shared / (len(grams) + self._gram_counts[i])))
+        scored.sort(key=lambda match: match[1], reverse=True)
+        return scored[:limit]
@@ -1,11 +1,142 @@
-Questions: [
-    "What are the dependencies of SBV?",
-    "Which apps depend on <Lib-Name> ?"
-    "How many entity types are present?"
+"""
+Offline evaluation of the tools-or-not router (src/query_router.py) on a labeled query set
+
+Each query is routed by QueryRouter over a fixed example graph; questions
+the rules are unsure about go to the LLM classifier, played here by a
+ScriptedChatModel that answers the expected label after --llm-latency
+seconds, so the run is deterministic and needs no API key. Reports rule
+accuracy, how often the LLM was still needed, and routed vs all-LLM latency.
+
+Usage:
+  python -m src.evals
+  python -m src.evals --llm-latency 0.8 --threshold 0.8 --verbose
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from langchain_core.messages import AIMessage
+from src.fake_chat_model import ScriptedChatModel
+from src.query_router import QueryRouter, should_use_tools
+
+# Entities the labeled queries refer to
+EXAMPLE_ENTITIES: Dict[str, str] = {
+    "SBV": "app",
+    "admin-portal": "app",
+    "storefront": "app",
+    "storefront-e2e": "e2e",
+    "shared-ui": "lib",
+    "shared-utils": "lib",
+    "@org/auth": "lib",
+    "data-access-orders": "lib",
+    "core": "lib",
+    "feature-checkout": "lib",
+}
+
+# (query, needs tools)
+LABELED_QUERIES: List[Tuple[str, bool]] = [
+    ("What are the dependencies of SBV?", True),
+    ("Which apps depend on shared-ui ?", True),
+    ("How many entity types are present?", True),
+    ("Does storefront depend on @org/auth?", True),
+    ("List all libs used by admin-portal", True),
+    ("what uses data-access-orders", True),
+    ("Find all paths from storefront to shared-utils", True),
+    ("Show the level-wise dependencies of feature-checkout", True),
+    ("common dependencies between storefront and admin-portal", True),
+    ("Which e2e projects are affected if I change shared-ui?", True),
+    ("Who depends on core?", True),
+    ("What does core import?", True),
+    ("How many apps are there?", True),
+    ("List all entities", True),
+    ("Which libraries have the most dependents?", True),
+    ("storefront-e2e", True),
+    ("Is feature-checkout used by any app?", True),
+    ("Give me the dependency tree of admin-portal grouped by type", True),
+    ("What are the transitive dependencies of SBV by level?", True),
+    ("Which projects would a change to @org/auth impact?", True),
+    ("Hello!", False),
+    ("hi", False),
+    ("Thanks, that helps", False),
+    ("Who are you?", False),
+    ("What can you do?", False),
+    ("What is Nx?", False),
+    ("Explain what a barrel file is", False),
+    ("What is a monorepo?", False),
+    ("How does Nx compute the project graph?", False),
+    ("Why would I split code into libraries?", False),
+    ("Good morning", False),
+    ("What is the difference between an app and a lib in general?", False),
+    ("bye", False),
+    ("Tell me about dependency graphs", False),
+    ("What's the core idea of module boundaries?", False),
+    ("Can you summarize how imports become graph edges?", False),
 ]
 
 
-Plan = '''
-it might happen LLM can output multiple tools and one tools output can be output of other tool. It can also tell me if the necesarry tools are not sufficent 
+def evaluate(threshold: float, llm_latency: float, verbose: bool = False) -> Dict:
+    labels = dict(LABELED_QUERIES)
+    # One scripted classifier per query: it answers with the label, as a perfect LLM would
+    classifiers = {query: ScriptedChatModel(responses=[AIMessage(content="YES" if label else "NO")],
+                                            sleep=llm_latency, requests=[])
+                   for query, label in LABELED_QUERIES}
+    router = QueryRouter(EXAMPLE_ENTITIES, classify=lambda q: should_use_tools(q, classifiers[q]),
+                         threshold=threshold)
+
+    correct = rule_correct = rule_total = 0
+    routed_seconds = 0.0
+    misses = []
+    for query, label in LABELED_QUERIES:
+        decision = router.route(query)
+        routed_seconds += decision.seconds
+        correct += decision.use_tools == label
+        if decision.source == "rules":
+            rule_total += 1
+            rule_correct += decision.use_tools == label
+        if decision.use_tools != labels[query] or verbose:
+            misses.append((query, label, decision))
+
+    # Baseline: every query pays one classifier round trip
+    start = time.perf_counter()
+    for query, label in LABELED_QUERIES:
+        should_use_tools(query, ScriptedChatModel(responses=[AIMessage(content="YES" if label else "NO")],
+                                                  sleep=llm_latency, requests=[]))
+    baseline_seconds = time.perf_counter() - start
+
+    return {
+        "queries": len(LABELED_QUERIES),
+        "accuracy": correct / len(LABELED_QUERIES),
+        "rule_decisions": rule_total,
+        "rule_accuracy": rule_correct / rule_total if rule_total else 0.0,
+        "llm_fallbacks": len(LABELED_QUERIES) - rule_total,
+        "routed_seconds": routed_seconds,
+        "baseline_seconds": baseline_seconds,
+        "details": misses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the local tools-or-not router")
+    parser.add_argument("--threshold", type=float, default=0.75, help="Router confidence threshold")
+    parser.add_argument("--llm-latency", type=float, default=0.5,
+                        help="Simulated classifier round trip in seconds (default: 0.5)")
+    parser.add_argument("--verbose", action="store_true", help="Show every decision, not only the wrong ones")
+    args = parser.parse_args()
+
+    result = evaluate(args.threshold, args.llm_latency, args.verbose)
+    for query, label, decision in result["details"]:
+        mark = "ok " if decision.use_tools == label else "BAD"
+        print(f"  {mark} expected {'tools' if label else 'no tools':<8}  {decision}  {query!r}")
+    print(f"\nQueries: {result['queries']}, accuracy {result['accuracy']:.1%}")
+    print(f"Rules decided {result['rule_decisions']} ({result['rule_accuracy']:.1%} correct), "
+          f"LLM fallback for {result['llm_fallbacks']}")
+    print(f"Latency: routed {result['routed_seconds']:.2f}s vs all-LLM {result['baseline_seconds']:.2f}s "
+          f"({result['baseline_seconds'] / max(result['routed_seconds'], 1e-9):.1f}x faster)")
+    if result["rule_accuracy"] < 1.0:
+        sys.exit(1)
+
 
-'''
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class ScriptedChatModel(FakeMessagesListChatModel):
+    """
+    Offline stand-in for the chat model: replies with the scripted messages
+    in order (one per invoke, including should_use_tools when the router
+    falls back to it) and
+    records the messages of every request in `requests`, so a conversation
+    with tool calls can be replayed without an API key. bind_tools returns
+    the model itself; the script decides which tools get called. sleep
+    adds a fixed latency per reply. stream yields the reply word by word
+    and each tool call as a name chunk followed by argument fragments, the
+    way provider APIs do, with chunk_sleep seconds between chunks.
+    """
+
+    requests: List[List[BaseMessage]] = []
+    chunk_sleep: Optional[float] = None
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _next_response(self, messages: List[BaseMessage]) -> AIMessage:
+        if self.i >= len(self.responses):
+            raise RuntimeError(f"Chat script exhausted after {len(self.responses)} responses")
+        if self.sleep is not None:
+            time.sleep(self.sleep)
+        self.requests.append(list(messages))
+        response = self.responses[self.i]
+        self.i += 1
+        return response
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._next_response(messages))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        response = self._next_response(messages)
+        chunks = [AIMessageChunk(content=token) for token in re.findall(r"\S+\s*|\s+", response.content)]
+        for index, call in enumerate(response.tool_calls):
+            chunks.append(AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": "", "id": call["id"], "index": index}]))
+            args = json.dumps(call["args"])
+            # Arguments arrive in fragments, so a call is only complete once its JSON closes
+            for start in range(0, len(args), 8):
+                chunks.append(AIMessageChunk(content="", tool_call_chunks=[
+                    {"name": None, "args": args[start:start + 8], "id": None, "index": index}]))
+        for chunk in chunks:
+            if self.chunk_sleep is not None:
+                time.sleep(self.chunk_sleep)
+            if run_manager is not None and chunk.content:
+                run_manager.on_llm_new_token(chunk.content)
+            yield ChatGenerationChunk(message=chunk)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat-model"
+
+    @classmethod
+    def from_script(cls, path: str, **kwargs: Any) -> "ScriptedChatModel":
+        """
+        Load a JSON script: a list of replies, each a string or
+        {"content": str, "tool_calls": [{"name": str, "args": {...}, "id": optional str}]};
+        kwargs set other fields, e.g. sleep or chunk_sleep
+        """
+        script = json.loads(Path(path).read_text())
+        return cls(responses=[_to_message(reply, turn) for turn, reply in enumerate(script)],
+                   requests=[], **kwargs)
+
+
+def _to_message(reply: Any, turn: int) -> AIMessage:
+    if isinstance(reply, str):
+        return AIMessage(content=reply)
+    tool_calls: List[Dict[str, Any]] = [
+        {"name": call["name"], "args": call.get("args", {}), "id": call.get("id", f"call_{turn}_{k}")}
+        for k, call in enumerate(reply.get("tool_calls", []))
+    ]
+    return AIMessage(content=reply.get("content", ""), tool_calls=tool_calls)
@@ -0,0 +1,198 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+from src.compact_graph import CompactGraph
+from src.instrumentation import instrumented
+from src.utility import load_nx_graph_from_json, resolve_graph_path
+
+CACHE_SUFFIX = ".nxcache"
+_MAGIC = b"NXGC"
+_VERSION = 2  # 2: 16-bit type codes
+_BYTEORDER = 1 if sys.byteorder == "little" else 2
+
+# magic, version, byteorder, source size, source mtime (ns), source blake2b,
+# name count, node count, type count, edge count, names blob len, type names blob len
+_HEADER = struct.Struct("<4sHHQq32sQQQQQQ")
+
+
+def cache_path_for(graph_path: Path) -> Path:
+    return graph_path.with_name(graph_path.name + CACHE_SUFFIX)
+
+
+def _hash_file(path: Path) -> bytes:
+    digest = hashlib.blake2b(digest_size=32)
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def write_snapshot(snapshot_path: Path, graph: CompactGraph, source_path: Optional[Path] = None) -> Path:
+    '''
+    Write a binary snapshot of graph to snapshot_path, keyed by
+    source_path's size, mtime and content hash when given. Written to a temp
+    file and renamed so readers never see a partial snapshot.
+    '''
+    if source_path is not None:
+        stat = source_path.stat()
+        size, mtime_ns, content_hash = stat.st_size, stat.st_mtime_ns, _hash_file(source_path)
+    else:
+        size, mtime_ns, content_hash = 0, 0, bytes(32)
+    names_blob = "\0".join(graph.names).encode("utf-8")
+    type_names_blob = "\0".join(graph.type_names).encode("utf-8")
+    header = _HEADER.pack(
+        _MAGIC, _VERSION, _BYTEORDER, size, mtime_ns, content_hash,
+        len(graph.names), graph.node_count, len(graph.type_names), graph.edge_count,
+        len(names_blob), len(type_names_blob),
+    )
+
+    with _replacing(snapshot_path) as f:
+        f.write(header)
+        f.write(names_blob)
+        f.write(type_names_blob)
+        f.write(b"\0" * (f.tell() % 2))  # and the uint16 type codes 2-byte aligned
+        f.write(graph.types.tobytes())
+        f.write(b"\0" * (-f.tell() % 4))  # int32 sections are 4-byte aligned for mmap casts
+        for section in (graph.fwd_offsets, graph.fwd_targets, graph.rev_offsets, graph.rev_targets):
+            f.write(section.tobytes())
+    return snapshot_path
+
+
+@contextmanager
+def _replacing(path: Path) -> Iterator[BinaryIO]:
+    '''Write to a temp file next to path, then rename it over path; a failed write leaves path as it was'''
+    tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("wb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def write_graph_cache(graph_path: Path, graph: CompactGraph) -> Path:
+    '''Write the snapshot cache for graph_path next to it'''
+    return write_snapshot(cache_path_for(graph_path), graph, graph_path)
+
+
+def _map_snapshot(snapshot_path: Path) -> Optional[Tuple[mmap.mmap, tuple]]:
+    '''
+    mmap a snapshot and unpack its header. None when it is missing,
+    unreadable (e.g. PermissionError), empty or from another format version;
+    the caller then rebuilds from the JSON.
+    '''
+    try:
+        with snapshot_path.open("rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _HEADER.unpack_from(mm)
+    except (OSError, ValueError, struct.error):
+        return None
+
+    magic, version, byteorder = header[:3]
+    if magic != _MAGIC or version != _VERSION or byteorder != _BYTEORDER:
+        return None
+    return mm, header
+
+
+def _parse_snapshot(mm: mmap.mmap, header: tuple) -> Optional[CompactGraph]:
+    '''The CompactGraph over a mapped snapshot; None when it is truncated or corrupt'''
+    name_count, node_count, type_count, edge_count, names_len, type_names_len = header[6:]
+    types_start = _HEADER.size + names_len + type_names_len
+    types_start += types_start % 2
+    arrays_start = types_start + 2 * name_count
+    arrays_start += -arrays_start % 4
+    if len(mm) != arrays_start + 4 * (2 * (name_count + 1) + 2 * edge_count) or node_count > name_count:
+        return None
+
+    view = memoryview(mm)
+    pos = _HEADER.size
+    try:
+        names = bytes(view[pos:pos + names_len]).decode("utf-8").split("\0") if name_count else []
+        pos += names_len
+        type_names = bytes(view[pos:pos + type_names_len]).decode("utf-8").split("\0") if type_count else []
+    except UnicodeDecodeError:
+        return None
+    if len(names) != name_count or len(type_names) != type_count:
+        return None
+    types = view[types_start:types_start + 2 * name_count].cast("H")
+    pos = arrays_start
+
+    sections = []
+    for count in (name_count + 1, edge_count, name_count + 1, edge_count):
+        sections.append(view[pos:pos + 4 * count].cast("i"))
+        pos += 4 * count
+    # Cheap CSR sanity check; a full scan of the targets would cost as much as a rebuild
+    if any(offsets[0] != 0 or offsets[-1] != edge_count for offsets in (sections[0], sections[2])):
+        return None
+
+    names = [sys.intern(name) for name in names]
+    return CompactGraph(names, node_count, type_names, types, *sections)
+
+
+def load_snapshot(snapshot_path: Path) -> Optional[CompactGraph]:
+    '''mmap a snapshot without checking it against a source file'''
+    mapped = _map_snapshot(snapshot_path)
+    return _parse_snapshot(*mapped) if mapped is not None else None
+
+
+def load_graph_cache(graph_path: Path) -> Optional[CompactGraph]:
+    '''
+    mmap a snapshot written by write_graph_cache.
+    Returns None when there is no snapshot or it is stale. A size+mtime match
+    is trusted as is; when only the mtime moved (e.g. a fresh checkout) the
+    content hash decides, and a match re-stamps the snapshot's mtime.
+    '''
+    cache_path = cache_path_for(graph_path)
+    mapped = _map_snapshot(cache_path)
+    if mapped is None:
+        return None
+    mm, header = mapped
+    size, mtime_ns, content_hash = header[3:6]
+
+    graph = _parse_snapshot(mm, header)
+    if graph is None:
+        return None
+    stat = graph_path.stat()
+    if stat.st_size != size:
+        return None
+    if stat.st_mtime_ns != mtime_ns:
+        if _hash_file(graph_path) != content_hash:
+            return None
+        # A copy with the new mtime replaces the snapshot: rewriting the header
+        # in place could leave a torn file, or change it under another reader's mmap
+        try:
+            with _replacing(cache_path) as f:
+                f.write(_HEADER.pack(*header[:4], stat.st_mtime_ns, *header[5:]))
+                f.write(mm[_HEADER.size:])
+        except OSError as e:
+            print(f"Warning: could not update graph cache: {e}", file=sys.stderr)
+    return graph
+
+
+@instrumented
+def load_compact_graph(filepath: str, use_cache: bool = True, rebuild: bool = False,
+                       streaming: bool = False) -> Tuple[CompactGraph, bool]:
+    '''
+    Load filepath as a CompactGraph, going through the snapshot cache.
+    Returns (graph, cache_hit). A snapshot that cannot be written (e.g. a
+    read-only directory) is reported on stderr and otherwise ignored.
+    '''
+    path = resolve_graph_path(filepath)
+    if use_cache and not rebuild:
+        graph = load_graph_cache(path)
+        if graph is not None:
+            return graph, True
+
+    graph = CompactGraph.from_nx_graph(load_nx_graph_from_json(str(path), streaming=streaming))
+    if use_cache:
+        try:
+            write_graph_cache(path, graph)
+        except OSError as e:
+            print(f"Warning: could not write graph cache: {e}", file=sys.stderr)
+    return graph, False
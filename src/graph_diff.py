@@ -0,0 +1,70 @@
+from collections import Counter
+from typing import Dict, List, Tuple, Union
+from src.compact_graph import CompactGraph
+from src.model import NXGraph
+
+Edge = Tuple[str, str]
+
+
+class GraphDiff:
+    '''
+    Difference between two graphs.
+    Edges are (source, target) pairs compared as a multiset, so a pair that
+    appears twice (e.g. a static and a dynamic import) is added or removed
+    once per occurrence, matching the adjacency maps. type_changes holds
+    (name, old type, new type).
+    '''
+
+    def __init__(self, added_nodes: Dict[str, str], removed_nodes: Dict[str, str],
+                 type_changes: List[Tuple[str, str, str]], added_edges: List[Edge], removed_edges: List[Edge]):
+        self.added_nodes = added_nodes
+        self.removed_nodes = removed_nodes
+        self.type_changes = type_changes
+        self.added_edges = added_edges
+        self.removed_edges = removed_edges
+
+    def is_empty(self) -> bool:
+        return not (self.added_nodes or self.removed_nodes or self.type_changes
+                    or self.added_edges or self.removed_edges)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "added_nodes": len(self.added_nodes),
+            "removed_nodes": len(self.removed_nodes),
+            "type_changes": len(self.type_changes),
+            "added_edges": len(self.added_edges),
+            "removed_edges": len(self.removed_edges),
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "added_nodes": self.added_nodes,
+            "removed_nodes": self.removed_nodes,
+            "type_changes": [list(change) for change in self.type_changes],
+            "added_edges": [list(edge) for edge in self.added_edges],
+            "removed_edges": [list(edge) for edge in self.removed_edges],
+        }
+
+
+def _node_types(graph: Union[NXGraph, CompactGraph]) -> Dict[str, str]:
+    return {node.name: node.type for node in graph.nodes}
+
+
+def _edge_counts(graph: Union[NXGraph, CompactGraph]) -> Counter:
+    return Counter((dep.source, dep.target) for dep in graph.dependencies)
+
+
+def diff_graphs(old: Union[NXGraph, CompactGraph], new: Union[NXGraph, CompactGraph]) -> GraphDiff:
+    '''Nodes, node types and edges that differ between old and new, in O(V + E)'''
+    old_types = _node_types(old)
+    new_types = _node_types(new)
+    added_nodes = {name: type_ for name, type_ in new_types.items() if name not in old_types}
+    removed_nodes = {name: type_ for name, type_ in old_types.items() if name not in new_types}
+    type_changes = [(name, old_types[name], type_) for name, type_ in new_types.items()
+                    if name in old_types and old_types[name] != type_]
+
+    old_edges = _edge_counts(old)
+    new_edges = _edge_counts(new)
+    added_edges = list((new_edges - old_edges).elements())
+    removed_edges = list((old_edges - new_edges).elements())
+    return GraphDiff(added_nodes, removed_nodes, type_changes, added_edges, removed_edges)
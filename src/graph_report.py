@@ -0,0 +1,106 @@
+from collections import defaultdict
+from typing import Dict, List, Optional
+from src.compact_graph import CompactGraph
+from src.reachability import ReachabilityIndex, closure_bits, strongly_connected_components
+
+# --sort-by choices -> EntityMetrics attribute
+SORT_KEYS = {
+    "dependents": "dependents",
+    "dependencies": "dependencies",
+    "fan-in": "fan_in",
+    "fan-out": "fan_out",
+    "depth": "depth",
+}
+
+CSV_HEADERS = ["Entity", "Type", "Fan-in", "Fan-out", "Dependencies", "Dependents", "Depth"]
+
+
+class EntityMetrics:
+    '''
+    Whole-graph metrics for one entity.
+    fan_in / fan_out count distinct direct dependents / dependencies.
+    dependencies and dependents are transitive counts with the same meaning
+    as len(all_dependencies) and len(get_all_dependents); dependents is the
+    blast radius of a change. depth is the longest dependency chain below the
+    entity, with each dependency cycle counted as a single step.
+    '''
+    __slots__ = ("name", "type", "fan_in", "fan_out", "dependencies", "dependents", "depth")
+
+    def __init__(self, name: str, type: str, fan_in: int, fan_out: int,
+                 dependencies: int, dependents: int, depth: int):
+        self.name = name
+        self.type = type
+        self.fan_in = fan_in
+        self.fan_out = fan_out
+        self.dependencies = dependencies
+        self.dependents = dependents
+        self.depth = depth
+
+    def to_row(self) -> list:
+        return [self.name, self.type, self.fan_in, self.fan_out, self.dependencies, self.dependents, self.depth]
+
+
+def _popcounts(bits: List[int]) -> List[int]:
+    return [bin(b).count("1") for b in bits]
+
+
+def compute_graph_report(graph: CompactGraph, index: Optional[ReachabilityIndex] = None) -> List[EntityMetrics]:
+    '''
+    Metrics for every entity in one pass over the SCC condensation instead
+    of one traversal per entity. Transitive counts come from closure bitsets
+    filled in topological order (reused from index when given); each
+    direction is reduced to per-component counts before the next one is
+    built, so only one direction's bitsets are alive at a time.
+    '''
+    if index is not None:
+        component, components = index.component, index.components
+        descendant_counts = _popcounts(index.descendant_bits)
+        ancestor_counts = _popcounts(index.ancestor_bits)
+    else:
+        component, components = strongly_connected_components(graph)
+        descendant_counts = _popcounts(closure_bits(component, components, graph.fwd_offsets,
+                                                    graph.fwd_targets, reversed_order=False))
+        ancestor_counts = _popcounts(closure_bits(component, components, graph.rev_offsets,
+                                                  graph.rev_targets, reversed_order=True))
+
+    # Successor components are emitted first, so one forward sweep gives the longest chain
+    offsets, targets = graph.fwd_offsets, graph.fwd_targets
+    depth = [0] * len(components)
+    for c, members in enumerate(components):
+        longest = 0
+        for u in members:
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                cv = component[v]
+                if cv != c and depth[cv] + 1 > longest:
+                    longest = depth[cv] + 1
+        depth[c] = longest
+
+    report = []
+    for i, name in enumerate(graph.names):
+        c = component[i]
+        # A cyclic component's closure contains its own members; an entity is
+        # never its own dependency but can be its own dependent
+        cyclic = len(components[c]) > 1 or i in graph.successors(i)
+        report.append(EntityMetrics(
+            name,
+            graph.type_of(i) or "unknown",
+            len(set(graph.predecessors(i))),
+            len(set(graph.successors(i))),
+            descendant_counts[c] - cyclic,
+            ancestor_counts[c],
+            depth[c],
+        ))
+    return report
+
+
+def top_by_type(report: List[EntityMetrics], sort_by: str = "dependents",
+                top: Optional[int] = 10) -> Dict[str, List[EntityMetrics]]:
+    '''Highest-ranked entities per type by the SORT_KEYS metric sort_by; ties keep graph order'''
+    attr = SORT_KEYS[sort_by]
+    grouped = defaultdict(list)
+    for metrics in report:
+        grouped[metrics.type].append(metrics)
+    return {
+        type_: sorted(entries, key=lambda m: getattr(m, attr), reverse=True)[:top]
+        for type_, entries in grouped.items()
+    }
@@ -0,0 +1,224 @@
+import cProfile
+import functools
+import sys
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, TextIO
+from src.output_sink import OutputSink
+
+# The active Profiler, None when profiling is off. Every hook checks it once
+# per call (never per node), so disabled instrumentation costs nothing measurable.
+_profiler: Optional["Profiler"] = None
+
+PHASES = ("load", "index build", "query", "output")
+
+
+class CallStats:
+    '''Totals for one instrumented function: calls, wall time (total and slowest) and work counters'''
+    __slots__ = ("name", "calls", "seconds", "max_seconds", "nodes_visited", "edges_scanned",
+                 "cache_hits", "cache_misses", "bytes_written")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.nodes_visited = 0
+        self.edges_scanned = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.bytes_written = 0
+
+    def to_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class Profiler:
+    '''
+    Collects per-call statistics from the instrumented functions and the
+    wall time of each phase. Work is tallied in running counters bumped by
+    the hooks (traversals, caches, output sinks); a call is charged the
+    counter deltas between its entry and exit, so calls made inside another
+    instrumented call are included in both. Phases are exclusive: time spent
+    in a nested phase (e.g. output during a query) only counts for it.
+    cprofile_path additionally runs cProfile until stop() and dumps its
+    stats there (read them with python -m pstats).
+    '''
+
+    def __init__(self, cprofile_path: Optional[str] = None):
+        self.stats: Dict[str, CallStats] = {}
+        self.phases: Dict[str, float] = {}
+        self.nodes_visited = 0
+        self.edges_scanned = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.bytes_written = 0
+        self._phase_stack: List[list] = []  # [name, start, time spent in nested phases]
+        self.cprofile_path = cprofile_path
+        self._cprofile = None
+        if cprofile_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            self._cprofile = None
+
+    def call(self, name: str, fn: Callable, args, kwargs):
+        before = (self.nodes_visited, self.edges_scanned, self.cache_hits, self.cache_misses, self.bytes_written)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = CallStats(name)
+            stats.calls += 1
+            stats.seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+            stats.nodes_visited += self.nodes_visited - before[0]
+            stats.edges_scanned += self.edges_scanned - before[1]
+            stats.cache_hits += self.cache_hits - before[2]
+            stats.cache_misses += self.cache_misses - before[3]
+            stats.bytes_written += self.bytes_written - before[4]
+
+    def phase(self, name: str) -> "_Phase":
+        return _Phase(self, name)
+
+    def counting(self, neighbors: Callable[[Hashable], Iterable[Hashable]]) -> Callable:
+        '''Wrap a TraversalEngine neighbors function to count expanded nodes and scanned edges'''
+        def counted(node):
+            found = neighbors(node)
+            self.nodes_visited += 1
+            self.edges_scanned += len(found)
+            return found
+        return counted
+
+    def report(self, file: TextIO = sys.stderr):
+        total = sum(self.phases.values())
+        print("\nProfile: phases (wall time)", file=file)
+        for name in PHASES + tuple(p for p in self.phases if p not in PHASES):
+            if name in self.phases:
+                seconds = self.phases[name]
+                share = seconds / total * 100 if total else 0.0
+                print(f"  {name:<12}{seconds * 1000:>10.2f} ms {share:>5.1f}%", file=file)
+        print(f"  {'total':<12}{total * 1000:>10.2f} ms", file=file)
+
+        if self.stats:
+            print("\nProfile: calls (inclusive)", file=file)
+            print(f"  {'function':<50}{'calls':>7}{'total ms':>11}{'max ms':>10}{'nodes':>10}"
+                  f"{'edges':>11}{'hits':>7}{'misses':>8}{'bytes':>11}", file=file)
+            for s in sorted(self.stats.values(), key=lambda s: s.seconds, reverse=True):
+                print(f"  {s.name:<50}{s.calls:>7}{s.seconds * 1000:>11.2f}{s.max_seconds * 1000:>10.2f}"
+                      f"{s.nodes_visited:>10}{s.edges_scanned:>11}{s.cache_hits:>7}{s.cache_misses:>8}"
+                      f"{s.bytes_written:>11}", file=file)
+        if self.cprofile_path:
+            print(f"\ncProfile stats written to {self.cprofile_path} (python -m pstats {self.cprofile_path})",
+                  file=file)
+
+
+class _Phase:
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._phase_stack.append([self.name, time.perf_counter(), 0.0])
+
+    def __exit__(self, *exc):
+        stack = self.profiler._phase_stack
+        name, start, nested = stack.pop()
+        elapsed = time.perf_counter() - start
+        phases = self.profiler.phases
+        phases[name] = phases.get(name, 0.0) + elapsed - nested
+        if stack:
+            stack[-1][2] += elapsed
+
+
+class ProfiledSink(OutputSink):
+    '''Wraps an output sink so its writes count as the output phase and towards bytes written'''
+
+    def __init__(self, sink: OutputSink, profiler: Profiler):
+        self.sink = sink
+        self.profiler = profiler
+        self.enabled = sink.enabled
+
+    def write(self, file_name: str, text: str):
+        with self.profiler.phase("output"):
+            self.sink.write(file_name, text)
+        self.profiler.bytes_written += len(text.encode()) + 1
+
+    def flush(self):
+        with self.profiler.phase("output"):
+            self.sink.flush()
+
+    def close(self):
+        with self.profiler.phase("output"):
+            self.sink.close()
+
+
+def enable_profiling(cprofile_path: Optional[str] = None) -> Profiler:
+    '''Start collecting into a fresh Profiler (and cProfile when cprofile_path is given)'''
+    global _profiler
+    disable_profiling()
+    _profiler = Profiler(cprofile_path)
+    return _profiler
+
+
+def disable_profiling() -> Optional[Profiler]:
+    '''Stop collecting; returns the profiler that was active, if any'''
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def active_profiler() -> Optional[Profiler]:
+    return _profiler
+
+
+def instrumented(fn: Callable) -> Callable:
+    '''Record calls to fn (a function or method) in the active profiler, if any'''
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profiler = _profiler
+        if profiler is None:
+            return fn(*args, **kwargs)
+        return profiler.call(name, fn, args, kwargs)
+
+    return wrapper
+
+
+def phase(name: str):
+    '''Context manager timing a phase in the active profiler; a no-op when profiling is off'''
+    profiler = _profiler
+    return nullcontext() if profiler is None else profiler.phase(name)
+
+
+def counting(neighbors: Callable[[Hashable], Iterable[Hashable]]) -> Callable:
+    '''neighbors itself when profiling is off, else a wrapper that counts traversal work'''
+    profiler = _profiler
+    return neighbors if profiler is None else profiler.counting(neighbors)
+
+
+def count_cache(hit: bool):
+    profiler = _profiler
+    if profiler is not None:
+        if hit:
+            profiler.cache_hits += 1
+        else:
+            profiler.cache_misses += 1
+
+
+def count_bytes(size: int):
+    profiler = _profiler
+    if profiler is not None:
+        profiler.bytes_written += size
@@ -1,7 +1,9 @@
-from typing import List
+from typing import List, Optional
 
 
 class NXEntity:
+    __slots__ = ("name", "type")
+
     def __init__(self, name: str, type: str):
         self.name = name
         self.type = type
@@ -12,13 +14,16 @@ class NXEntity:
 
 
 class NXDependency:
-    def __init__(self, source: str, target: str):
+    __slots__ = ("source", "target", "type")
+
+    def __init__(self, source: str, target: str, type: Optional[str] = None):
         self.source = source
         self.target = target
+        self.type = type
 
     @classmethod
     def from_dict(cls, d: dict):
-        return cls(source=d["source"], target=d["target"])
+        return cls(source=d["source"], target=d["target"], type=d.get("type"))
 
 
 class NXGraph:
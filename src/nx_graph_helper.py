@@ -1,13 +1,271 @@
-from collections import defaultdict, deque
-from typing import Dict, List, Set
+from collections import defaultdict
+from itertools import chain, islice
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from src.batch_reachability import BatchReachability, batch_reachability
+from src.cancellation import check_cancelled
+from src.compact_graph import CompactGraph
+from src.entity_resolver import EntityResolver
+from src.graph_diff import GraphDiff, diff_graphs
+from src.graph_report import EntityMetrics, compute_graph_report
+from src.instrumentation import counting, instrumented
+from src.lru_cache import LRUCache
 from src.model import NXGraph
-from src.utility import load_nx_graph_from_json, write_console_outputs, write_csv_output
+from src.reachability import ReachabilityIndex, strongly_connected_components
+from src.output_sink import FileSink, OutputSink
+from src.utility import load_nx_graph_from_json, write_csv_output
+
+# Paths enumerated by the CSV entry points unless the caller passes max_paths=None:
+# diamond-heavy graphs have exponentially many simple paths
+DEFAULT_MAX_PATHS = 100_000
+
+class TraversalEngine:
+    '''
+    Explicit-stack traversal shared by the NXGraphHelper queries.
+    neighbors(node) returns the adjacent nodes in one direction (forward or
+    reverse edges; entity names, or ids on the CompactGraph backend), so deep
+    dependency chains never hit the recursion limit.
+    '''
+
+    def __init__(self, neighbors: Callable[[Hashable], Iterable[Hashable]]):
+        self.neighbors = neighbors
+
+    def dfs(self, start: Hashable,
+            pre_visit: Optional[Callable[[Hashable, int], Optional[bool]]] = None,
+            post_visit: Optional[Callable[[Hashable, int], None]] = None,
+            visited: Optional[Set[Hashable]] = None) -> bool:
+        '''
+        Depth-first walk from start in the same order as a recursive DFS.
+        pre_visit(node, depth) runs when a node is first reached (start itself
+        is not reported, direct neighbors are depth 1); returning True stops
+        the walk and makes dfs return True. post_visit(node, depth) runs once
+        all of a node's neighbors are done.
+        '''
+        neighbors = counting(self.neighbors)
+        if visited is None:
+            visited = set()
+        visited.add(start)
+        nodes = [start]
+        iters = [iter(neighbors(start))]
+
+        while iters:
+            for node in iters[-1]:
+                if node not in visited:
+                    visited.add(node)
+                    if pre_visit is not None and pre_visit(node, len(iters)):
+                        return True
+                    nodes.append(node)
+                    iters.append(iter(neighbors(node)))
+                    break
+            else:
+                iters.pop()
+                done = nodes.pop()
+                if post_visit is not None and iters:
+                    post_visit(done, len(iters))
+        return False
+
+    def bfs(self, start: Hashable, visit: Callable[[Hashable, int], None], mark_start: bool = True):
+        '''
+        Breadth-first walk from start, calling visit(node, level) once per
+        reached node; direct neighbors are level 0. With mark_start=False the
+        start node is reported again if a cycle leads back to it.
+        '''
+        self.multi_source_bfs((start,), visit, mark_start)
+
+    def multi_source_bfs(self, starts: Iterable[Hashable], visit: Callable[[Hashable, int], None],
+                         mark_start: bool = True):
+        '''
+        Breadth-first walk from all starts at once, so every node is visited
+        a single time however many starts reach it. Same levels and
+        mark_start semantics as bfs.
+        '''
+        neighbors = counting(self.neighbors)
+        # dict.fromkeys drops duplicate starts but keeps their order
+        frontier = list(dict.fromkeys(starts))
+        visited = set(frontier) if mark_start else set()
+        # Expanding whole frontiers keeps FIFO order without a queue of (node, level) pairs
+        level = 0
+
+        while frontier:
+            next_frontier = []
+            for current in frontier:
+                for node in neighbors(current):
+                    if node not in visited:
+                        visited.add(node)
+                        visit(node, level)
+                        next_frontier.append(node)
+            frontier = next_frontier
+            level += 1
+
+    def simple_paths(self, start: Hashable, target: Hashable, max_depth: Optional[int] = None,
+                     distance: Optional[Dict[Hashable, int]] = None) -> Iterator[List[Hashable]]:
+        '''
+        Yield every simple path from start to target in DFS order.
+        A single path list is extended and truncated in place; a copy is only
+        made for each path that reaches the target. max_depth caps the number
+        of edges per path. When distance (min edges to target per node) is
+        given, nodes missing from it are never entered and, with max_depth,
+        neither are nodes too far from target to finish in time.
+        '''
+        if start == target:
+            yield [start]
+            return
+
+        neighbors = counting(self.neighbors)
+        path = [start]
+        on_path = {start}
+        iters = [iter(neighbors(start))]
+        steps = 0
+
+        while iters:
+            steps += 1
+            if not steps & 0xFFF:
+                # Lets a timed-out caller (see src.cancellation) stop the enumeration
+                check_cancelled()
+            for node in iters[-1]:
+                if node in on_path:
+                    continue
+                if node == target:
+                    if max_depth is None or len(path) <= max_depth:
+                        yield path + [node]
+                    continue
+                if max_depth is not None and len(path) >= max_depth:
+                    continue
+                if distance is not None:
+                    remaining = distance.get(node)
+                    if remaining is None:
+                        continue
+                    if max_depth is not None and len(path) + remaining > max_depth:
+                        continue
+                path.append(node)
+                on_path.add(node)
+                iters.append(iter(neighbors(node)))
+                break
+            else:
+                iters.pop()
+                on_path.discard(path.pop())
+
 
 class NXGraphHelper:
-    def __init__(self, graph: NXGraph):
+    def __init__(self, graph: Union[NXGraph, CompactGraph], reachability_index: bool = False,
+                 cache_entries: int = 1024, cache_bytes: Optional[int] = None,
+                 output_sink: Optional[OutputSink] = None):
+        # Where the text reports of each query go; OutputSink() disables them
+        self.sink = output_sink if output_sink is not None else FileSink()
+        # LRU cache of forward/reverse closures and level maps, keyed by (kind, entity)
+        self.cache = LRUCache(max_entries=cache_entries, max_bytes=cache_bytes)
+        self._use_reachability_index = reachability_index
         self.graph = graph
-        self.entity_type_map = {node.name: node.type for node in graph.nodes}
-        self.reverse_map = self._build_reverse_map()
+
+    @property
+    def graph(self) -> Union[NXGraph, CompactGraph]:
+        return self._graph
+
+    @graph.setter
+    def graph(self, graph: Union[NXGraph, CompactGraph]):
+        '''
+        Replacing the graph rebuilds every index and invalidates the cache
+        (see update_graph to keep what a small change does not affect)
+        '''
+        self._set_graph(graph)
+        self.cache.clear()
+
+    def _set_graph(self, graph: Union[NXGraph, CompactGraph]):
+        self._graph = graph
+        if isinstance(graph, CompactGraph):
+            # Integer backend: the maps are views over its CSR arrays
+            self.compact = graph
+            self.entity_type_map = graph.type_map()
+            self.forward_map = graph.forward_map()
+            self.reverse_map = graph.reverse_map()
+            # Traversals run on integer ids straight off the CSR arrays
+            self._forward = TraversalEngine(graph.successors)
+            self._reverse = TraversalEngine(graph.predecessors)
+        else:
+            self.compact = None
+            self.entity_type_map = {node.name: node.type for node in graph.nodes}
+            self.forward_map = self._build_forward_map()
+            self.reverse_map = self._build_reverse_map()
+            self._forward = TraversalEngine(lambda entity: self.forward_map.get(entity, ()))
+            self._reverse = TraversalEngine(lambda entity: self.reverse_map.get(entity, ()))
+
+        self._reset_derived_indexes()
+
+    def _reset_derived_indexes(self):
+        # Indexes built from the whole graph; rebuilt lazily, or now if opted in
+        self._compact_copy = None
+        self._batch = None
+        self._content_hash = None
+        self._resolver = None
+        self.reachability = None
+        if self._use_reachability_index:
+            self.build_reachability_index()
+
+    def _compact_graph(self) -> CompactGraph:
+        '''Integer view of the graph for id-based algorithms, built once per graph'''
+        if self.compact is not None:
+            return self.compact
+        if self._compact_copy is None:
+            self._compact_copy = CompactGraph.from_nx_graph(self.graph)
+        return self._compact_copy
+
+    def content_hash(self) -> str:
+        '''Content hash of the current graph (see CompactGraph.content_hash), computed once per graph'''
+        if self._content_hash is None:
+            self._content_hash = self._compact_graph().content_hash()
+        return self._content_hash
+
+    def entity_resolver(self) -> EntityResolver:
+        '''Fuzzy name index over the graph's entities (see src.entity_resolver), built once per graph on first use'''
+        if self._resolver is None:
+            self._resolver = EntityResolver(list(self.entity_type_map))
+        return self._resolver
+
+    def resolve_entity(self, name: str) -> Optional[str]:
+        '''Canonical entity name for a loosely written one ("SBV" -> "sbv"), None when unknown or ambiguous'''
+        return self.entity_resolver().resolve(name)
+
+    def suggest_entities(self, name: str) -> List[str]:
+        '''Entity names an ambiguous name could mean (see EntityResolver.lookup), [] when it resolves or nothing is close'''
+        return self.entity_resolver().lookup(name)[1]
+
+    @instrumented
+    def build_reachability_index(self) -> ReachabilityIndex:
+        '''
+        Opt-in transitive-closure index (SCC condensation + bitsets).
+        Once built, closure queries are answered from it; their lists come
+        back in graph declaration order instead of traversal order.
+        '''
+        self._use_reachability_index = True
+        self.reachability = ReachabilityIndex(self._compact_graph())
+        return self.reachability
+
+    @instrumented
+    def batch_reachability(self, backend: str = "auto") -> BatchReachability:
+        '''
+        Many-source closure engine (SciPy sparse when installed, pure Python
+        otherwise; see src.batch_reachability), built once per graph
+        '''
+        if self._batch is None or (backend != "auto" and self._batch.backend != backend):
+            self._batch = batch_reachability(self._compact_graph(), backend)
+        return self._batch
+
+    def _transitive_dependencies(self, entity: str) -> List[str]:
+        if self.reachability is not None:
+            return self.reachability.dependencies(entity)
+        return self.dfs_dependencies(entity)
+
+    def _transitive_dependents(self, entity: str) -> List[str]:
+        if self.reachability is not None:
+            return self.reachability.dependents(entity)
+        return self.get_all_dependents(entity)
+
+    def _build_forward_map(self) -> Dict[str, List[str]]:
+        # Edges are appended in graph order so traversals visit them exactly as
+        # a scan over self.graph.dependencies would
+        forward_map = defaultdict(list)
+        for dep in self.graph.dependencies:
+            forward_map[dep.source].append(dep.target)
+        return forward_map
     
     def _build_reverse_map(self) -> Dict[str, List[str]]:
         reverse_map = defaultdict(list)
@@ -15,7 +273,32 @@ class NXGraphHelper:
             reverse_map[dep.target].append(dep.source)
         return reverse_map
 
+    def _node(self, entity: str) -> Optional[Hashable]:
+        '''Traversal node for entity: its id on the compact backend, else the name'''
+        if self.compact is not None:
+            return self.compact.id_of(entity)
+        return entity
+
+    def _entities(self, nodes: Iterable[Hashable]) -> tuple:
+        if self.compact is not None:
+            names = self.compact.names
+            return tuple(names[i] for i in nodes)
+        return tuple(nodes)
+
+    def _cached(self, kind: str, entity: str, compute):
+        key = (kind, entity)
+        value = self.cache.get(key)
+        if value is None:
+            value = compute(entity)
+            self.cache.put(key, value)
+        return value
+
+    @instrumented
     def dfs_dependencies(self, entity: str, visited=None, result=None):
+        if visited is None and result is None:
+            # Cached as a tuple, callers get their own list
+            return list(self._cached("dependencies", entity, self._compute_dependencies))
+
         if visited is None:
             visited = set()
         if result is None:
@@ -24,72 +307,81 @@ class NXGraphHelper:
         if entity in visited:
             return result
 
-        visited.add(entity)
-
-        for dep in self.graph.dependencies:
-            if dep.source == entity and dep.target not in visited:
-                result.append(dep.target)
-                self.dfs_dependencies(dep.target, visited, result)
-
+        # Caller-supplied visited/result are keyed by name, walk the name maps
+        engine = TraversalEngine(lambda node: self.forward_map.get(node, ()))
+        engine.dfs(entity, pre_visit=lambda node, depth: result.append(node), visited=visited)
         return result
 
+    def _compute_dependencies(self, entity: str) -> tuple:
+        start = self._node(entity)
+        if start is None:
+            return ()
+        result = []
+        self._forward.dfs(start, pre_visit=lambda node, depth: result.append(node))
+        return self._entities(result)
+
+    @instrumented
     def all_dependencies(self, entity: str):
         '''
         DFS Traverse through the graph to get all the dependencies of given entity.
         Output grouped by type
         '''
-        all_deps = self.dfs_dependencies(entity)
+        all_deps = self._transitive_dependencies(entity)
         type_map = defaultdict(list)
 
         for dep in all_deps:
             type_ = self.entity_type_map.get(dep, "unknown")
             type_map[type_].append(dep)
 
-        output = [f"All Dependencies for '{entity}':"]
-        for type_, deps in type_map.items():
-            output.append(f"{type_} ({len(deps)}): {deps}")
-
-        write_console_outputs("all_dependencies.txt", "\n".join(output))
+        if self.sink.enabled:
+            output = [f"All Dependencies for '{entity}':"]
+            for type_, deps in type_map.items():
+                output.append(f"{type_} ({len(deps)}): {deps}")
+            self.sink.write("all_dependencies.txt", "\n".join(output))
         return dict(type_map)
 
+    @instrumented
     def dependency_by_type(self, entity: str, target_type: str):
         '''
         Get dependencies of a given type for an entity
         '''
-        all_deps = self.dfs_dependencies(entity)
+        all_deps = self._transitive_dependencies(entity)
         filtered = [dep for dep in all_deps if self.entity_type_map.get(dep) == target_type]
 
-        output = [
-            f"Dependencies of '{entity}' with type '{target_type}' ({len(filtered)}):",
-            str(filtered)
-        ]
-        write_console_outputs("dependencies_by_type.txt", "\n".join(output))
+        if self.sink.enabled:
+            output = [
+                f"Dependencies of '{entity}' with type '{target_type}' ({len(filtered)}):",
+                str(filtered)
+            ]
+            self.sink.write("dependencies_by_type.txt", "\n".join(output))
         return filtered
 
+    def _compute_levels(self, entity: str) -> Dict[int, tuple]:
+        '''
+        BFS level map of entity's dependencies, shared by the level-wise queries
+        '''
+        start = self._node(entity)
+        if start is None:
+            return {}
+        level_map = defaultdict(list)
+        self._forward.bfs(start, lambda node, level: level_map[level].append(node))
+        return {level: self._entities(nodes) for level, nodes in level_map.items()}
+
+    @instrumented
     def level_wise_dependencies(self, entity: str) -> Dict[int, List[str]]:
         '''
         BFS Traverse through the graph to get dependencies organized by levels.
         Level 0: direct dependencies, Level 1: dependencies of dependencies, etc.
         '''
-        visited = set()
-        queue = deque([(entity, -1)])  # Start with level -1 so direct deps are level 0
-        level_map = defaultdict(list)
-        entity_levels = {}  # Track the level of each entity
-        
-        visited.add(entity)
-        
-        while queue:
-            current_entity, current_level = queue.popleft()
-            
-            # Find all direct dependencies of current entity
-            for dep in self.graph.dependencies:
-                if dep.source == current_entity and dep.target not in visited:
-                    new_level = current_level + 1
-                    visited.add(dep.target)
-                    level_map[new_level].append(dep.target)
-                    entity_levels[dep.target] = new_level
-                    queue.append((dep.target, new_level))
+        levels = self._cached("levels", entity, self._compute_levels)
+        level_map = {level: list(deps) for level, deps in levels.items()}
         
+        if self.sink.enabled:
+            self._write_level_report(entity, level_map)
+
+        return level_map
+
+    def _write_level_report(self, entity: str, level_map: Dict[int, List[str]]):
         # Prepare output for text file
         output = [f"Level-wise Dependencies for '{entity}':"]
         output.append("=" * 50)
@@ -115,32 +407,33 @@ class NXGraphHelper:
         
         # Write to file
         filename = f"level_wise_dependencies_{entity.replace('/', '_').replace(':', '_')}.txt"
-        write_console_outputs(filename, "\n".join(output))
-        
-        return dict(level_map)
+        self.sink.write(filename, "\n".join(output))
 
+    @instrumented
     def level_wise_dependencies_with_types(self, entity: str) -> Dict[int, Dict[str, List[str]]]:
         '''
         BFS Traverse to get level-wise dependencies grouped by type at each level.
         Returns nested dict: {level: {type: [entities]}}
         '''
-        visited = set()
-        queue = deque([(entity, -1)])
+        levels = self._cached("levels", entity, self._compute_levels)
         level_type_map = defaultdict(lambda: defaultdict(list))
+
+        for level, deps in levels.items():
+            for dep in deps:
+                dep_type = self.entity_type_map.get(dep, "unknown")
+                level_type_map[level][dep_type].append(dep)
         
-        visited.add(entity)
-        
-        while queue:
-            current_entity, current_level = queue.popleft()
-            
-            for dep in self.graph.dependencies:
-                if dep.source == current_entity and dep.target not in visited:
-                    new_level = current_level + 1
-                    visited.add(dep.target)
-                    dep_type = self.entity_type_map.get(dep.target, "unknown")
-                    level_type_map[new_level][dep_type].append(dep.target)
-                    queue.append((dep.target, new_level))
+        if self.sink.enabled:
+            self._write_typed_level_report(entity, level_type_map)
+
+        # Convert defaultdict to regular dict for return
+        result = {}
+        for level, type_dict in level_type_map.items():
+            result[level] = dict(type_dict)
         
+        return result
+
+    def _write_typed_level_report(self, entity: str, level_type_map: Dict[int, Dict[str, List[str]]]):
         # Prepare detailed output
         output = [f"Level-wise Dependencies with Types for '{entity}':"]
         output.append("=" * 60)
@@ -159,14 +452,7 @@ class NXGraphHelper:
         
         # Write to file
         filename = f"level_wise_dependencies_typed_{entity.replace('/', '_').replace(':', '_')}.txt"
-        write_console_outputs(filename, "\n".join(output))
-        
-        # Convert defaultdict to regular dict for return
-        result = {}
-        for level, type_dict in level_type_map.items():
-            result[level] = dict(type_dict)
-        
-        return result
+        self.sink.write(filename, "\n".join(output))
 
     # def check_if_dependent(self, entity1: str, entity2: str):
     #     '''
@@ -178,35 +464,34 @@ class NXGraphHelper:
     #     write_console_outputs("check_dependency.txt", msg)
     #     return result
     
+    @instrumented
     def get_all_entities(self) -> Dict[str, List[str]]:
         entity_map = defaultdict(list)
         for node in self.graph.nodes:
             entity_map[node.type].append(node.name)
 
-        output = [f"All Entities:"]
-        for type_, deps in entity_map.items():
-            output.append(f"{type_} ({len(deps)}): {deps}")
-        
-        write_console_outputs("entities.txt", "\n".join(output))
+        if self.sink.enabled:
+            output = [f"All Entities:"]
+            for type_, deps in entity_map.items():
+                output.append(f"{type_} ({len(deps)}): {deps}")
+            self.sink.write("entities.txt", "\n".join(output))
         return dict(entity_map)
     
+    @instrumented
     def get_all_dependents(self, target_entity: str) -> List[str]:
-        visited = set()
-        queue = deque([target_entity])
-        result = []
+        return list(self._cached("dependents", target_entity, self._compute_dependents))
 
-        while queue:
-            curr = queue.popleft()
-            for parent in self.reverse_map.get(curr, []):
-                if parent not in visited:
-                    visited.add(parent)
-                    result.append(parent)
-                    queue.append(parent)
-
-        return result
+    def _compute_dependents(self, target_entity: str) -> tuple:
+        start = self._node(target_entity)
+        if start is None:
+            return ()
+        result = []
+        self._reverse.bfs(start, lambda node, level: result.append(node), mark_start=False)
+        return self._entities(result)
 
+    @instrumented
     def group_dependents_by_type(self, target_entity: str) -> Dict[str, List[str]]:
-        all_dependents = self.get_all_dependents(target_entity)
+        all_dependents = self._transitive_dependents(target_entity)
         grouped = defaultdict(list)
 
         for dep in all_dependents:
@@ -215,89 +500,298 @@ class NXGraphHelper:
 
         return dict(grouped)
 
+    def _reach_from(self, engine: TraversalEngine, entities: Iterable[str]) -> tuple:
+        '''The known entities among entities plus everything engine reaches from them, in BFS order'''
+        if self.compact is not None:
+            starts = (node for node in map(self.compact.id_of, entities) if node is not None)
+        else:
+            known = (self.entity_type_map, self.forward_map, self.reverse_map)
+            starts = (name for name in entities if any(name in m for m in known))
+        reached = list(dict.fromkeys(starts))
+        engine.multi_source_bfs(reached, lambda node, level: reached.append(node))
+        return self._entities(reached)
+
+    @instrumented
+    def update_graph(self, new_graph: Union[NXGraph, CompactGraph]) -> GraphDiff:
+        '''
+        Switch to new_graph, keeping everything its changes do not affect.
+        Returns the diff (see src.graph_diff). On the dict backend the maps
+        are patched in place (added edges go to the end of their adjacency
+        lists, so traversal order can differ from a fresh load). Cached
+        closures survive unless the changed edges can alter them: forward
+        entries of anything that reaches a changed edge's source, reverse
+        entries of anything a changed edge's target reaches, in either graph.
+        Whole-graph indexes are rebuilt.
+        '''
+        diff = diff_graphs(self.graph, new_graph)
+        self.apply_diff(diff, new_graph)
+        return diff
+
+    @instrumented
+    def apply_diff(self, diff: GraphDiff, new_graph: Union[NXGraph, CompactGraph]):
+        '''Apply diff (self.graph -> new_graph) to the maps, caches and indexes'''
+        sources = {source for source, _ in chain(diff.added_edges, diff.removed_edges)}
+        targets = {target for _, target in chain(diff.added_edges, diff.removed_edges)}
+        sources.update(diff.removed_nodes)
+        targets.update(diff.removed_nodes)
+        stale_forward = set(self._reach_from(self._reverse, sources))
+        stale_reverse = set(self._reach_from(self._forward, targets))
+
+        if self.compact is None and not isinstance(new_graph, CompactGraph):
+            self._graph = new_graph
+            self._patch_maps(diff)
+            self._reset_derived_indexes()
+        else:
+            # CSR arrays are immutable: rebuild the structures, keep the cache
+            self._set_graph(new_graph)
+
+        stale_forward.update(self._reach_from(self._reverse, sources))
+        stale_reverse.update(self._reach_from(self._forward, targets))
+        self.cache.invalidate(lambda key: key[1] in (stale_reverse if key[0] == "dependents" else stale_forward))
+
+    def _patch_maps(self, diff: GraphDiff):
+        entity_type_map = self.entity_type_map
+        for name in diff.removed_nodes:
+            del entity_type_map[name]
+        entity_type_map.update(diff.added_nodes)
+        for name, _, new_type in diff.type_changes:
+            entity_type_map[name] = new_type
+
+        for adjacency, edges in ((self.forward_map, diff.removed_edges),
+                                 (self.reverse_map, [(t, s) for s, t in diff.removed_edges])):
+            for key, value in edges:
+                neighbors = adjacency[key]
+                neighbors.remove(value)
+                if not neighbors:
+                    del adjacency[key]
+        for source, target in diff.added_edges:
+            self.forward_map[source].append(target)
+            self.reverse_map[target].append(source)
+
+    @instrumented
+    def affected(self, changed_projects: Iterable[str],
+                 types: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        '''
+        Everything affected by a change to any of changed_projects: the changed
+        projects themselves plus all their transitive dependents, found in one
+        multi-source reverse BFS. Optionally restricted to the given entity
+        types. Unknown project names are ignored. Grouped by type.
+        '''
+        wanted = set(types) if types is not None else None
+        entity_type_map = self.entity_type_map
+        grouped = defaultdict(list)
+        for name in self._reach_from(self._reverse, changed_projects):
+            type_ = entity_type_map.get(name, "unknown")
+            if wanted is None or type_ in wanted:
+                grouped[type_].append(name)
+
+        return dict(grouped)
+
+    @instrumented
+    def graph_report(self) -> List[EntityMetrics]:
+        '''
+        Fan-in/out, transitive dependency/dependent counts and dependency
+        depth for every entity, in graph order (see src.graph_report)
+        '''
+        return compute_graph_report(self._compact_graph(), self.reachability)
+
+    @instrumented
     def check_if_dependent(self, source: str, target: str) -> bool:
-        visited = set()
-        return self._check_if_dependent_dfs(source, target, visited)
+        if self.reachability is not None:
+            return self.reachability.depends_on(source, target)
+        if source == target:
+            return True
+        source_node = self._node(source)
+        target_node = self._node(target)
+        if source_node is None or target_node is None:
+            return False
+        return self._check_if_dependent_dfs(source_node, target_node, set())
 
-    def _check_if_dependent_dfs(self, current: str, target: str, visited: Set[str]) -> bool:
+    def _check_if_dependent_dfs(self, current: Hashable, target: Hashable, visited: Set[Hashable]) -> bool:
         if current == target:
             return True
-        visited.add(current)
-        for dep in self.graph.dependencies:
-            if dep.source == current and dep.target not in visited:
-                if self._check_if_dependent_dfs(dep.target, target, visited):
-                    return True
-        return False
+        return self._forward.dfs(current, pre_visit=lambda node, depth: node == target, visited=visited)
 
+    @instrumented
     def find_common_dependencies(self, entity1: str, entity2: str) -> Dict[str, List[str]]:
         """Find common dependencies between two entities, grouped by type"""
-        deps1 = set(self.dfs_dependencies(entity1))
-        deps2 = set(self.dfs_dependencies(entity2))
-        common_deps = deps1.intersection(deps2)
+        if self.reachability is not None:
+            common_deps = self.reachability.common_dependencies(entity1, entity2)
+        else:
+            deps1 = set(self.dfs_dependencies(entity1))
+            deps2 = set(self.dfs_dependencies(entity2))
+            common_deps = deps1.intersection(deps2)
         
         grouped = defaultdict(list)
         for dep in common_deps:
             type_ = self.entity_type_map.get(dep, "unknown")
             grouped[type_].append(dep)
         
-        output = [f"Common dependencies between '{entity1}' and '{entity2}':"]
-        for type_, deps in grouped.items():
-            output.append(f"{type_} ({len(deps)}): {deps}")
-        
-        write_console_outputs("common_dependencies.txt", "\n".join(output))
+        if self.sink.enabled:
+            output = [f"Common dependencies between '{entity1}' and '{entity2}':"]
+            for type_, deps in grouped.items():
+                output.append(f"{type_} ({len(deps)}): {deps}")
+            self.sink.write("common_dependencies.txt", "\n".join(output))
         return dict(grouped)
     
-    def find_all_paths_to_csv(self, source: str, target: str):
+    @instrumented
+    def find_all_paths_to_csv(self, source: str, target: str, max_paths: Optional[int] = DEFAULT_MAX_PATHS,
+                              max_depth: Optional[int] = None):
         """
-        Find all paths from source to target and save them to a CSV file
+        Find all paths from source to target and save them to a CSV file,
+        at most max_paths of them (None for no limit)
         """
-        all_paths = self._find_all_paths(source, target, [], [])
-        
-        if not all_paths:
+        _, all_paths = self.stream_paths_to_csv(source, target, max_paths=max_paths, max_depth=max_depth)
+        return all_paths
+
+    @instrumented
+    def stream_paths_to_csv(self, source: str, target: str, max_paths: Optional[int] = DEFAULT_MAX_PATHS,
+                            max_depth: Optional[int] = None, keep: Optional[int] = None) -> Tuple[int, List[List[str]]]:
+        """
+        Stream paths from source to target straight into the CSV file without
+        materializing them, stopping after max_paths (pass None to write every
+        path). Returns (number of paths written, the first `keep` paths; all
+        of them when keep is None).
+        """
+        paths = self.iter_paths(source, target, max_depth=max_depth)
+        if max_paths is not None:
+            paths = islice(paths, max_paths)
+
+        first = next(paths, None)
+        if first is None:
             print(f"No paths found from '{source}' to '{target}'")
-            return []
-        
-        # Format paths for CSV (each path as a string with arrow notation)
-        formatted_paths = []
-        for path in all_paths:
-            path_str = " -> ".join(path)
-            formatted_paths.append([path_str])
-        
+            return 0, []
+
+        kept = []
+        count = 0
+
+        def rows():
+            nonlocal count
+            for path in chain([first], paths):
+                count += 1
+                if keep is None or len(kept) < keep:
+                    kept.append(path)
+                yield [" -> ".join(path)]
+
         # Create CSV filename
         csv_filename = f"path_{source}_{target}.csv"
         
         # Write to CSV
-        write_csv_output(csv_filename, formatted_paths, ["paths"])
+        write_csv_output(csv_filename, rows(), ["paths"])
         
         # Also write summary to console output for reference
-        output_lines = [
-            f"All paths from '{source}' to '{target}' ({len(all_paths)} paths found):",
-            ""
-        ]
-        for i, path in enumerate(all_paths, 1):
-            output_lines.append(f"Path {i}: {' -> '.join(path)}")
-        
-        write_console_outputs(f"paths_{source}_{target}.txt", "\n".join(output_lines))
+        if self.sink.enabled:
+            output_lines = [
+                f"All paths from '{source}' to '{target}' ({count} paths found):",
+                ""
+            ]
+            for i, path in enumerate(kept, 1):
+                output_lines.append(f"Path {i}: {' -> '.join(path)}")
+            if count > len(kept):
+                output_lines.append(f"... and {count - len(kept)} more paths in {csv_filename}")
+            self.sink.write(f"paths_{source}_{target}.txt", "\n".join(output_lines))
         
-        return all_paths
+        return count, kept
 
-    def _find_all_paths(self, source: str, target: str, current_path: List[str], all_paths: List[List[str]]) -> List[List[str]]:
+    def iter_paths(self, source: str, target: str, max_depth: Optional[int] = None) -> Iterator[List[str]]:
         """
-        Recursive helper method to find all paths from source to target using DFS
+        Lazily yield simple paths from source to target in DFS order.
+        A reverse BFS from target first records every node's distance to it,
+        so branches that cannot reach target (or cannot within max_depth
+        edges) are never entered.
+        """
+        start = self._node(source)
+        end = self._node(target)
+        if start is None or end is None:
+            if source == target:
+                yield [source]
+            return
+
+        distance = {end: 0}
+
+        def record(node, level):
+            distance[node] = level + 1
+
+        self._reverse.bfs(end, record)
+        if start not in distance:
+            return
+        for path in self._forward.simple_paths(start, end, max_depth=max_depth, distance=distance):
+            yield list(self._entities(path))
+
+    def _find_all_paths(self, source: str, target: str) -> List[List[str]]:
+        """
+        Find all simple paths from source to target using the iterative DFS engine
+        """
+        return list(self.iter_paths(source, target))
+
+    @instrumented
+    def count_paths(self, source: str, target: str) -> Tuple[int, bool]:
+        """
+        Count paths from source to target without enumerating them.
+        Runs a DP over the SCC condensation of the nodes that lie between
+        source and target. Returns (count, exact): when no cycle sits between
+        them the count equals the number of simple paths, otherwise it counts
+        condensation paths, which is a lower bound.
         """
-        # Add current node to the path
-        current_path = current_path + [source]
-        
-        # If we reached the target, add this path to results
         if source == target:
-            all_paths.append(current_path)
-            return all_paths
-        
-        # Explore all dependencies of current source
-        for dep in self.graph.dependencies:
-            if dep.source == source:
-                # Avoid cycles by checking if target is already in current path
-                if dep.target not in current_path:
-                    self._find_all_paths(dep.target, target, current_path, all_paths)
-        
-        return all_paths
+            return 1, True
+        graph = self._compact_graph()
+        s = graph.id_of(source)
+        t = graph.id_of(target)
+        if s is None or t is None:
+            return 0, True
+
+        # Nodes that can reach target
+        n = len(graph.names)
+        successors = counting(graph.successors)
+        predecessors = counting(graph.predecessors)
+        reaches = bytearray(n)
+        reaches[t] = 1
+        stack = [t]
+        while stack:
+            for u in predecessors(stack.pop()):
+                if not reaches[u]:
+                    reaches[u] = 1
+                    stack.append(u)
+        if not reaches[s]:
+            return 0, True
+
+        # ...and are reachable from source without passing through target
+        on_route = bytearray(n)
+        on_route[s] = 1
+        stack = [s]
+        while stack:
+            u = stack.pop()
+            if u == t:
+                continue
+            for v in successors(u):
+                if reaches[v] and not on_route[v]:
+                    on_route[v] = 1
+                    stack.append(v)
+
+        if self.reachability is not None and self.reachability.graph is graph:
+            component, components = self.reachability.component, self.reachability.components
+        else:
+            component, components = strongly_connected_components(graph)
+
+        exact = True
+        paths = [0] * len(components)
+        paths[component[t]] = 1
+        # Tarjan emits components in reverse topological order, successors come first
+        for c, members in enumerate(components):
+            if c == component[t]:
+                continue
+            total = 0
+            for u in members:
+                if not on_route[u]:
+                    continue
+                if len(members) > 1:
+                    exact = False
+                for v in graph.successors(u):
+                    if on_route[v] and component[v] != c:
+                        total += paths[component[v]]
+            paths[c] = total
+
+        if any(on_route[u] for u in components[component[t]] if u != t):
+            exact = False
+        return paths[component[s]], exact
@@ -0,0 +1,179 @@
+import atexit
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+OUTPUT_DIR = Path(__file__).parent.parent / "outputs"
+
+Record = Tuple[str, str]  # (file name, text)
+
+
+class OutputSink:
+    '''
+    Destination of the text reports NXGraphHelper queries write next to their
+    return values. This base sink is disabled: enabled is False, so the
+    helper skips formatting the reports altogether and queries do no I/O.
+    '''
+    enabled = False
+
+    def write(self, file_name: str, text: str):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FileSink(OutputSink):
+    '''Append each report to outputs/<file name> synchronously (the original behaviour)'''
+    enabled = True
+
+    def __init__(self, output_dir: Optional[Path] = None):
+        self.output_dir = Path(output_dir) if output_dir is not None else OUTPUT_DIR
+        self._dir_ready = False
+
+    def write(self, file_name: str, text: str):
+        self._write_records([(file_name, text)])
+
+    def _write_records(self, records: List[Record]):
+        if not self._dir_ready:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self._dir_ready = True
+        by_file = defaultdict(list)
+        for file_name, text in records:
+            by_file[file_name].append(text + "\n")
+        for file_name, texts in by_file.items():
+            with open(self.output_dir / file_name, "a") as f:
+                f.writelines(texts)
+
+
+class JsonlSink(FileSink):
+    '''
+    One JSON record per report ({"ts", "file", "text"}) in a single
+    outputs/nx-helper.jsonl log, rotated like logging's RotatingFileHandler:
+    past max_bytes it moves to .1 (older ones shift up to backup_count) so
+    the log never grows past (backup_count + 1) * max_bytes.
+    '''
+
+    def __init__(self, output_dir: Optional[Path] = None, file_name: str = "nx-helper.jsonl",
+                 max_bytes: int = 10 * 1024 * 1024, backup_count: int = 3):
+        super().__init__(output_dir)
+        self.file_name = file_name
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+    def _rotate(self, path: Path):
+        for i in range(self.backup_count - 1, 0, -1):
+            older = path.with_name(f"{path.name}.{i}")
+            if older.exists():
+                older.replace(path.with_name(f"{path.name}.{i + 1}"))
+        if self.backup_count > 0:
+            path.replace(path.with_name(f"{path.name}.1"))
+        else:
+            path.unlink()
+
+    def _write_records(self, records: List[Record]):
+        if not self._dir_ready:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self._dir_ready = True
+        path = self.output_dir / self.file_name
+        ts = time.time()
+        # Encoded up front, so max_bytes is compared with what lands on disk
+        lines = [(json.dumps({"ts": ts, "file": file_name, "text": text}) + "\n").encode("utf-8")
+                 for file_name, text in records]
+
+        size = path.stat().st_size if path.exists() else 0
+        f = open(path, "ab")
+        try:
+            for line in lines:
+                if size and size + len(line) > self.max_bytes:
+                    f.close()
+                    self._rotate(path)
+                    f = open(path, "ab")
+                    size = 0
+                f.write(line)
+                size += len(line)
+        finally:
+            f.close()
+
+
+class BufferedSink(OutputSink):
+    '''
+    Non-blocking wrapper: write() only appends to an in-memory buffer and a
+    background thread hands the batch to the wrapped sink every
+    flush_interval seconds, or sooner once max_pending reports are waiting.
+    Pending reports are flushed on close() and at interpreter exit.
+    '''
+    enabled = True
+
+    def __init__(self, sink: FileSink, flush_interval: float = 1.0, max_pending: int = 1000):
+        self.sink = sink
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[Record] = []
+        self._lock = threading.Lock()        # guards _pending
+        self._write_lock = threading.Lock()  # keeps batches in order
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="nx-helper-output", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, file_name: str, text: str):
+        with self._lock:
+            self._pending.append((file_name, text))
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if batch:
+                try:
+                    self.sink._write_records(batch)
+                except OSError as e:
+                    print(f"Warning: could not write query outputs: {e}", file=sys.stderr)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._wake.set()
+            self._thread.join()
+            atexit.unregister(self.close)
+        self.flush()
+
+
+SINK_MODES = ("off", "file", "buffered", "jsonl")
+
+
+def make_output_sink(mode: str) -> OutputSink:
+    '''off, file (synchronous appends), buffered (file, written by a background thread) or jsonl (buffered, rotated)'''
+    if mode == "off":
+        return OutputSink()
+    if mode == "file":
+        return FileSink()
+    if mode == "buffered":
+        return BufferedSink(FileSink())
+    if mode == "jsonl":
+        return BufferedSink(JsonlSink())
+    raise ValueError(f"Unknown output sink '{mode}'. Use one of: {', '.join(SINK_MODES)}")
@@ -0,0 +1,165 @@
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from src.batch_reachability import source_closure_bits
+from src.graph_cache import load_snapshot, write_snapshot
+from src.nx_graph_helper import NXGraphHelper
+from src.output_sink import OutputSink
+
+# Per-process state: set once by the pool initializer, or in-process for workers=1
+_helper: Optional[NXGraphHelper] = None
+_closure_bits: List[int] = []
+
+
+def _init_graph_worker(snapshot_path: str):
+    global _helper
+    graph = load_snapshot(Path(snapshot_path))
+    if graph is None:
+        raise RuntimeError(f"Could not map graph snapshot {snapshot_path}")
+    # Bulk runs touch every entity once; an LRU cache would only cost memory
+    _helper = NXGraphHelper(graph, cache_entries=0, output_sink=OutputSink())
+
+
+def _init_matrix_worker(closure_bits: List[int]):
+    global _closure_bits
+    _closure_bits = closure_bits
+
+
+def _closure_chunk(entities: List[str]) -> List[Tuple[str, List[str]]]:
+    return [(entity, _helper.dfs_dependencies(entity)) for entity in entities]
+
+
+def _closure_bits_chunk(entities: List[str]) -> List[int]:
+    '''Closure of each entity as a bitset over node ids'''
+    graph = _helper.compact
+    return [source_closure_bits(graph, i) if i is not None else 0 for i in map(graph.id_of, entities)]
+
+
+def _matrix_rows(rows: range) -> List[Tuple[int, int, int, int]]:
+    '''(i, j, |common|, |union|) for every j > i in rows'''
+    bits = _closure_bits
+    result = []
+    for i in rows:
+        a = bits[i]
+        for j in range(i + 1, len(bits)):
+            b = bits[j]
+            result.append((i, j, bin(a & b).count("1"), bin(a | b).count("1")))
+    return result
+
+
+def _chunks(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _row_chunks(n: int, pairs_per_chunk: int) -> Iterator[range]:
+    # Row i has n - i - 1 pairs, so rows are grouped by pair count, not row count
+    start = pairs = 0
+    for i in range(n):
+        pairs += n - i - 1
+        if pairs >= pairs_per_chunk:
+            yield range(start, i + 1)
+            start, pairs = i + 1, 0
+    if start < n:
+        yield range(start, n)
+
+
+class BulkAnalyzer:
+    '''
+    Whole-graph analyses split into chunks and run on a process pool.
+    Workers get the graph once: it is written as a compact snapshot (to
+    /dev/shm when available) and every worker mmaps the same file instead of
+    unpickling the object graph per task. Results stream back chunk by chunk
+    in input order with a bounded number of chunks in flight, so output can
+    be written while the rest is still computing. workers=1 runs in-process.
+    '''
+
+    def __init__(self, nx_helper: NXGraphHelper, workers: Optional[int] = None, chunk_size: int = 64):
+        self.nx_helper = nx_helper
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tmpdir: Optional[tempfile.TemporaryDirectory] = None
+
+    def _graph_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+            self._tmpdir = tempfile.TemporaryDirectory(prefix="nx-helper-", dir=shm)
+            snapshot = write_snapshot(Path(self._tmpdir.name) / "graph.nxcache", self.nx_helper._compact_graph())
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_init_graph_worker,
+                                                 initargs=(str(snapshot),))
+        return self._executor
+
+    def _stream(self, executor: Optional[ProcessPoolExecutor], fn: Callable, tasks: Iterable) -> Iterator:
+        '''Yield fn(task) results in task order, keeping a few chunks per worker in flight'''
+        if executor is None:
+            for task in tasks:
+                yield fn(task)
+            return
+
+        pending = deque()
+        try:
+            for task in tasks:
+                pending.append(executor.submit(fn, task))
+                if len(pending) >= 4 * self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Consumer stopped early: drop chunks that have not started yet
+            for future in pending:
+                future.cancel()
+
+    def _run(self, fn: Callable, tasks: Iterable) -> Iterator:
+        global _helper
+        if self.workers == 1:
+            # Same code path as the workers, against the caller's compact graph
+            _helper = NXGraphHelper(self.nx_helper._compact_graph(), cache_entries=0, output_sink=OutputSink())
+            return self._stream(None, fn, tasks)
+        return self._stream(self._graph_executor(), fn, tasks)
+
+    def closures(self, entities: Sequence[str]) -> Iterator[Tuple[str, List[str]]]:
+        '''(entity, transitive dependencies in DFS order) for every entity'''
+        for chunk in self._run(_closure_chunk, _chunks(entities, self.chunk_size)):
+            yield from chunk
+
+    def common_dependency_matrix(self, entities: Sequence[str]) -> Iterator[Tuple[str, str, int, float]]:
+        '''
+        (entity1, entity2, common dependency count, Jaccard overlap of their
+        closures) for every unordered pair of entities. Closures are built in
+        parallel as bitsets, then pair rows are split by pair count.
+        '''
+        closure_bits = []
+        for chunk in self._run(_closure_bits_chunk, _chunks(entities, self.chunk_size)):
+            closure_bits.extend(chunk)
+
+        _init_matrix_worker(closure_bits)
+        executor = None
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(self.workers, initializer=_init_matrix_worker,
+                                           initargs=(closure_bits,))
+        try:
+            rows = _row_chunks(len(entities), self.chunk_size * 256)
+            for chunk in self._stream(executor, _matrix_rows, rows):
+                for i, j, common, union in chunk:
+                    yield entities[i], entities[j], common, common / union if union else 0.0
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+            self._tmpdir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,109 @@
+import json
+from itertools import islice
+from typing import Any, Callable, Dict, Optional
+from src.graph_cache import load_compact_graph
+from src.nx_graph_helper import NXGraphHelper
+from src.utility import resolve_graph_path
+
+
+# find-paths answers at most this many paths unless the query asks for another (positive) max_paths
+QUERY_MAX_PATHS = 10_000
+
+
+class QueryError(ValueError):
+    """Raised for malformed queries (unknown op, missing fields)"""
+
+
+def _field(query: Dict, name: str) -> Any:
+    if name not in query:
+        raise QueryError(f"Missing field '{name}' for op '{query.get('op')}'")
+    return query[name]
+
+
+def _find_paths(nx_helper: NXGraphHelper, query: Dict):
+    paths = nx_helper.iter_paths(_field(query, "source"), _field(query, "target"),
+                                 max_depth=query.get("max_depth"))
+    # Always bounded: a diamond-heavy graph has exponentially many paths, and a
+    # daemon answering one huge find-paths would keep every other client waiting
+    max_paths = query.get("max_paths")
+    if max_paths is None:
+        max_paths = QUERY_MAX_PATHS
+    if not isinstance(max_paths, int) or max_paths < 1:
+        raise QueryError("max_paths must be a positive integer")
+    paths = list(islice(paths, max_paths))
+    return {"count": len(paths), "paths": paths, "truncated": len(paths) == max_paths}
+
+
+def _count_paths(nx_helper: NXGraphHelper, query: Dict):
+    count, exact = nx_helper.count_paths(_field(query, "source"), _field(query, "target"))
+    return {"count": count, "exact": exact}
+
+
+def _reload(nx_helper: NXGraphHelper, query: Dict, graph_file: Optional[str]):
+    # Lets a daemon pick up a regenerated graph without losing unaffected cache entries.
+    # Only the graph it was started with: a client must not make it read any
+    # file it names (and write a .nxcache snapshot next to it)
+    if graph_file is None:
+        raise QueryError("reload needs the graph file the graph was loaded from")
+    requested = query.get("graph_file")
+    if requested is not None and resolve_graph_path(requested).resolve() != resolve_graph_path(graph_file).resolve():
+        raise QueryError(f"reload only re-reads the loaded graph file ({graph_file})")
+    graph, _ = load_compact_graph(graph_file)
+    return nx_helper.update_graph(graph).summary()
+
+
+# op name -> handler(nx_helper, query); names follow the CLI flags
+QUERY_OPS: Dict[str, Callable[[NXGraphHelper, Dict], Any]] = {
+    "list-entities": lambda h, q: h.get_all_entities(),
+    "dependencies": lambda h, q: h.all_dependencies(_field(q, "entity")),
+    "dependencies-by-type": lambda h, q: h.dependency_by_type(_field(q, "entity"), _field(q, "type")),
+    "dependents": lambda h, q: h.group_dependents_by_type(_field(q, "entity")),
+    "affected": lambda h, q: h.affected(_field(q, "projects"), q.get("types")),
+    "shared-dependencies": lambda h, q: h.batch_reachability().common_dependencies(_field(q, "entities"), q.get("type")),
+    "usage-counts": lambda h, q: h.batch_reachability().usage_counts(_field(q, "sources"), q.get("type")),
+    "check-dependency": lambda h, q: h.check_if_dependent(_field(q, "source"), _field(q, "target")),
+    "common-dependencies": lambda h, q: h.find_common_dependencies(_field(q, "entity1"), _field(q, "entity2")),
+    "level-wise": lambda h, q: h.level_wise_dependencies(_field(q, "entity")),
+    "level-wise-typed": lambda h, q: h.level_wise_dependencies_with_types(_field(q, "entity")),
+    "find-paths": _find_paths,
+    "count-paths": _count_paths,
+}
+# reload also needs the loaded graph file, which run_query passes on
+OP_NAMES = list(QUERY_OPS) + ["reload"]
+
+
+def run_query(nx_helper: NXGraphHelper, query: Dict, graph_file: Optional[str] = None) -> Any:
+    """
+    Run one query dict such as {"op": "dependencies", "entity": "my-app"}.
+    graph_file is the file nx_helper's graph was loaded from, the only one reload re-reads.
+    """
+    if not isinstance(query, dict):
+        raise QueryError("Query must be a JSON object")
+    op = query.get("op")
+    if op == "reload":
+        return _reload(nx_helper, query, graph_file)
+    handler = QUERY_OPS.get(op)
+    if handler is None:
+        raise QueryError(f"Unknown op '{op}'. Available ops: {', '.join(OP_NAMES)}")
+    return handler(nx_helper, query)
+
+
+def handle_query_line(nx_helper: NXGraphHelper, line: str, graph_file: Optional[str] = None) -> Dict:
+    """
+    Parse and run one JSONL query line. Never raises: failures are reported
+    in the response so one bad line does not stop a batch.
+    """
+    try:
+        query = json.loads(line)
+    except json.JSONDecodeError as e:
+        return {"ok": False, "error": f"Invalid JSON: {e}"}
+
+    response = {"id": query.get("id"), "op": query.get("op")} if isinstance(query, dict) else {}
+    try:
+        result = run_query(nx_helper, query, graph_file)
+        response["ok"] = True
+        response["result"] = result
+    except Exception as e:
+        response["ok"] = False
+        response["error"] = str(e)
+    return response
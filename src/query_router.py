@@ -0,0 +1,161 @@
+import logging
+import re
+import time
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLASSIFICATION_PROMPT = """
+    You are a helpful assistant that determines if a user query requires using graph analysis tools.
+
+    **When to Use Tools:**
+    - Questions about specific entities (apps, libraries, e2e tests)
+    - Questions about dependencies between entities
+    - Questions about graph structure or analysis
+    - Questions that require examining the actual graph data
+    In above cases,
+    Respond with only "YES" if the query requires graph analysis tools (finding nodes, edges, paths, etc.).
+
+    **When NOT to Use Tools:**
+    - Greetings (hello, hi, etc.)
+    - Questions about your role or capabilities
+    - General questions about NX or dependency graphs (concept explanations)
+    In above cases,
+    Respond with only "NO" if it's a simple greeting, general conversation, or doesn't need graph analysis.
+
+    Query: {query}
+
+    Answer:"""
+
+
+def should_use_tools(query, llm):
+    """Use LLM to decide if tools are needed"""
+    response = llm.invoke(CLASSIFICATION_PROMPT.format(query=query))
+    return response.content.strip().upper() == "YES"
+
+
+_TOKEN = re.compile(r"[a-z0-9@_][\w@/.:\-]*")
+# Graph questions: relations between entities and whole-graph counts
+_INTENT = re.compile(
+    r"\b(depend\w*|import\w*|uses?|used|using|consum\w*|paths?|routes?|common|shared|levels?|layers?|"
+    r"affect\w*|impact\w*|blast|transitive\w*|direct(ly)?|list|count|how many|which|entities|projects?)\b"
+)
+_GREETING = re.compile(r"^(hi|hello|hey|yo|good (morning|afternoon|evening)|thanks|thank you|bye|goodbye|ok|okay)\b")
+_META = re.compile(r"\b(who are you|what can you do|your (role|capabilities|purpose)|help me|what are you)\b")
+_CONCEPT = re.compile(r"^(what is|what are|what's|explain|define|how does|how do|why|tell me about)\b"
+                      r"|\b(difference between|in general|concept|meaning of)\b")
+
+
+class RouteDecision:
+    '''Outcome of QueryRouter.route: use tools or not, how sure, and who decided (rules or llm)'''
+    __slots__ = ("use_tools", "confidence", "source", "reason", "seconds")
+
+    def __init__(self, use_tools: bool, confidence: float, source: str, reason: str, seconds: float = 0.0):
+        self.use_tools = use_tools
+        self.confidence = confidence
+        self.source = source
+        self.reason = reason
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        return (f"RouteDecision({'tools' if self.use_tools else 'no tools'}, {self.source}, "
+                f"{self.confidence:.2f}, {self.reason!r}, {self.seconds * 1000:.2f} ms)")
+
+
+class QueryRouter:
+    '''
+    Decides locally whether a question needs the graph tools, replacing the
+    should_use_tools LLM round trip for the common cases. Rules, strongest
+    first: a known entity name in the question (looked up in an index
+    built from entity_type_map), greetings and questions about the
+    assistant, concept questions, then graph intent keywords ("depends",
+    "paths", "how many", type names). Below threshold confidence the
+    question goes to classify (the LLM classifier) when one is given.
+    Every decision is logged; stats() reports the LLM calls saved and the
+    time that saved, estimated from the fallback calls actually made.
+    '''
+
+    def __init__(self, entity_type_map: Mapping[str, str],
+                 classify: Optional[Callable[[str], bool]] = None, threshold: float = 0.75):
+        self.entity_type_map = entity_type_map
+        self.classify = classify
+        self.threshold = threshold
+        self.local_decisions = 0
+        self.llm_decisions = 0
+        self.local_seconds = 0.0
+        self.llm_seconds = 0.0
+        self.rebuild_index()
+
+    def rebuild_index(self):
+        '''Re-read entity names and types, e.g. after the helper switched graphs'''
+        self._entities: Dict[str, str] = {name.lower(): name for name in self.entity_type_map}
+        types = {type_.lower() for type_ in self.entity_type_map.values() if type_}
+        types.update(("app", "lib", "library", "e2e"))
+        self._types = types | {t + "s" for t in types} | {"libraries"}
+
+    def _entity_mentions(self, tokens: List[str]) -> Tuple[List[str], List[str]]:
+        '''(distinctive names, plain-word names) among tokens'''
+        strong, weak = [], []
+        for token in tokens:
+            name = self._entities.get(token) or self._entities.get(token.rstrip(".:"))
+            if name is not None:
+                # "core" or "shared" may be an entity or just a word; "my-app" or "@org/ui" is not a word
+                (weak if name.isalpha() else strong).append(name)
+        return strong, weak
+
+    def rules(self, query: str) -> Tuple[bool, float, str]:
+        '''Local verdict: (use tools, confidence 0-1, reason)'''
+        text = query.strip().lower()
+        tokens = _TOKEN.findall(text)
+        strong, weak = self._entity_mentions(tokens)
+        intent = _INTENT.search(text)
+        typed = any(token.rstrip("?.,!") in self._types for token in tokens)
+
+        if strong:
+            return True, 0.95, f"entity '{strong[0]}'"
+        if weak and (intent or typed):
+            return True, 0.9, f"entity '{weak[0]}' with graph intent"
+        if _GREETING.match(text) and len(tokens) <= 4 and not intent:
+            return False, 0.95, "greeting"
+        if _META.search(text):
+            return False, 0.9, "question about the assistant"
+        if intent and typed:
+            return True, 0.85, f"graph intent '{intent.group(0)}' on entity types"
+        if _CONCEPT.search(text):
+            return False, 0.8, "concept question"
+        if weak:
+            return True, 0.6, f"possible entity '{weak[0]}'"
+        if intent:
+            return True, 0.65, f"graph intent '{intent.group(0)}'"
+        return False, 0.5, "no graph signal"
+
+    def route(self, query: str) -> RouteDecision:
+        start = time.perf_counter()
+        use_tools, confidence, reason = self.rules(query)
+        if confidence >= self.threshold or self.classify is None:
+            decision = RouteDecision(use_tools, confidence, "rules", reason, time.perf_counter() - start)
+            self.local_decisions += 1
+            self.local_seconds += decision.seconds
+        else:
+            use_tools = self.classify(query)
+            decision = RouteDecision(use_tools, confidence, "llm", f"low confidence ({reason})",
+                                     time.perf_counter() - start)
+            self.llm_decisions += 1
+            self.llm_seconds += decision.seconds
+        logger.info("route %r -> %s via %s (%.2f, %s) in %.2f ms", query, "tools" if decision.use_tools else "no tools",
+                    decision.source, decision.confidence, decision.reason, decision.seconds * 1000)
+        return decision
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        '''Decision counts and the estimated time saved (None until an LLM fallback was timed)'''
+        llm_latency = self.llm_seconds / self.llm_decisions if self.llm_decisions else None
+        saved = None
+        if llm_latency is not None:
+            saved = self.local_decisions * llm_latency - self.local_seconds
+        return {
+            "local_decisions": self.local_decisions,
+            "llm_decisions": self.llm_decisions,
+            "llm_calls_saved": self.local_decisions,
+            "avg_llm_seconds": llm_latency,
+            "seconds_saved": saved,
+        }
@@ -0,0 +1,160 @@
+import asyncio
+import ipaddress
+import json
+import os
+import signal
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Optional, Tuple
+from src.nx_graph_helper import NXGraphHelper
+from src.query import handle_query_line
+
+DEFAULT_HOST = "127.0.0.1"
+_LINE_LIMIT = 1 << 20  # longest accepted query line in bytes
+
+
+def parse_tcp_address(value: str) -> Tuple[str, int]:
+    """'PORT' or 'HOST:PORT' -> (host, port); the host defaults to localhost"""
+    host, _, port = value.rpartition(":")
+    return host or DEFAULT_HOST, int(port)
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+async def _handle_client(nx_helper: NXGraphHelper, graph_file: Optional[str], pool: ThreadPoolExecutor,
+                         reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    # Queries run on pool, which has a single thread: the event loop keeps
+    # accepting and reading clients while one runs, and queries never overlap,
+    # since NXGraphHelper is not thread-safe. Its LRU cache is locked, but the
+    # lazily built indexes (compact copy, reachability, batch engine, content
+    # hash, entity resolver) and the rest of its state are not.
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            response = await loop.run_in_executor(pool, handle_query_line, nx_helper,
+                                                  line.decode("utf-8"), graph_file)
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+    except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+def _socket_in_use(socket_path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(socket_path)
+            return True
+        except OSError:
+            return False
+
+
+async def _serve(nx_helper: NXGraphHelper, socket_path: Optional[str], host: Optional[str], port: Optional[int],
+                 graph_file: Optional[str]):
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nx-query")
+    handler = partial(_handle_client, nx_helper, graph_file, pool)
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            if _socket_in_use(socket_path):
+                raise RuntimeError(f"A daemon is already listening on {socket_path}")
+            os.unlink(socket_path)  # stale socket from a daemon that did not shut down cleanly
+        server = await asyncio.start_unix_server(handler, path=socket_path, limit=_LINE_LIMIT)
+        where = socket_path
+    else:
+        server = await asyncio.start_server(handler, host, port, limit=_LINE_LIMIT)
+        where = f"{host}:{port}"
+
+    try:
+        # Shut down (and remove the socket) on SIGTERM as well as Ctrl-C
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, RuntimeError):
+        pass
+    print(f"nx-helper daemon listening on {where}", file=sys.stderr, flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def serve(nx_helper: NXGraphHelper, socket_path: Optional[str] = None,
+          host: Optional[str] = None, port: Optional[int] = None,
+          graph_file: Optional[str] = None, allow_remote: bool = False):
+    """
+    Answer JSONL queries (same format as the CLI batch mode) over a Unix
+    domain socket or a TCP port until interrupted, keeping nx_helper warm.
+    graph_file is the file nx_helper's graph was loaded from, the only one
+    the reload op re-reads. The daemon has no authentication, so a TCP host
+    other than loopback is refused unless allow_remote is set.
+    """
+    if socket_path is None and not allow_remote and not is_loopback(host):
+        raise ValueError(f"Refusing to serve on non-loopback address {host}: "
+                         "anyone who can reach it could query the graph")
+    try:
+        asyncio.run(_serve(nx_helper, socket_path, host, port, graph_file))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        if socket_path is not None and os.path.exists(socket_path) and not _socket_in_use(socket_path):
+            os.unlink(socket_path)
+
+
+class DaemonClient:
+    """Blocking client keeping one connection to a running daemon"""
+
+    def __init__(self, socket_path: Optional[str] = None, host: Optional[str] = None,
+                 port: Optional[int] = None, timeout: float = 30.0):
+        if socket_path is not None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            try:
+                self._sock.connect(socket_path)
+            except OSError:
+                self._sock.close()
+                raise
+        else:
+            self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._reader = self._sock.makefile("rb")
+
+    def query(self, query: Dict) -> Dict:
+        self._sock.sendall(json.dumps(query).encode("utf-8") + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Daemon closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def send_query(query: Dict, socket_path: Optional[str] = None, host: Optional[str] = None,
+               port: Optional[int] = None, timeout: float = 30.0) -> Optional[Dict]:
+    """Send one query to a running daemon; None when no daemon is listening"""
+    try:
+        client = DaemonClient(socket_path, host, port, timeout=timeout)
+    except OSError:
+        return None
+    with client:
+        return client.query(query)
@@ -0,0 +1,167 @@
+from typing import List, Tuple
+from src.compact_graph import CompactGraph
+
+
+def strongly_connected_components(graph: CompactGraph) -> Tuple[List[int], List[List[int]]]:
+    '''
+    Iterative Tarjan over the forward CSR arrays.
+    Returns (component id per node, member lists per component). Components
+    come out in reverse topological order: every component is emitted after
+    all components it can reach.
+    '''
+    offsets, targets = graph.fwd_offsets, graph.fwd_targets
+    n = len(graph.names)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = bytearray(n)
+    stack = []
+    component = [-1] * n
+    components = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [[root, offsets[root]]]
+
+        while work:
+            frame = work[-1]
+            v, pos = frame
+            if pos < offsets[v + 1]:
+                frame[1] = pos + 1
+                w = targets[pos]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    work.append([w, offsets[w]])
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+
+            work.pop()
+            if work:
+                u = work[-1][0]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+            if low[v] == index[v]:
+                cid = len(components)
+                members = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    component[w] = cid
+                    members.append(w)
+                    if w == v:
+                        break
+                components.append(members)
+
+    return component, components
+
+
+def _decode(bits: int) -> List[int]:
+    # bin() and str.find do the per-bit work in C
+    digits = bin(bits)[:1:-1]
+    ids = []
+    i = digits.find("1")
+    while i != -1:
+        ids.append(i)
+        i = digits.find("1", i + 1)
+    return ids
+
+
+def closure_bits(component: List[int], components: List[List[int]], offsets, targets,
+                 reversed_order: bool) -> List[int]:
+    '''
+    bits[c] = every node reachable from component c through at least one
+    edge, as a bitset over node ids. Members of c are included only when c is
+    cyclic. components must be in Tarjan (reverse topological) order; pass
+    the reverse CSR arrays with reversed_order=True for ancestors.
+    '''
+    order = range(len(components))
+    if reversed_order:
+        order = reversed(order)
+
+    bits = [0] * len(components)
+    for c in order:
+        members = components[c]
+        acc = 0
+        seen = set()
+        cyclic = False
+        for u in members:
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                cv = component[v]
+                if cv == c:
+                    cyclic = True
+                elif cv not in seen:
+                    seen.add(cv)
+                    acc |= bits[cv] | (1 << v)
+                else:
+                    acc |= 1 << v
+        if cyclic:
+            for u in members:
+                acc |= 1 << u
+        bits[c] = acc
+    return bits
+
+
+class ReachabilityIndex:
+    '''
+    Precomputed transitive closure over a CompactGraph.
+    Strongly connected components are condensed with Tarjan and every
+    component gets a descendant and an ancestor bitset (Python ints over node
+    ids), filled in (reverse) topological order of the condensation DAG.
+    Reachability is then a bit test, common dependencies a bitwise AND and
+    a closure a bitset decode. Memory is O(V^2 / 8) bytes per direction.
+
+    Decoded lists are in node id (graph declaration) order, not DFS/BFS order.
+    '''
+
+    def __init__(self, graph: CompactGraph):
+        self.graph = graph
+        self.component, self.components = strongly_connected_components(graph)
+        self.descendant_bits = closure_bits(self.component, self.components,
+                                            graph.fwd_offsets, graph.fwd_targets, reversed_order=False)
+        self.ancestor_bits = closure_bits(self.component, self.components,
+                                          graph.rev_offsets, graph.rev_targets, reversed_order=True)
+
+    def _names(self, bits: int) -> List[str]:
+        names = self.graph.names
+        return [names[i] for i in _decode(bits)]
+
+    def depends_on(self, source: str, target: str) -> bool:
+        if source == target:
+            return True
+        s = self.graph.id_of(source)
+        t = self.graph.id_of(target)
+        if s is None or t is None:
+            return False
+        return bool((self.descendant_bits[self.component[s]] >> t) & 1)
+
+    def dependency_bits(self, entity: str) -> int:
+        '''Transitive dependencies of entity as a bitset, entity itself excluded'''
+        i = self.graph.id_of(entity)
+        if i is None:
+            return 0
+        return self.descendant_bits[self.component[i]] & ~(1 << i)
+
+    def dependent_bits(self, entity: str) -> int:
+        '''Transitive dependents of entity as a bitset, entity included when on a cycle'''
+        i = self.graph.id_of(entity)
+        if i is None:
+            return 0
+        return self.ancestor_bits[self.component[i]]
+
+    def dependencies(self, entity: str) -> List[str]:
+        return self._names(self.dependency_bits(entity))
+
+    def dependents(self, entity: str) -> List[str]:
+        return self._names(self.dependent_bits(entity))
+
+    def common_dependencies(self, entity1: str, entity2: str) -> List[str]:
+        return self._names(self.dependency_bits(entity1) & self.dependency_bits(entity2))
@@ -0,0 +1,103 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Roughly 1k tokens per tool result
+DEFAULT_BUDGET_CHARS = 4000
+CHARS_PER_TOKEN = 4
+
+
+class EncodeStats:
+    '''Size of one encoded tool result next to what str(result) would have cost'''
+    __slots__ = ("shown", "total", "chars", "full_chars")
+
+    def __init__(self, shown: int, total: int, chars: int, full_chars: int):
+        self.shown = shown
+        self.total = total
+        self.chars = chars
+        self.full_chars = full_chars
+
+    @property
+    def tokens(self) -> int:
+        return self.chars // CHARS_PER_TOKEN
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, (self.full_chars - self.chars) // CHARS_PER_TOKEN)
+
+    def __str__(self) -> str:
+        return (f"{self.shown}/{self.total} items, {self.chars} chars (~{self.tokens} tokens), "
+                f"~{self.tokens_saved} tokens saved vs {self.full_chars} chars")
+
+
+def _groups(result: Any, label: str) -> Dict[str, List[Any]]:
+    '''Flatten a query result into named groups of items; a plain list is one group named label'''
+    if isinstance(result, dict):
+        groups = {}
+        for key, value in result.items():
+            group = f"level {key}" if isinstance(key, int) else str(key)
+            if isinstance(value, dict):
+                # {level: {type: [...]}}
+                for type_, items in value.items():
+                    groups[f"{group}/{type_}"] = list(items)
+            else:
+                groups[group] = list(value)
+        return groups
+    return {label: list(result)}
+
+
+def _round_robin(groups: Dict[str, List[Any]]) -> List[Tuple[str, int]]:
+    '''(group, index) pairs taking one item from each group in turn, so every group is sampled early'''
+    order = []
+    depth = 0
+    remaining = [name for name, items in groups.items() if items]
+    while remaining:
+        order.extend((name, depth) for name in remaining)
+        depth += 1
+        remaining = [name for name in remaining if len(groups[name]) > depth]
+    return order
+
+
+def encode_result(result: Any, budget_chars: int = DEFAULT_BUDGET_CHARS, cursor: int = 0,
+                  label: str = "items", offset: int = 0, total: Optional[int] = None,
+                  full_chars: Optional[int] = None) -> Tuple[str, EncodeStats]:
+    '''
+    Compact JSON for a list or grouped (dict) query result, at most about
+    budget_chars long: per-group counts first, then as many items as fit,
+    taken round-robin across groups starting at cursor. When items are
+    left, next_cursor is the cursor for the next page. For a list that is
+    only a window of a longer sequence (e.g. paths enumerated lazily),
+    offset is the position of its first item, total the full length and
+    full_chars the estimated str() size of everything.
+    '''
+    groups = _groups(result, label)
+    order = _round_robin(groups)
+    counts = {name: len(items) for name, items in groups.items()}
+    if total is None:
+        total = len(order)
+    elif len(counts) == 1:
+        counts = {name: total for name in counts}
+    page = {
+        "total": total,
+        "counts": counts,
+        "cursor": cursor,
+        "items": {},
+        "next_cursor": None,
+    }
+    size = len(json.dumps(page)) + 60  # room for next_cursor and the note
+    shown = 0
+    for name, index in order[max(0, cursor - offset):]:
+        item = groups[name][index]
+        cost = len(json.dumps(item)) + 2 + (len(name) + 6 if name not in page["items"] else 0)
+        if shown and size + cost > budget_chars:
+            break
+        page["items"].setdefault(name, []).append(item)
+        size += cost
+        shown += 1
+
+    if cursor + shown < total:
+        page["next_cursor"] = cursor + shown
+        page["note"] = f"{total - cursor - shown} more; call again with cursor={cursor + shown}"
+    text = json.dumps(page)
+    if full_chars is None:
+        full_chars = len(str(result))
+    return text, EncodeStats(shown, total, len(text), full_chars)
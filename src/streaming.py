@@ -0,0 +1,120 @@
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from langchain_core.messages import AIMessage, AIMessageChunk
+from src.tool_executor import ToolExecutor
+
+
+def chunk_text(chunk: AIMessageChunk) -> str:
+    """Text of a streamed chunk; providers like Anthropic send a list of content blocks instead of a str"""
+    if isinstance(chunk.content, str):
+        return chunk.content
+    return "".join(block.get("text", "") for block in chunk.content
+                   if isinstance(block, dict) and block.get("type") == "text")
+
+
+class TurnTimer:
+    """Time to first token and total latency of one question, over every LLM request it takes"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.total: Optional[float] = None
+        self.requests = 0
+
+    def token(self):
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.start
+
+    def finish(self):
+        self.total = time.perf_counter() - self.start
+
+    def __str__(self) -> str:
+        ttft = "-" if self.first_token is None else f"{self.first_token * 1000:.0f} ms"
+        total = "-" if self.total is None else f"{self.total * 1000:.0f} ms"
+        return f"time to first token {ttft}, total {total}, {self.requests} LLM request(s)"
+
+
+class ToolCallDispatcher:
+    """
+    Reassembles streamed tool_call_chunks and submits each tool call to the
+    executor as soon as its arguments form a complete JSON object, so tools
+    run while the model is still streaming the rest of its reply. Calls
+    whose arguments never parse while streaming (e.g. no arguments at all)
+    are submitted from the final message in finish.
+    """
+
+    def __init__(self, executor: ToolExecutor):
+        self.executor = executor
+        self._partial: Dict[int, Dict[str, Any]] = {}
+        self._started: Dict[str, Tuple[Dict[str, Any], Any, float]] = {}
+
+    def feed(self, chunk: AIMessageChunk):
+        for part in chunk.tool_call_chunks:
+            index = part.get("index")
+            if index is None:
+                continue
+            call = self._partial.setdefault(index, {"name": None, "id": None, "args": "", "sent": False})
+            call["name"] = call["name"] or part.get("name")
+            call["id"] = call["id"] or part.get("id")
+            call["args"] += part.get("args") or ""
+            if call["sent"] or not call["name"] or not call["id"]:
+                continue
+            try:
+                args = json.loads(call["args"])
+            except ValueError:
+                continue
+            if isinstance(args, dict):
+                call["sent"] = True
+                self._submit({"name": call["name"], "args": args, "id": call["id"]})
+
+    def _submit(self, call: Dict[str, Any]):
+        self._started[call["id"]] = (call, self.executor.submit_tool_call(call), time.monotonic())
+
+    def finish(self, message: AIMessage) -> Dict[str, str]:
+        """Submit what is left of message.tool_calls, wait for every call and return results by call id"""
+        for call in message.tool_calls:
+            if call["id"] not in self._started:
+                self._submit(call)
+        return {call_id: self.executor.tool_call_result(call, future, started)
+                for call_id, (call, future, started) in self._started.items()}
+
+
+def stream_message(model, model_input, timer: TurnTimer, on_text: Callable[[str], None],
+                   executor: Optional[ToolExecutor] = None) -> Tuple[AIMessage, Dict[str, str]]:
+    """
+    Stream one reply of model, passing text to on_text as it arrives. With
+    an executor, tool calls start as soon as they are complete (see
+    ToolCallDispatcher). Returns the assembled message and the tool results
+    by call id.
+    """
+    timer.requests += 1
+    dispatcher = ToolCallDispatcher(executor) if executor is not None else None
+    message: Optional[AIMessageChunk] = None
+    for chunk in model.stream(model_input):
+        text = chunk_text(chunk)
+        if text:
+            timer.token()
+            on_text(text)
+        if dispatcher is not None:
+            dispatcher.feed(chunk)
+        message = chunk if message is None else message + chunk
+
+    if message is None:
+        message = AIMessageChunk(content="")
+    reply = AIMessage(content=message.content, tool_calls=message.tool_calls,
+                      additional_kwargs=message.additional_kwargs,
+                      response_metadata=message.response_metadata, id=message.id)
+    results: Dict[str, str] = dispatcher.finish(reply) if dispatcher is not None and reply.tool_calls else {}
+    return reply, results
+
+
+def turn_summary(timers: List[TurnTimer]) -> str:
+    """Average time to first token and total latency over the finished turns"""
+    done = [timer for timer in timers if timer.total is not None]
+    if not done:
+        return "no turns"
+    first = [timer.first_token for timer in done if timer.first_token is not None]
+    ttft = f"{sum(first) / len(first) * 1000:.0f} ms" if first else "-"
+    total = sum(timer.total for timer in done) / len(done)
+    return f"{len(done)} turn(s), avg time to first token {ttft}, avg total {total * 1000:.0f} ms"
@@ -0,0 +1,154 @@
+import json
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+from src.instrumentation import count_cache
+from src.lru_cache import LRUCache
+from src.nx_graph_helper import NXGraphHelper
+
+# (tool name, normalized args, graph content hash, encoding budget)
+CacheKey = Tuple[str, str, str, Optional[int]]
+
+
+def normalize_args(args: Dict[str, Any]) -> str:
+    '''
+    Canonical form of tool arguments: keys sorted, surrounding whitespace
+    stripped from strings. A cursor of 0 (or below, which the tools clamp)
+    is the first page, the same as no cursor, and is left out.
+    '''
+    return json.dumps({key: value.strip() if isinstance(value, str) else value for key, value in args.items()
+                       if not (key == "cursor" and isinstance(value, int) and value <= 0)},
+                      sort_keys=True, default=str)
+
+
+class ToolResultCache:
+    '''
+    Memoized tool results keyed by (tool name, normalized args, graph
+    content hash, budget_chars), so an answer is reused only for the graph
+    it was computed on: after update_graph or a regenerated nx-output.json
+    the hash changes and old entries are simply never looked up again. The
+    budget the tools encode results with is part of the key, since it
+    decides what a page holds and so what a cursor points at.
+    Results of uncached_tools (tools writing a side output, e.g. a CSV
+    file their result refers to) are never cached: a hit would skip the write.
+    Recent results are kept in an in-memory LRU. With persist_path, every
+    result is also written to a SQLite file that later sessions read
+    through on a memory miss; it keeps the max_disk_entries most recently
+    used results.
+    '''
+
+    def __init__(self, nx_helper: NXGraphHelper, max_entries: int = 256,
+                 persist_path: Optional[str] = None, max_disk_entries: int = 10000,
+                 budget_chars: Optional[int] = None, uncached_tools: Iterable[str] = ()):
+        self.nx_helper = nx_helper
+        self.budget_chars = budget_chars
+        self.uncached_tools = frozenset(uncached_tools)
+        self.memory = LRUCache(max_entries=max_entries)
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        # Tools run concurrently (ToolExecutor.execute_tool_calls): the counters are updated under _stats_lock
+        self._stats_lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+        if persist_path:
+            try:
+                self._db = self._open(Path(persist_path))
+            except sqlite3.Error as e:
+                print(f"Warning: tool result cache '{persist_path}' not usable, keeping results in memory: {e}",
+                      file=sys.stderr)
+
+    @staticmethod
+    def _open(path: Path) -> sqlite3.Connection:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Tools may run on worker threads; every access below holds _db_lock
+        db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS results ("
+                   "key TEXT PRIMARY KEY, graph TEXT NOT NULL, result TEXT NOT NULL, used REAL NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        return db
+
+    def key(self, tool_name: str, args: Dict[str, Any]) -> Optional[CacheKey]:
+        '''Cache key of a tool call; None when the tool's results are not cached'''
+        if tool_name in self.uncached_tools:
+            return None
+        return tool_name, normalize_args(args), self.nx_helper.content_hash(), self.budget_chars
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        result = self.memory.get(key)
+        if result is not None:
+            with self._stats_lock:
+                self.hits += 1
+            return result
+        if self._db is not None:
+            result = self._disk_get(key)
+            if result is not None:
+                with self._stats_lock:
+                    self.disk_hits += 1
+                count_cache(True)
+                self.memory.put(key, result)
+                return result
+        with self._stats_lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: CacheKey, result: str):
+        self.memory.put(key, result)
+        if self._db is not None:
+            self._disk_put(key, result)
+
+    def _disk_get(self, key: CacheKey) -> Optional[str]:
+        db_key = json.dumps(key)
+        try:
+            with self._db_lock:
+                row = self._db.execute("SELECT result FROM results WHERE key = ?", (db_key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), db_key))
+        except sqlite3.Error as e:
+            print(f"Warning: could not read tool result cache: {e}", file=sys.stderr)
+            return None
+        return row[0] if row is not None else None
+
+    def _disk_put(self, key: CacheKey, result: str):
+        try:
+            with self._db_lock:
+                self._db.execute("INSERT OR REPLACE INTO results (key, graph, result, used) VALUES (?, ?, ?, ?)",
+                                 (json.dumps(key), key[2], result, time.time()))
+                # Least recently used first out, once past max_disk_entries
+                self._db.execute("DELETE FROM results WHERE used < "
+                                 "(SELECT used FROM results ORDER BY used DESC LIMIT 1 OFFSET ?)",
+                                 (self.max_disk_entries - 1,))
+        except sqlite3.Error as e:
+            print(f"Warning: could not write tool result cache: {e}", file=sys.stderr)
+
+    def clear(self):
+        '''Drop all cached results, in memory and on disk'''
+        self.memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM results")
+
+    def close(self):
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            hits, disk_hits, misses = self.hits, self.disk_hits, self.misses
+        lookups = hits + disk_hits + misses
+        return {
+            "lookups": lookups,
+            "hits": hits,
+            "disk_hits": disk_hits,
+            "misses": misses,
+            "hit_rate": (hits + disk_hits) / lookups if lookups else 0.0,
+            "entries": len(self.memory),
+            "evictions": self.memory.evictions,
+        }
@@ -1,25 +1,156 @@
 # tool_executor.py
-from typing import Dict, Any, List
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Callable, Dict, Any, List, Optional
 from langchain_core.tools import Tool
+from src.cancellation import Cancelled, cancel_scope
+from src.instrumentation import instrumented
+from src.tool_cache import ToolResultCache
+
+# Tool arguments that name a graph entity
+ENTITY_ARGS = ("entity", "target_entity", "source", "target", "entity1", "entity2")
+
+
+class AmbiguousEntityError(ValueError):
+    """An entity argument could mean several entities; the message lists them for the model to pick from"""
 
 class ToolExecutor:
     """Executes tools based on LLM output"""
     
-    def __init__(self, tools: List[Tool]):
+    def __init__(self, tools: List[Tool], cache: Optional[ToolResultCache] = None,
+                 timeout: Optional[float] = None, timeouts: Optional[Dict[str, float]] = None,
+                 max_workers: Optional[int] = None,
+                 resolve_entity: Optional[Callable[[str], Optional[str]]] = None,
+                 suggest_entities: Optional[Callable[[str], List[str]]] = None):
         self.tools = {tool.name: tool for tool in tools}
+        # Maps loosely written entity names to canonical ones (e.g. NXGraphHelper.resolve_entity),
+        # and lists what an unresolved one could mean (e.g. NXGraphHelper.suggest_entities)
+        self.resolve_entity = resolve_entity
+        self.suggest_entities = suggest_entities
+        # Optional memo of results per (tool, args, graph content hash, encoding budget)
+        self.cache = cache
+        # Seconds a call may take in execute_tool_calls: per tool name, else the default (None = no limit)
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.max_workers = max_workers
+        self._pool = None
+        # Cancel event of every call still running on the pool
+        self._cancel_events: Dict[Future, threading.Event] = {}
+        self._events_lock = threading.Lock()
     
+    @instrumented
     def execute_tool(self, tool_name: str, **kwargs) -> str:
         """Execute a specific tool with given arguments"""
         if tool_name not in self.tools:
             return f"Tool '{tool_name}' not found. Available tools: {list(self.tools.keys())}"
         
+        try:
+            kwargs = self.canonicalize_args(kwargs)
+        except AmbiguousEntityError as e:
+            return f"Error executing tool '{tool_name}': {str(e)}"
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(tool_name, kwargs)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
         try:
             tool = self.tools[tool_name]
             result = tool.func(**kwargs)
-            return result
+        except Cancelled:
+            return f"Error executing tool '{tool_name}': cancelled"
         except Exception as e:
+            # Errors are not cached, a retry may succeed
             return f"Error executing tool '{tool_name}': {str(e)}"
+        if key is not None:
+            self.cache.put(key, result)
+        return result
     
+    def canonicalize_args(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace entity arguments by their canonical names. An ambiguous one
+        raises AmbiguousEntityError with the candidates rather than being
+        replaced by a guess; unknown ones are passed through.
+        """
+        if self.resolve_entity is None:
+            return args
+        canonical = dict(args)
+        for name in ENTITY_ARGS:
+            value = canonical.get(name)
+            if isinstance(value, str):
+                resolved = self.resolve_entity(value.strip())
+                if resolved is not None:
+                    canonical[name] = resolved
+                elif self.suggest_entities is not None:
+                    candidates = self.suggest_entities(value.strip())
+                    if candidates:
+                        raise AmbiguousEntityError(
+                            f"'{value}' could mean {', '.join(candidates)}; call the tool again with one of these names")
+        return canonical
+
+    def execute_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[str]:
+        """
+        Run every tool call of an LLM response ({"name", "args", "id"} dicts)
+        concurrently on a thread pool. Returns the results in call order; a
+        call that exceeds its timeout yields an error string instead and is
+        cancelled (see tool_call_result).
+        """
+        start = time.monotonic()
+        futures = [self.submit_tool_call(call) for call in tool_calls]
+        return [self.tool_call_result(call, future, start) for call, future in zip(tool_calls, futures)]
+
+    def submit_tool_call(self, call: Dict[str, Any]) -> Future:
+        """Start one tool call on the thread pool, e.g. while the rest of the response is still streaming"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="nx-tool")
+        event = threading.Event()
+        future = self._pool.submit(self._run_cancellable, event, call["name"], call["args"])
+        with self._events_lock:
+            self._cancel_events[future] = event
+        future.add_done_callback(self._forget)
+        return future
+
+    def _run_cancellable(self, event: threading.Event, tool_name: str, args: Dict[str, Any]) -> str:
+        with cancel_scope(event):
+            return self.execute_tool(tool_name, **args)
+
+    def _forget(self, future: Future):
+        with self._events_lock:
+            self._cancel_events.pop(future, None)
+
+    def _cancel(self, future: Future):
+        with self._events_lock:
+            event = self._cancel_events.get(future)
+        if event is not None:
+            event.set()
+
+    def tool_call_result(self, call: Dict[str, Any], future: Future, started: float) -> str:
+        """
+        Wait for a submitted call, at most its timeout counted from started
+        (time.monotonic()). A call that times out is told to stop: loops that
+        call check_cancelled (path enumeration) end at their next check.
+        """
+        timeout = self.timeouts.get(call["name"], self.timeout)
+        remaining = None if timeout is None else max(0.0, started + timeout - time.monotonic())
+        try:
+            return future.result(timeout=remaining)
+        except TimeoutError:
+            self._cancel(future)
+            return f"Error executing tool '{call['name']}': timed out after {timeout:g}s"
+
+    def close(self):
+        """Cancel calls still running and release the worker threads"""
+        if self._pool is not None:
+            with self._events_lock:
+                events = list(self._cancel_events.values())
+            for event in events:
+                event.set()
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
     def get_available_tools(self) -> List[str]:
         """Get list of available tool names"""
         return list(self.tools.keys())
\ No newline at end of file
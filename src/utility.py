@@ -1,11 +1,20 @@
 import csv
 import json
+import sys
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List
+from src.instrumentation import count_bytes, instrumented
 from src.model import NXDependency, NXEntity, NXGraph
 
-def load_nx_graph_from_json(filepath: str) -> NXGraph:
-    path = Path(filepath) if Path(filepath).is_absolute() else Path(__file__).parent.parent / filepath
+def resolve_graph_path(filepath: str) -> Path:
+    return Path(filepath) if Path(filepath).is_absolute() else Path(__file__).parent.parent / filepath
+
+@instrumented
+def load_nx_graph_from_json(filepath: str, streaming: bool = False) -> NXGraph:
+    path = resolve_graph_path(filepath)
+    if streaming:
+        return _stream_nx_graph(path)
+
     with path.open("r") as f:
         data = json.load(f)
 
@@ -26,6 +35,132 @@ def load_nx_graph_from_json(filepath: str) -> NXGraph:
 
     return NXGraph(nodes=nodes, dependencies=dependencies)
 
+
+class _JsonStream:
+    '''
+    Minimal pull reader over a JSON file.
+    Objects are walked key by key and only the values asked for are decoded,
+    so at most one value (e.g. a single node) is held in memory at a time.
+    '''
+
+    def __init__(self, f, chunk_size: int = 1 << 20):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        # Drop the consumed prefix and read at least as much as is buffered,
+        # so retrying a large value stays linear overall
+        data = self._f.read(max(self._chunk_size, len(self._buf) - self._pos))
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        if not data:
+            self._eof = True
+        return bool(data)
+
+    def _error(self, msg: str):
+        return json.JSONDecodeError(msg, self._buf, self._pos)
+
+    def peek(self) -> str:
+        while True:
+            buf = self._buf
+            pos = self._pos
+            while pos < len(buf) and buf[pos] in " \t\n\r":
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self._pos += 1
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # A number ending exactly at the buffer edge may be cut short
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    def skip(self):
+        self.decode()
+
+    def iter_object(self) -> Iterator[str]:
+        '''
+        Yield the keys of the object at the current position.
+        The caller must consume (decode or skip) each value before resuming.
+        '''
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.decode()
+            if not isinstance(key, str):
+                raise self._error("Expecting property name")
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise self._error("Expecting ',' delimiter")
+
+
+def _stream_nx_graph(path: Path) -> NXGraph:
+    '''
+    Streaming counterpart of load_nx_graph_from_json.
+    Keeps only node name/type and dependency source/target/type, skips every
+    node's data payload one node at a time and interns the kept strings.
+    '''
+    nodes = []
+    dependencies = []
+    intern = sys.intern
+
+    with path.open("r") as f:
+        stream = _JsonStream(f)
+        for key in stream.iter_object():
+            if key != "graph":
+                stream.skip()
+                continue
+            for graph_key in stream.iter_object():
+                if graph_key == "nodes":
+                    for _ in stream.iter_object():
+                        fields = {}
+                        for field in stream.iter_object():
+                            if field == "name" or field == "type":
+                                fields[field] = intern(stream.decode())
+                            else:
+                                stream.skip()
+                        nodes.append(NXEntity(name=fields["name"], type=fields["type"]))
+                elif graph_key == "dependencies":
+                    for _ in stream.iter_object():
+                        for dep in stream.decode():
+                            dep_type = dep.get("type")
+                            dependencies.append(NXDependency(
+                                source=intern(dep["source"]),
+                                target=intern(dep["target"]),
+                                type=intern(dep_type) if dep_type is not None else None,
+                            ))
+                else:
+                    stream.skip()
+
+    return NXGraph(nodes=nodes, dependencies=dependencies)
+
 def write_console_outputs(fileName: str, output_str: str):
     # Ensure the /outputs directory exists
     output_dir = Path(__file__).parent.parent / "outputs"
@@ -38,9 +173,10 @@ def write_console_outputs(fileName: str, output_str: str):
     with open(file_path, "a") as f:
         f.write(output_str + "\n")    
 
-def write_csv_output(fileName: str, data: List[List[str]], headers: List[str]):
+def write_csv_output(fileName: str, data: Iterable[List[str]], headers: List[str]):
     """
-    Write data to CSV file in the outputs directory
+    Write data to CSV file in the outputs directory.
+    data may be a generator; rows are written as they are produced.
     """
     # Ensure the /outputs directory exists
     output_dir = Path(__file__).parent.parent / "outputs"
@@ -54,6 +190,7 @@ def write_csv_output(fileName: str, data: List[List[str]], headers: List[str]):
         writer = csv.writer(f)
         writer.writerow(headers)  # Write headers
         writer.writerows(data)    # Write data rows
+        count_bytes(f.tell())
     
     print(f"CSV output written to {file_path}")
 # Access the objects
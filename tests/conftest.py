@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the project the way main.py and nx_cli.py do: src.*, configs.*
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
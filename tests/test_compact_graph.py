@@ -0,0 +1,33 @@
+import pytest
+
+from src.batch_reachability import SPARSE_AVAILABLE, batch_reachability
+from src.compact_graph import UNDECLARED_TYPE, CompactGraph
+from src.graph_cache import load_snapshot, write_snapshot
+from src.model import NXDependency, NXEntity, NXGraph
+
+
+def _graph_with_types(type_count: int) -> NXGraph:
+    # root depends on one entity of every type, the last of which depends on an undeclared npm package
+    nodes = [NXEntity("root", "type-0")] + [NXEntity(f"e{k}", f"type-{k}") for k in range(type_count)]
+    edges = [NXDependency("root", f"e{k}") for k in range(type_count)]
+    return NXGraph(nodes, edges + [NXDependency(f"e{type_count - 1}", "npm:left-pad")])
+
+
+@pytest.mark.parametrize("backend", ["python", "scipy"])
+def test_more_than_127_types_keep_their_codes(tmp_path, backend):
+    if backend == "scipy" and not SPARSE_AVAILABLE:
+        pytest.skip("numpy/scipy not installed")
+    graph = CompactGraph.from_nx_graph(_graph_with_types(300))
+    mapped = load_snapshot(write_snapshot(tmp_path / "graph.nxcache", graph))
+
+    for compact in (graph, mapped):
+        assert compact.type_of(compact.id_of("e299")) == "type-299"
+        assert compact.type_of(compact.id_of("npm:left-pad")) is None
+        engine = batch_reachability(compact, backend)
+        assert engine.dependencies(["root"], "type-200") == {"root": ["e200"]}
+    assert mapped.content_hash() == graph.content_hash()
+
+
+def test_too_many_types_fail_clearly():
+    with pytest.raises(ValueError, match="entity types"):
+        CompactGraph.from_nx_graph(_graph_with_types(UNDECLARED_TYPE + 1))
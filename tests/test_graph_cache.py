@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+from src.graph_cache import cache_path_for, load_compact_graph
+
+
+def _write_graph(path):
+    path.write_text(json.dumps({"graph": {
+        "nodes": {name: {"name": name, "type": kind} for name, kind in
+                  [("app", "app"), ("ui", "lib"), ("core", "lib")]},
+        "dependencies": {"app": [{"source": "app", "target": "ui"}], "ui": [{"source": "ui", "target": "core"}],
+                         "core": [{"source": "core", "target": "npm:react"}]},
+    }}))
+
+
+def _edges(graph):
+    return sorted((dependency.source, dependency.target) for dependency in graph.dependencies)
+
+
+@pytest.fixture
+def graph_file(tmp_path):
+    path = tmp_path / "nx-output.json"
+    _write_graph(path)
+    graph, hit = load_compact_graph(str(path))
+    assert not hit and cache_path_for(path).exists()
+    return path
+
+
+def test_snapshot_is_used_when_it_matches(graph_file):
+    graph, hit = load_compact_graph(str(graph_file))
+    assert hit
+    assert _edges(graph) == [("app", "ui"), ("core", "npm:react"), ("ui", "core")]
+
+
+@pytest.mark.parametrize("damage", ["truncate", "empty", "garbage", "offsets"])
+def test_damaged_snapshot_is_rebuilt_from_json(graph_file, damage):
+    cache = cache_path_for(graph_file)
+    data = bytearray(cache.read_bytes())
+    if damage == "truncate":
+        data = data[:len(data) // 2]
+    elif damage == "empty":
+        data = bytearray()
+    elif damage == "garbage":
+        data[100:140] = b"\xff" * 40
+    else:
+        # Last forward offset (= edge count) of the CSR arrays
+        names = 4  # app, ui, core, npm:react
+        start = len(data) - 4 * (2 * (names + 1) + 2 * 3)
+        data[start + 4 * names:start + 4 * names + 4] = (99).to_bytes(4, "little")
+    cache.write_bytes(bytes(data))
+
+    graph, hit = load_compact_graph(str(graph_file))
+    assert not hit
+    assert _edges(graph) == [("app", "ui"), ("core", "npm:react"), ("ui", "core")]
+    assert load_compact_graph(str(graph_file))[1], "the rebuilt snapshot was not written back"
+
+
+@pytest.mark.skipif(os.geteuid() == 0, reason="root reads files regardless of their mode")
+def test_unreadable_snapshot_is_rebuilt_from_json(graph_file):
+    cache_path_for(graph_file).chmod(0)
+    graph, hit = load_compact_graph(str(graph_file))
+    assert not hit and len(_edges(graph)) == 3
+
+
+def test_touched_graph_restamps_the_snapshot_by_replacing_it(graph_file):
+    cache = cache_path_for(graph_file)
+    inode = cache.stat().st_ino
+    os.utime(graph_file, ns=(1_000_000_000, 1_000_000_000))
+
+    graph, hit = load_compact_graph(str(graph_file))
+    assert hit and len(_edges(graph)) == 3
+    assert cache.stat().st_ino != inode, "the header was rewritten in place"
+    assert [p.name for p in graph_file.parent.iterdir() if p.name.endswith(".tmp")] == []
+    assert load_compact_graph(str(graph_file))[1]
@@ -0,0 +1,17 @@
+import json
+
+from src.output_sink import JsonlSink
+
+
+def test_rotated_logs_stay_within_max_bytes(tmp_path):
+    sink = JsonlSink(output_dir=tmp_path, max_bytes=1000, backup_count=2)
+    for k in range(40):
+        sink.write(f"report_{k}.txt", f"dépendances de ç{k} → core-lib ✓")
+    sink.close()
+
+    logs = sorted(tmp_path.iterdir())
+    assert [log.name for log in logs] == ["nx-helper.jsonl", "nx-helper.jsonl.1", "nx-helper.jsonl.2"]
+    for log in logs:
+        assert 0 < log.stat().st_size <= 1000
+    records = [json.loads(line) for line in (tmp_path / "nx-helper.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert records[-1]["file"] == "report_39.txt" and records[-1]["text"].endswith("→ core-lib ✓")
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from src.model import NXDependency, NXEntity, NXGraph
+from src.nx_graph_helper import NXGraphHelper
+from src.output_sink import OutputSink
+from src.query import QUERY_MAX_PATHS, handle_query_line
+from src.query_server import is_loopback, serve
+
+
+def _write_graph(path, edges):
+    names = sorted({name for edge in edges for name in edge})
+    path.write_text(json.dumps({"graph": {
+        "nodes": {name: {"name": name, "type": "lib"} for name in names},
+        "dependencies": {source: [{"source": source, "target": target} for s, target in edges if s == source]
+                         for source in names},
+    }}))
+
+
+def _helper(edges):
+    names = sorted({name for edge in edges for name in edge})
+    graph = NXGraph([NXEntity(name, "lib") for name in names], [NXDependency(s, t) for s, t in edges])
+    return NXGraphHelper(graph, output_sink=OutputSink())
+
+
+def _ask(helper, query, graph_file=None):
+    return handle_query_line(helper, json.dumps(query), graph_file)
+
+
+def test_reload_only_rereads_the_loaded_graph_file(tmp_path):
+    graph_file = tmp_path / "nx-output.json"
+    other_file = tmp_path / "other.json"
+    _write_graph(graph_file, [("a", "b"), ("b", "c")])
+    _write_graph(other_file, [("x", "y")])
+    helper = _helper([("a", "b")])
+
+    response = _ask(helper, {"op": "reload"}, str(graph_file))
+    assert response["ok"] and response["result"]["added_edges"] == 1
+
+    response = _ask(helper, {"op": "reload", "graph_file": str(other_file)}, str(graph_file))
+    assert not response["ok"] and "only re-reads" in response["error"]
+    assert not (tmp_path / "other.json.nxcache").exists()
+
+    assert not _ask(helper, {"op": "reload"})["ok"]
+
+
+def test_find_paths_is_capped_unless_asked_otherwise():
+    # Two ways through each of 14 diamonds: 2 ** 14 paths from d0 to d14
+    edges = [edge for i in range(14) for edge in
+             [(f"d{i}", f"l{i}"), (f"d{i}", f"r{i}"), (f"l{i}", f"d{i + 1}"), (f"r{i}", f"d{i + 1}")]]
+    helper = _helper(edges)
+
+    result = _ask(helper, {"op": "find-paths", "source": "d0", "target": "d14"})["result"]
+    assert result["count"] == QUERY_MAX_PATHS and result["truncated"]
+    result = _ask(helper, {"op": "find-paths", "source": "d0", "target": "d14", "max_paths": 2 ** 15})["result"]
+    assert result["count"] == 2 ** 14 and not result["truncated"]
+    assert not _ask(helper, {"op": "find-paths", "source": "d0", "target": "d14", "max_paths": 0})["ok"]
+
+
+def test_serving_on_a_non_loopback_address_is_refused():
+    assert is_loopback("127.0.0.1") and is_loopback("::1") and is_loopback("localhost")
+    assert not is_loopback("0.0.0.0") and not is_loopback("10.1.2.3")
+    with pytest.raises(ValueError, match="non-loopback"):
+        serve(_helper([("a", "b")]), host="0.0.0.0", port=0)
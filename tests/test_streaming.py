@@ -0,0 +1,73 @@
+import threading
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+import main
+from src.fake_chat_model import ScriptedChatModel
+from src.streaming import TurnTimer, stream_message
+from src.tool_executor import ToolExecutor
+
+
+class _Recorded:
+    """Passes model.stream through and notes when the last chunk was read"""
+
+    def __init__(self, model):
+        self.model = model
+        self.ended = None
+
+    def stream(self, model_input):
+        yield from self.model.stream(model_input)
+        self.ended = time.monotonic()
+
+
+def test_answer_text_is_passed_on_chunk_by_chunk():
+    model = ScriptedChatModel(responses=[AIMessage(content="core-lib is used by three apps")], requests=[],
+                              chunk_sleep=0.02)
+    timer = TurnTimer()
+    received = []
+    reply, results = stream_message(model, "question", timer, lambda text: received.append((text, time.monotonic())))
+    timer.finish()
+
+    assert [text for text, _ in received] == ["core-lib ", "is ", "used ", "by ", "three ", "apps"]
+    assert received[-1][1] - received[0][1] >= 0.08, "the text arrived in one piece"
+    assert reply.content == "core-lib is used by three apps" and results == {}
+    assert timer.requests == 1 and timer.first_token < timer.total
+
+
+def test_tool_calls_start_while_the_reply_is_still_streaming():
+    started = {}
+
+    @tool
+    def lookup(entity: str) -> str:
+        """Note when the call started"""
+        started[entity] = time.monotonic()
+        return entity.upper()
+
+    calls = [{"name": "lookup", "args": {"entity": entity}, "id": f"call_{entity}"}
+             for entity in ("first", "a-rather-long-second-entity-name")]
+    model = _Recorded(ScriptedChatModel(responses=[AIMessage(content="Looking up", tool_calls=calls)],
+                                        requests=[], chunk_sleep=0.02))
+    executor = ToolExecutor([lookup])
+    reply, results = stream_message(model, "question", TurnTimer(), lambda text: None, executor)
+    executor.close()
+
+    assert [call["id"] for call in reply.tool_calls] == ["call_first", "call_a-rather-long-second-entity-name"]
+    assert results == {"call_first": "FIRST", "call_a-rather-long-second-entity-name": "A-RATHER-LONG-SECOND-ENTITY-NAME"}
+    # The second call's arguments take several more chunks: the first call ran meanwhile
+    assert started["first"] < model.ended - 0.05
+
+
+def test_tool_reports_start_on_a_line_of_their_own(capsys):
+    on_text, end = main.print_stream("Response")
+    on_text("Looking ")
+    on_text("up")
+    reporter = threading.Thread(target=main.print_line, args=("DEBUG - lookup output: 3 items",))
+    reporter.start()
+    reporter.join()
+    on_text(" done")
+    end()
+    main.print_line("DEBUG - Turn")
+
+    assert capsys.readouterr().out == "Response: Looking up\nDEBUG - lookup output: 3 items\n done\nDEBUG - Turn\n"
@@ -0,0 +1,36 @@
+from src.model import NXDependency, NXEntity, NXGraph
+from src.nx_graph_helper import NXGraphHelper
+from src.output_sink import OutputSink
+from src.tool_cache import ToolResultCache
+
+
+def _helper() -> NXGraphHelper:
+    graph = NXGraph([NXEntity("app", "app"), NXEntity("lib", "lib")], [NXDependency("app", "lib")])
+    return NXGraphHelper(graph, output_sink=OutputSink())
+
+
+def test_results_encoded_with_another_budget_are_not_reused(tmp_path):
+    helper = _helper()
+    persist_path = str(tmp_path / "tools.sqlite")
+    small = ToolResultCache(helper, persist_path=persist_path, budget_chars=500)
+    small.put(small.key("get_all_dependencies", {"entity": "app"}), "page encoded in 500 chars")
+    small.close()
+
+    large = ToolResultCache(helper, persist_path=persist_path, budget_chars=4000)
+    assert large.get(large.key("get_all_dependencies", {"entity": "app"})) is None
+    same = ToolResultCache(helper, persist_path=persist_path, budget_chars=500)
+    assert same.get(same.key("get_all_dependencies", {"entity": "app"})) == "page encoded in 500 chars"
+
+
+def test_a_zero_cursor_is_the_first_page():
+    cache = ToolResultCache(_helper())
+    first_page = cache.key("get_all_dependencies", {"entity": "app"})
+    assert cache.key("get_all_dependencies", {"entity": " app", "cursor": 0}) == first_page
+    assert cache.key("get_all_dependencies", {"entity": "app", "cursor": -3}) == first_page
+    assert cache.key("get_all_dependencies", {"entity": "app", "cursor": 40}) != first_page
+
+
+def test_tools_with_side_outputs_are_not_cached():
+    cache = ToolResultCache(_helper(), uncached_tools=["find_all_paths_between_source_and_target"])
+    assert cache.key("find_all_paths_between_source_and_target", {"source": "app", "target": "lib"}) is None
+    assert cache.key("get_all_dependencies", {"entity": "app"}) is not None
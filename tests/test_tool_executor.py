@@ -0,0 +1,130 @@
+import json
+import threading
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from configs.nx_tools import create_nx_tools
+from src.cancellation import check_cancelled
+from src.fake_chat_model import ScriptedChatModel
+from src.model import NXDependency, NXEntity, NXGraph
+from src.nx_graph_helper import NXGraphHelper
+from src.output_sink import OutputSink
+from src.tool_executor import ToolExecutor
+
+
+def _layered_graph(width: int, layers: int) -> NXGraph:
+    '''top -> every node of layer 0 -> every node of layer 1 ... -> bottom: width ** layers paths'''
+    layer = lambda l: [f"n{l}-{i}" for i in range(width)]
+    names = ["top", "bottom"] + [name for l in range(layers) for name in layer(l)]
+    edges = [("top", t) for t in layer(0)] + [(s, "bottom") for s in layer(layers - 1)]
+    edges += [(s, t) for l in range(layers - 1) for s in layer(l) for t in layer(l + 1)]
+    return NXGraph([NXEntity(name, "lib") for name in names], [NXDependency(s, t) for s, t in edges])
+
+
+def _scripted(*tool_calls) -> ScriptedChatModel:
+    calls = [{"name": name, "args": args, "id": f"call_{k}"} for k, (name, args) in enumerate(tool_calls)]
+    return ScriptedChatModel(responses=[AIMessage(content="", tool_calls=calls)], requests=[])
+
+
+def test_tool_calls_of_one_response_run_in_parallel():
+    @tool
+    def slow_echo(text: str) -> str:
+        """Echo text after 0.3 s"""
+        time.sleep(0.3)
+        return text.upper()
+
+    model = _scripted(("slow_echo", {"text": "a"}), ("slow_echo", {"text": "b"}), ("slow_echo", {"text": "c"}))
+    executor = ToolExecutor([slow_echo])
+    response = model.invoke("question")
+    start = time.perf_counter()
+    results = executor.execute_tool_calls(response.tool_calls)
+    elapsed = time.perf_counter() - start
+    executor.close()
+
+    assert results == ["A", "B", "C"]
+    assert elapsed < 0.6, f"3 calls of 0.3 s took {elapsed:.2f} s"
+
+
+def test_timed_out_call_returns_an_error_and_is_cancelled():
+    helper = NXGraphHelper(_layered_graph(width=10, layers=12), output_sink=OutputSink())
+    finished = threading.Event()
+
+    @tool
+    def count_all_paths(source: str, target: str) -> str:
+        """Enumerate every path (10 ** 12 here): only a cancel stops it"""
+        try:
+            return str(sum(1 for _ in helper.iter_paths(source, target)))
+        finally:
+            finished.set()
+
+    model = _scripted(("count_all_paths", {"source": "top", "target": "bottom"}))
+    executor = ToolExecutor([count_all_paths], timeout=0.2)
+    [result] = executor.execute_tool_calls(model.invoke("question").tool_calls)
+
+    assert "timed out after 0.2s" in result
+    assert finished.wait(2.0), "the enumeration kept running after the timeout"
+    executor.close()
+
+
+def test_close_cancels_calls_still_running():
+    stopped = threading.Event()
+
+    @tool
+    def spin() -> str:
+        """Loop until cancelled"""
+        try:
+            while True:
+                check_cancelled()
+                time.sleep(0.01)
+        finally:
+            stopped.set()
+
+    executor = ToolExecutor([spin])
+    executor.submit_tool_call({"name": "spin", "args": {}, "id": "call_0"})
+    time.sleep(0.05)
+    executor.close()
+    assert stopped.wait(2.0)
+
+
+def test_entity_arguments_are_canonicalized_before_the_tool_runs():
+    graph = NXGraph([NXEntity("my-app", "app"), NXEntity("shared-ui", "lib"), NXEntity("core", "lib")],
+                    [NXDependency("my-app", "shared-ui"), NXDependency("shared-ui", "core")])
+    helper = NXGraphHelper(graph, output_sink=OutputSink())
+    executor = ToolExecutor(create_nx_tools(helper), resolve_entity=helper.resolve_entity,
+                            suggest_entities=helper.suggest_entities)
+    model = _scripted(("get_all_dependencies", {"entity": "My App"}),
+                      ("check_dependency_relationship", {"source": "my_app", "target": "Core"}),
+                      ("get_all_dependencies", {"entity": "nothing-like-it"}))
+    deps, relation, unknown = executor.execute_tool_calls(model.invoke("question").tool_calls)
+    executor.close()
+
+    assert json.loads(deps)["items"] == {"lib": ["shared-ui", "core"]}
+    assert relation == "my-app depends on core"
+    # Unresolvable names reach the tool unchanged
+    assert json.loads(unknown)["total"] == 0
+
+
+def test_ambiguous_entity_arguments_return_candidates_instead_of_a_guess():
+    graph = NXGraph([NXEntity("billing-ui", "lib"), NXEntity("billing-api", "lib"), NXEntity("core", "lib")],
+                    [NXDependency("billing-ui", "core"), NXDependency("billing-api", "core")])
+    helper = NXGraphHelper(graph, output_sink=OutputSink())
+    calls = []
+
+    @tool
+    def get_all_dependencies(entity: str) -> str:
+        """Record the call"""
+        calls.append(entity)
+        return entity
+
+    executor = ToolExecutor([get_all_dependencies], resolve_entity=helper.resolve_entity,
+                            suggest_entities=helper.suggest_entities)
+    [ambiguous, clear] = executor.execute_tool_calls(
+        _scripted(("get_all_dependencies", {"entity": "billing-a"}),
+                  ("get_all_dependencies", {"entity": "billing-apii"})).invoke("question").tool_calls)
+    executor.close()
+
+    assert ambiguous.startswith("Error executing tool 'get_all_dependencies': 'billing-a' could mean")
+    assert "billing-ui" in ambiguous and "billing-api" in ambiguous
+    assert clear == "billing-api" and calls == ["billing-api"]